@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, List, Optional, Set
+
+
+@dataclass(frozen=True)
+class ActionResult:
+    """How one action ended: `ok`, `failed`, `timeout`, `error` or `busy` (rejected)."""
+
+    label: str
+    lane: str
+    status: str
+    queued_seconds: float = 0.0
+    run_seconds: float = 0.0
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+@dataclass
+class Action:
+    """One command's side effects, to run off the listening loop.
+
+    Actions in the same `lane` run one at a time in submission order;
+    different lanes run in parallel. `max_queued` is how many actions of the
+    lane may wait behind the running one before new ones are rejected (0:
+    reject while the lane is busy). After `timeout` seconds the action is
+    reported as timed out; it keeps its lane until `run` returns, so it must
+    bound its own work (for example by passing the timeout to a subprocess).
+    """
+
+    lane: str
+    run: Callable[[], bool]
+    label: str = ""
+    timeout: Optional[float] = None
+    max_queued: int = 8
+    on_done: Optional[Callable[[ActionResult], None]] = None
+    submitted: float = field(default=0.0, compare=False)
+
+
+class ActionExecutor:
+    """Bounded worker pool that runs command actions by lane.
+
+    `submit()` only queues and returns, so the caller (the capture/decode
+    loop) never waits for a dispatch, notification or script. `workers`
+    threads (started by `start()` or the first submit) pick the oldest
+    queued action whose lane is idle. `on_done` is called exactly once per
+    action, on a worker thread (or the submitting thread for a rejected
+    action), with the `ActionResult`.
+    """
+
+    def __init__(
+        self,
+        workers: int = 3,
+        max_pending: int = 32,
+        name: str = "actions",
+        log_prefix: str = "[actions]",
+        debug: bool = False,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.name = name
+        self.log_prefix = log_prefix
+        self.debug = debug
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._cond = threading.Condition()
+        self._queue: Deque[Action] = deque()
+        self._busy_lanes: Set[str] = set()
+        self._threads: List[threading.Thread] = []
+        self._stop = False
+
+    def submit(self, action: Action) -> bool:
+        """Queue `action`; False (after `on_done` got a `busy` result) if it was rejected."""
+        with self._cond:
+            in_lane = sum(1 for a in self._queue if a.lane == action.lane) + (action.lane in self._busy_lanes)
+            if in_lane > max(0, action.max_queued) or len(self._queue) >= self.max_pending:
+                self.rejected += 1
+                rejected = True
+            else:
+                action.submitted = time.monotonic()
+                self._queue.append(action)
+                self._ensure_workers()
+                self._cond.notify()
+                rejected = False
+        if rejected:
+            if self.debug:
+                print(f"{self.log_prefix} action {action.label or action.lane!r} rejected: lane busy", flush=True)
+            self._deliver(action, ActionResult(action.label, action.lane, "busy"))
+            return False
+        return True
+
+    def run_now(self, action: Action) -> ActionResult:
+        """Run `action` on the calling thread (one-shot CLI use) and return its result."""
+        action.submitted = time.monotonic()
+        return self._run(action)
+
+    def pending(self, lane: Optional[str] = None) -> int:
+        """Queued plus running actions, overall or in one lane."""
+        with self._cond:
+            if lane is None:
+                return len(self._queue) + len(self._busy_lanes)
+            return sum(1 for a in self._queue if a.lane == lane) + (1 if lane in self._busy_lanes else 0)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is queued or running; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._busy_lanes:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0.0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def start(self) -> None:
+        """Start the worker threads now instead of on first submit."""
+        with self._cond:
+            self._ensure_workers()
+
+    def stop(self) -> None:
+        """Let workers exit once the queue is empty."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+
+    def _ensure_workers(self) -> None:
+        self._threads = [t for t in self._threads if t.is_alive()]
+        self._stop = False
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"{self.name}-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _next(self) -> Optional[Action]:
+        """Oldest queued action whose lane is idle (caller holds the lock)."""
+        for action in self._queue:
+            if action.lane not in self._busy_lanes:
+                self._queue.remove(action)
+                self._busy_lanes.add(action.lane)
+                return action
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                action = self._next()
+                while action is None:
+                    if self._stop and not self._queue:
+                        return
+                    self._cond.wait()
+                    action = self._next()
+                if self._queue:
+                    # Another lane may be runnable now too.
+                    self._cond.notify()
+            try:
+                self._run(action)
+            finally:
+                with self._cond:
+                    self._busy_lanes.discard(action.lane)
+                    self._cond.notify_all()
+
+    def _run(self, action: Action) -> ActionResult:
+        started = time.monotonic()
+        queued = started - action.submitted
+        # Whoever takes this first (the timer or the finished run) reports the result.
+        report = threading.Lock()
+        timer: Optional[threading.Timer] = None
+        if action.timeout is not None and action.timeout > 0.0:
+
+            def _expire() -> None:
+                if report.acquire(blocking=False):
+                    self.timeouts += 1
+                    label = action.label or action.lane
+                    print(f"{self.log_prefix} action {label!r} timed out after {action.timeout:g}s", flush=True)
+                    self._deliver(action, ActionResult(action.label, action.lane, "timeout", queued, action.timeout))
+
+            timer = threading.Timer(action.timeout, _expire)
+            timer.daemon = True
+            timer.start()
+        try:
+            status, error = ("ok" if action.run() else "failed"), ""
+        except TimeoutError as exc:
+            status, error = "timeout", str(exc)
+        except Exception as exc:
+            status, error = "error", f"{type(exc).__name__}: {exc}"
+            print(f"{self.log_prefix} action {action.label or action.lane!r} failed: {error}", flush=True)
+        finally:
+            if timer is not None:
+                timer.cancel()
+        result = ActionResult(action.label, action.lane, status, queued, time.monotonic() - started, error)
+        self.completed += 1
+        if self.debug:
+            print(
+                f"{self.log_prefix} action {action.label or action.lane!r} {status} "
+                f"queued={queued * 1e3:.0f}ms ran={result.run_seconds * 1e3:.0f}ms",
+                flush=True,
+            )
+        if not report.acquire(blocking=False):
+            # Already reported as timed out; the late outcome is only logged.
+            return result
+        if status == "timeout":
+            self.timeouts += 1
+        self._deliver(action, result)
+        return result
+
+    def _deliver(self, action: Action, result: ActionResult) -> None:
+        if action.on_done is None:
+            return
+        try:
+            action.on_done(result)
+        except Exception as exc:
+            print(f"{self.log_prefix} action callback failed: {exc}", flush=True)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+# Soundex consonant classes; vowels and h/w/y carry no code.
+_PHONETIC_CLASSES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def squash(text: str) -> str:
+    """Lowercase alphanumerics only: "Fire Fox" and "fire-fox" -> "firefox"."""
+    return _NON_ALNUM.sub("", text.lower())
+
+
+def phonetic_key(text: str) -> str:
+    """Soundex-style key without the 4-character cap.
+
+    Keeps the first letter, maps consonants to their class, drops vowels and
+    collapses repeats, so "obsidion"/"obsidian" and "discored"/"discord"
+    share a key. Digits are kept as-is ("vlc2" != "vlc").
+    """
+    word = squash(text)
+    if not word:
+        return ""
+    out = [word[0]]
+    last = _PHONETIC_CLASSES.get(word[0], "")
+    for ch in word[1:]:
+        if ch.isdigit():
+            out.append(ch)
+            last = ""
+            continue
+        code = _PHONETIC_CLASSES.get(ch, "")
+        if code and code != last:
+            out.append(code)
+        if ch not in "hw":
+            last = code
+    return "".join(out)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance."""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+@dataclass
+class _BkNode:
+    key: str
+    children: Dict[int, "_BkNode"] = field(default_factory=dict)
+
+
+class BkTree:
+    """Burkhard-Keller tree over strings under edit distance.
+
+    A radius query only descends into children whose edge distance is within
+    `radius` of the query's distance to the node, which keeps a lookup around
+    O(log n) node visits for small radii.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()) -> None:
+        self._root: Optional[_BkNode] = None
+        self._size = 0
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: str) -> None:
+        if self._root is None:
+            self._root = _BkNode(key)
+            self._size = 1
+            return
+        node = self._root
+        while True:
+            d = edit_distance(key, node.key)
+            if d == 0:
+                return
+            child = node.children.get(d)
+            if child is None:
+                node.children[d] = _BkNode(key)
+                self._size += 1
+                return
+            node = child
+
+    def search(self, query: str, radius: int) -> List[Tuple[int, str]]:
+        """All keys within `radius` of `query` as `(distance, key)`, nearest first."""
+        if self._root is None:
+            return []
+        found: List[Tuple[int, str]] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            d = edit_distance(query, node.key)
+            if d <= radius:
+                found.append((d, node.key))
+            for edge, child in node.children.items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        found.sort()
+        return found
+
+
+@dataclass(frozen=True)
+class AliasHit(Generic[T]):
+    """A resolved alias: `kind` is exact, squashed, partial, phonetic or fuzzy."""
+
+    value: T
+    alias: str
+    kind: str
+    distance: int = 0
+
+
+class AliasIndex(Generic[T]):
+    """Alias -> value lookup built once per config, tolerant of ASR spelling.
+
+    Tiers, tried in order and each a dict probe except the last:
+
+    - exact alias;
+    - squashed alias, ignoring spaces and punctuation ("fire fox" -> firefox);
+    - partial (`partial=True`): a run of the spoken words that is a whole
+      alias ("terminal window"), or a spoken word that is or starts a word of
+      an alias ("term", "player"), for natural speech variants;
+    - phonetic key of the squashed alias ("obsidion" -> obsidian), within
+      the edit budget below;
+    - edit distance on the squashed alias through a BK-tree, up to one edit
+      per `chars_per_edit` characters.
+
+    Aliases and spoken words shorter than `min_fuzzy_chars` only match
+    exactly, squashed or partially; one edit away from a short name is
+    usually another word ("that" is not "chat", "fault" is not "vault"). When several values
+    claim the same key, the first one added wins, as with a first-match scan
+    in config order.
+    """
+
+    def __init__(self, partial: bool = False, min_fuzzy_chars: int = 6, chars_per_edit: int = 4) -> None:
+        self.partial = partial
+        self.min_fuzzy_chars = max(1, int(min_fuzzy_chars))
+        self.chars_per_edit = max(1, int(chars_per_edit))
+        self._exact: Dict[str, Tuple[T, str]] = {}
+        self._squashed: Dict[str, Tuple[T, str]] = {}
+        self._prefixes: Dict[str, Tuple[T, str]] = {}
+        self._phonetic: Dict[str, Tuple[T, str]] = {}
+        self._tree = BkTree()
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def add(self, alias: str, value: T) -> None:
+        if not alias:
+            return
+        entry = (value, alias)
+        self._exact.setdefault(alias, entry)
+        key = squash(alias)
+        if not key:
+            return
+        self._squashed.setdefault(key, entry)
+        if self.partial:
+            # The alias and each of its words, as any prefix of 3+ characters.
+            for part in dict.fromkeys([key, *(squash(word) for word in alias.split())]):
+                for end in range(min(3, len(part)), len(part) + 1):
+                    self._prefixes.setdefault(part[:end], entry)
+        if len(key) >= self.min_fuzzy_chars:
+            self._phonetic.setdefault(phonetic_key(key), entry)
+            self._tree.add(key)
+
+    def lookup(self, text: str, fuzzy: bool = True) -> Optional[AliasHit[T]]:
+        if not text:
+            return None
+        hit = self._exact.get(text)
+        if hit is not None:
+            return AliasHit(hit[0], hit[1], "exact")
+        key = squash(text)
+        if not key:
+            return None
+        hit = self._squashed.get(key)
+        if hit is not None:
+            return AliasHit(hit[0], hit[1], "squashed")
+        if self.partial:
+            partial = self._partial(text)
+            if partial is not None:
+                return partial
+        if not fuzzy or len(key) < self.min_fuzzy_chars:
+            return None
+        radius = max(1, len(key) // self.chars_per_edit)
+        hit = self._phonetic.get(phonetic_key(key))
+        if hit is not None:
+            # Same consonant skeleton; still bound the spelling gap so a key
+            # collision between unrelated names is not taken.
+            distance = edit_distance(key, squash(hit[1]))
+            if distance <= radius:
+                return AliasHit(hit[0], hit[1], "phonetic", distance)
+        for distance, near in self._tree.search(key, radius):
+            hit = self._squashed.get(near)
+            if hit is not None:
+                return AliasHit(hit[0], hit[1], "fuzzy", distance)
+        return None
+
+    def _partial(self, text: str) -> Optional[AliasHit[T]]:
+        words = text.split()
+        # Longest run of words first: "file manager window" -> "file manager".
+        for size in range(len(words) - 1, 0, -1):
+            for start in range(len(words) - size + 1):
+                hit = self._squashed.get("".join(squash(w) for w in words[start : start + size]))
+                if hit is not None:
+                    return AliasHit(hit[0], hit[1], "partial")
+        for word in words:
+            hit = self._prefixes.get(squash(word))
+            if hit is not None:
+                return AliasHit(hit[0], hit[1], "partial")
+        return None
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+import sounddevice as sd
+
+Sink = Callable[[np.ndarray], None]
+
+
+class AudioCapture:
+    """One microphone stream whose blocks go to whichever sink is attached.
+
+    The stream stays open across listeners: a daemon attaches its ring
+    buffer's `append` for the lifetime of a session and detaches it when the
+    session ends, so switching modes never reopens the device. The callback
+    only reads one attribute, so attach/detach need no lock on the audio
+    thread. Blocks flagged with a PortAudio status are dropped, as before.
+
+    `suspend()` stops the stream without closing the device, so nothing is
+    captured or delivered (and the mic indicator goes off) while the owner
+    is warm but not listening. `resume()` restarts it, which is much cheaper
+    than reopening the device. The first blocks after a restart are kept
+    even when PortAudio flags them, so the start of speech that triggered the
+    resume is not thrown away. `last_resume_seconds` and
+    `last_first_block_seconds` time the most recent resume.
+    """
+
+    def __init__(self, device: Optional[int], rate: int, channels: int = 1, block_size: int = 1024) -> None:
+        self.device = device
+        self.rate = int(rate)
+        self.channels = max(1, int(channels))
+        self.block_size = int(block_size)
+        self._sink: Optional[Sink] = None
+        self._stream: Optional[sd.InputStream] = None
+        self._lock = threading.Lock()
+        self._suspended = False
+        self._preroll = False
+        self._resume_started = 0.0
+        self.last_resume_seconds = 0.0
+        self.last_first_block_seconds = 0.0
+
+    def _callback(self, indata, _frames, _time_info, status) -> None:
+        if self._preroll:
+            # Flags on the first block after a restart describe the gap, not the samples.
+            self._preroll = False
+            self.last_first_block_seconds = time.monotonic() - self._resume_started
+        elif status:
+            return
+        sink = self._sink
+        if sink is not None:
+            sink(indata[:, 0])
+
+    def attach(self, sink: Sink) -> None:
+        self._sink = sink
+
+    def detach(self, sink: Optional[Sink] = None) -> None:
+        """Drop the sink; with `sink` given, only if it is still the attached one."""
+        if sink is None or self._sink == sink:
+            self._sink = None
+
+    @property
+    def active(self) -> bool:
+        return self._stream is not None
+
+    @property
+    def suspended(self) -> bool:
+        return self._suspended
+
+    def suspend(self) -> bool:
+        """Stop delivering audio but keep the device open; True if this call stopped it."""
+        with self._lock:
+            if self._stream is None or self._suspended:
+                return False
+            self._stream.stop()
+            self._suspended = True
+            return True
+
+    def resume(self) -> bool:
+        """Restart a suspended stream; True if this call restarted it."""
+        with self._lock:
+            if self._stream is None or not self._suspended:
+                return False
+            started = time.monotonic()
+            self._resume_started = started
+            self.last_first_block_seconds = 0.0
+            self._preroll = True
+            self._stream.start()
+            self._suspended = False
+            self.last_resume_seconds = time.monotonic() - started
+            return True
+
+    def start(self) -> None:
+        with self._lock:
+            if self._stream is not None:
+                return
+            stream = sd.InputStream(
+                device=self.device,
+                samplerate=self.rate,
+                channels=self.channels,
+                dtype=np.float32,
+                blocksize=self.block_size,
+                callback=self._callback,
+            )
+            stream.start()
+            self._stream = stream
+
+    def close(self) -> None:
+        with self._lock:
+            stream, self._stream = self._stream, None
+            self._suspended = False
+        if stream is None:
+            return
+        try:
+            stream.stop()
+        finally:
+            stream.close()
+
+    def __enter__(self) -> "AudioCapture":
+        self.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
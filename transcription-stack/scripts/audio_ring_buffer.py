@@ -1,65 +1,153 @@
 from __future__ import annotations
 
+import contextlib
 import threading
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import numpy as np
 
+if TYPE_CHECKING:
+    from streaming_vad import StreamingVad
+
+
+@dataclass(frozen=True)
+class AudioWindow:
+    """Read-only view of the newest samples in an `AudioRingBuffer`.
+
+    `start` is the absolute index of `samples[0]` in the capture stream, so a
+    reader can ask the buffer whether the view was overwritten while in use.
+    """
+
+    samples: np.ndarray
+    start: int
+
+    @property
+    def size(self) -> int:
+        return int(self.samples.size)
+
+    @property
+    def end(self) -> int:
+        return self.start + int(self.samples.size)
+
 
 @dataclass
 class AudioRingBuffer:
-    """Thread-safe ring buffer for capture audio."""
+    """Thread-safe ring buffer for capture audio.
+
+    Samples are written twice into a mirrored backing array of `2 * capacity`,
+    so any trailing window is contiguous and can be handed out as a view
+    without copying or concatenating on wraparound.
+
+    With `single_producer=True` the buffer runs lock-free for exactly one
+    writer (the PortAudio callback) and one reader (the main loop). The write
+    cursor `_written` is owned by the producer and published with a single
+    attribute store after the samples land; the read floor `_floor` is owned
+    by the consumer. Both are monotonic sample counters, so neither side ever
+    waits on the other and overwrite is detected with `is_intact()`.
+
+    An optional `vad` is fed every appended block on the producer side and
+    reset together with the buffer.
+    """
 
     capacity: int
+    single_producer: bool = False
+    vad: Optional["StreamingVad"] = None
     _buffer: np.ndarray = field(init=False, repr=False)
-    _size: int = field(default=0, init=False, repr=False)
-    _write_pos: int = field(default=0, init=False, repr=False)
+    _written: int = field(default=0, init=False, repr=False)
+    _floor: int = field(default=0, init=False, repr=False)
     _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     def __post_init__(self) -> None:
         self.capacity = max(1, int(self.capacity))
-        self._buffer = np.zeros(self.capacity, dtype=np.float32)
+        self._buffer = np.zeros(2 * self.capacity, dtype=np.float32)
+
+    @property
+    def generation(self) -> int:
+        """Total samples ever appended; only ever grows."""
+        return self._written
 
     def append(self, chunk: np.ndarray) -> None:
         data = np.asarray(chunk, dtype=np.float32).reshape(-1)
         if data.size <= 0:
             return
 
+        if self.single_producer:
+            self._append_unlocked(data)
+            return
         with self._lock:
-            if data.size >= self.capacity:
-                self._buffer[:] = data[-self.capacity :]
-                self._size = self.capacity
-                self._write_pos = 0
-                return
-
-            first = min(self.capacity - self._write_pos, data.size)
-            self._buffer[self._write_pos : self._write_pos + first] = data[:first]
-
-            remaining = data.size - first
-            if remaining > 0:
-                self._buffer[:remaining] = data[first:]
-
-            self._write_pos = (self._write_pos + data.size) % self.capacity
-            self._size = min(self.capacity, self._size + data.size)
+            self._append_unlocked(data)
+
+    def _append_unlocked(self, data: np.ndarray) -> None:
+        written = self._written
+        total = int(data.size)
+        if total > self.capacity:
+            data = data[-self.capacity :]
+        pos = (written + total - data.size) % self.capacity
+        self._write_mirrored(pos, data)
+        # Publish only after the samples are in place.
+        self._written = written + total
+        if self.vad is not None:
+            self.vad.update(data)
+
+    def _write_mirrored(self, pos: int, data: np.ndarray) -> None:
+        n = data.size
+        end = pos + n
+        self._buffer[pos:end] = data
+
+        # Keep both halves identical: [0, cap) mirrors [cap, 2 * cap).
+        low_end = min(end, self.capacity)
+        if low_end > pos:
+            self._buffer[pos + self.capacity : low_end + self.capacity] = self._buffer[pos:low_end]
+        if end > self.capacity:
+            self._buffer[: end - self.capacity] = self._buffer[self.capacity : end]
+
+    def _reader_lock(self):
+        return contextlib.nullcontext() if self.single_producer else self._lock
+
+    def view(self, limit_samples: Optional[int] = None) -> AudioWindow:
+        """Return a zero-copy, read-only window over the newest samples.
+
+        The view stays valid until `capacity` further samples are appended;
+        use `is_intact()` after long reads to detect overwrite.
+        """
+        with self._reader_lock():
+            end = self._written
+            available = min(self.capacity, end - self._floor)
+            n = available if limit_samples is None else max(0, min(available, int(limit_samples)))
+            return self._window(end - n, end)
+
+    def view_since(self, start: int, limit_samples: Optional[int] = None) -> AudioWindow:
+        """Return everything appended at or after absolute sample `start`.
+
+        If the reader fell behind (or the buffer was cleared) the window starts
+        at the oldest retained sample instead; compare `window.start` with
+        `start` to detect the gap. `limit_samples` caps the window to the
+        newest samples.
+        """
+        with self._reader_lock():
+            end = self._written
+            oldest = max(self._floor, end - self.capacity)
+            if limit_samples is not None:
+                oldest = max(oldest, end - max(0, int(limit_samples)))
+            return self._window(min(end, max(int(start), oldest)), end)
+
+    def _window(self, begin: int, end: int) -> AudioWindow:
+        start_pos = begin % self.capacity
+        samples = self._buffer[start_pos : start_pos + (end - begin)]
+        samples.flags.writeable = False
+        return AudioWindow(samples=samples, start=begin)
+
+    def is_intact(self, window: AudioWindow) -> bool:
+        """True if no sample in `window` has been overwritten since `view()`."""
+        with self._reader_lock():
+            return self._written - window.start <= self.capacity
 
     def snapshot(self, limit_samples: Optional[int] = None) -> np.ndarray:
-        with self._lock:
-            if self._size <= 0:
-                return np.empty(0, dtype=np.float32)
-
-            n = self._size if limit_samples is None else max(0, min(self._size, int(limit_samples)))
-            if n <= 0:
-                return np.empty(0, dtype=np.float32)
-
-            start = (self._write_pos - n) % self.capacity
-            if start + n <= self.capacity:
-                return self._buffer[start : start + n].copy()
-
-            first = self.capacity - start
-            return np.concatenate((self._buffer[start:], self._buffer[: n - first]), axis=0).astype(np.float32, copy=False)
+        return self.view(limit_samples).samples.copy()
 
     def clear(self) -> None:
-        with self._lock:
-            self._size = 0
-            self._write_pos = 0
+        with self._reader_lock():
+            self._floor = self._written
+            if self.vad is not None:
+                self.vad.reset()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import difflib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+# Whisper's prompt is capped at half its 448-token text context; stay well under it.
+_PROMPT_MAX_CHARS = 600
+# Workspace names, digits and dispatcher-style targets ("2", "+1", "special:magic").
+_LITERAL_TOKEN = re.compile(r"[0-9][0-9a-z]*|[+:_-][0-9a-z:+_-]*")
+# What `_normalize_workspace_target` accepts as a named workspace ("code", "special:magic").
+_WORKSPACE_NAME = re.compile(r"[a-z0-9:+_-]+")
+_WORD_EDGES = re.compile(r"(^[^\w'+:-]+|[^\w'+:-]+$)")
+
+
+def _tokens(text: str) -> List[str]:
+    words = []
+    for raw in text.lower().split():
+        word = _WORD_EDGES.sub("", raw)
+        if word:
+            words.append(word)
+    return words
+
+
+def _phrase_words(phrases: Iterable[str]) -> List[str]:
+    words: List[str] = []
+    for phrase in phrases:
+        words.extend(_tokens(phrase))
+    return words
+
+
+@dataclass(frozen=True)
+class GrammarMatch:
+    """A hypothesis mapped onto the command vocabulary."""
+
+    text: str
+    snapped: Tuple[Tuple[str, str], ...] = ()
+    free_text: bool = False
+
+
+@dataclass
+class CommandGrammar:
+    """Closed vocabulary for command recognition, built from the loaded config.
+
+    pywhispercpp exposes no grammar sampling, so the vocabulary constrains
+    recognition from both sides instead. Before decoding, `prompt` primes
+    Whisper with the command phrases and app names. After decoding,
+    `constrain()` accepts a hypothesis only if every word is in the
+    vocabulary, snapping near misses ("obsidion" -> "obsidian") and split
+    names ("fire fox" -> "firefox") onto it. Only app and custom command
+    names (`names`) of `min_snap_chars` or more are snap targets: snapping
+    onto verbs would turn "Quiet." into "quit", and onto short names
+    "chart" into "chat". Words after a free-text verb (`search for ...`)
+    are passed through untouched, and so is one workspace-name-like word
+    after a `literal_after` phrase ("workspace special:magic").
+    A hypothesis made only of `fillers` ("you", "please") is not a command.
+    Anything else, including the stock Whisper hallucinations on noise, is
+    rejected before it reaches the intent parser.
+    """
+
+    vocabulary: FrozenSet[str]
+    fillers: FrozenSet[str] = frozenset()
+    free_text_prefixes: Tuple[Tuple[str, ...], ...] = ()
+    prompt: str = ""
+    snap_cutoff: float = 0.8
+    names: FrozenSet[str] = frozenset()
+    literal_after: Tuple[Tuple[str, ...], ...] = ()
+    min_snap_chars: int = 4
+    _sorted_names: List[str] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._sorted_names = sorted(n for n in self.names if len(n) >= self.min_snap_chars)
+        # Longest first so "search web for" wins over "search".
+        self.free_text_prefixes = tuple(sorted(self.free_text_prefixes, key=len, reverse=True))
+
+    @classmethod
+    def from_config(
+        cls,
+        cfg: Dict[str, Any],
+        command_phrases: Sequence[str],
+        free_text_prefixes: Sequence[str] = (),
+        filler_phrases: Sequence[str] = (),
+        extra_words: Iterable[str] = (),
+        prompt_phrases: Sequence[str] = (),
+        snap_cutoff: float = 0.8,
+        literal_after: Sequence[str] = (),
+        min_snap_chars: int = 4,
+    ) -> "CommandGrammar":
+        """Vocabulary = parser phrases and fillers + app ids/aliases + custom command ids/aliases + `extra_words`.
+
+        Snap targets are the name words that are not also command or filler
+        words. The prompt lists the apps, one alias per custom command and
+        then `prompt_phrases` (example commands), trimmed to fit.
+        """
+        app_names: List[str] = []
+        for app in cfg.get("apps", []) if isinstance(cfg.get("apps"), list) else []:
+            if isinstance(app, dict):
+                app_names.extend(_config_names(app))
+        custom_names: List[str] = []
+        custom_first: List[str] = []
+        for entry in cfg.get("commands", []) if isinstance(cfg.get("commands"), list) else []:
+            if isinstance(entry, dict):
+                names = _config_names(entry)
+                custom_names.extend(names)
+                # The first alias reads as a phrase; the id is usually snake_case.
+                custom_first.extend(names[1:2] or names[:1])
+
+        fillers = frozenset(_phrase_words(filler_phrases))
+        command_words = set(_phrase_words(command_phrases)) | set(_phrase_words(free_text_prefixes))
+        names = set(_phrase_words(app_names)) | set(_phrase_words(n.replace("_", " ") for n in custom_names))
+        vocabulary = command_words | fillers | names
+        vocabulary.update(w.lower() for w in extra_words)
+        prefixes = tuple(tuple(_tokens(p)) for p in free_text_prefixes if _tokens(p))
+        return cls(
+            vocabulary=frozenset(vocabulary),
+            fillers=fillers,
+            free_text_prefixes=prefixes,
+            prompt=_build_prompt(app_names, custom_first, prompt_phrases),
+            snap_cutoff=snap_cutoff,
+            names=frozenset(names - command_words - fillers),
+            literal_after=tuple(tuple(_tokens(p)) for p in literal_after if _tokens(p)),
+            min_snap_chars=min_snap_chars,
+        )
+
+    def _free_text_at(self, words: Sequence[str], index: int) -> int:
+        """Length of the free-text prefix starting at `index`, or 0."""
+        for prefix in self.free_text_prefixes:
+            if tuple(words[index : index + len(prefix)]) == prefix:
+                return len(prefix)
+        return 0
+
+    def _literal_slot(self, out: Sequence[str]) -> bool:
+        """True if the next word is a workspace name (it follows a `literal_after` phrase)."""
+        return any(tuple(out[-len(phrase) :]) == phrase for phrase in self.literal_after)
+
+    def _snap(self, word: str) -> Optional[str]:
+        if word in self.vocabulary or _LITERAL_TOKEN.fullmatch(word):
+            return word
+        if len(word) < max(4, self.min_snap_chars - 1):
+            # Too short to tell a near miss from a different word (one
+            # dropped letter from a target still counts).
+            return None
+        close = difflib.get_close_matches(word, self._sorted_names, n=1, cutoff=self.snap_cutoff)
+        return close[0] if close else None
+
+    def constrain(self, text: str) -> Optional[GrammarMatch]:
+        """Map `text` onto the vocabulary; None when any word is out of grammar."""
+        words = _tokens(text)
+        if not words:
+            return None
+        out: List[str] = []
+        snapped: List[Tuple[str, str]] = []
+        i = 0
+        while i < len(words):
+            prefix_len = self._free_text_at(words, i)
+            if prefix_len:
+                out.extend(words[i:])
+                return GrammarMatch(" ".join(out), tuple(snapped), free_text=True)
+            if words[i] not in self.vocabulary and i + 1 < len(words):
+                # Whisper splits names it does not know into words: "fire fox".
+                joined = words[i] + words[i + 1]
+                if joined in self.names:
+                    snapped.append((f"{words[i]} {words[i + 1]}", joined))
+                    out.append(joined)
+                    i += 2
+                    continue
+            word = self._snap(words[i])
+            if word is None and self._literal_slot(out) and _WORKSPACE_NAME.fullmatch(words[i]):
+                word = words[i]
+            if word is None:
+                return None
+            if word != words[i]:
+                snapped.append((words[i], word))
+            out.append(word)
+            i += 1
+        if all(word in self.fillers for word in out):
+            return None
+        return GrammarMatch(" ".join(out), tuple(snapped))
+
+
+def _config_names(entry: Dict[str, Any]) -> List[str]:
+    names: List[str] = []
+    entry_id = entry.get("id")
+    if isinstance(entry_id, str) and entry_id.strip():
+        names.append(entry_id.strip())
+    aliases = entry.get("aliases", [])
+    if isinstance(aliases, list):
+        names.extend(a.strip() for a in aliases if isinstance(a, str) and a.strip())
+    return names
+
+
+def _build_prompt(app_names: Sequence[str], custom_phrases: Sequence[str], example_phrases: Sequence[str]) -> str:
+    """List-style prompt, most specific first; Whisper copies vocabulary and casing from it."""
+    apps = ", ".join(dict.fromkeys(n.lower() for n in app_names))
+    commands = ", ".join(dict.fromkeys([*(p.replace("_", " ") for p in custom_phrases), *example_phrases]))
+    prompt = ". ".join(part for part in (f"Apps: {apps}" if apps else "", commands) if part)
+    if len(prompt) > _PROMPT_MAX_CHARS:
+        prompt = prompt[:_PROMPT_MAX_CHARS].rsplit(",", 1)[0]
+    return f"{prompt}." if prompt else ""
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import re
+import shlex
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from alias_index import AliasIndex
+from command_grammar import CommandGrammar
+from hypr_state import WindowMatcher
+from intent_engine import IntentEngine
+
+
+class ConfigError(ValueError):
+    """The command config file cannot be used; the message lists every problem."""
+
+
+def _string_list_problems(where: str, value: Any) -> List[str]:
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        return [f"{where} must be a list of strings"]
+    return []
+
+
+def _app_problems(where: str, app: Dict[str, Any]) -> List[str]:
+    problems: List[str] = []
+    for key in ("id", "launch", "close"):
+        if key in app and not isinstance(app[key], str):
+            problems.append(f"{where}.{key} must be a string")
+    if "aliases" in app:
+        problems.extend(_string_list_problems(f"{where}.aliases", app["aliases"]))
+    match = app.get("match", {})
+    if not isinstance(match, dict):
+        problems.append(f"{where}.match must be an object")
+    else:
+        for key in ("class_contains", "title_contains"):
+            if key in match:
+                problems.extend(_string_list_problems(f"{where}.match.{key}", match[key]))
+    return problems
+
+
+def _command_problems(where: str, entry: Dict[str, Any]) -> List[str]:
+    problems: List[str] = []
+    for key in ("id", "notify", "dispatch", "exec", "cwd"):
+        if key in entry and not isinstance(entry[key], str):
+            problems.append(f"{where}.{key} must be a string")
+    for key in ("aliases", "dispatches", "patterns"):
+        if key in entry:
+            problems.extend(_string_list_problems(f"{where}.{key}", entry[key]))
+    if "detached" in entry and not isinstance(entry["detached"], bool):
+        problems.append(f"{where}.detached must be true or false")
+    for pattern in entry.get("patterns", []) if isinstance(entry.get("patterns"), list) else []:
+        try:
+            re.compile(f"(?:{pattern})")
+        except (re.error, TypeError) as exc:
+            problems.append(f"{where}.patterns {pattern!r}: {exc}")
+    lines = [entry.get("dispatch")] if isinstance(entry.get("dispatch"), str) else []
+    lines += entry.get("dispatches", []) if isinstance(entry.get("dispatches"), list) else []
+    for line in lines:
+        try:
+            shlex.split(str(line))
+        except ValueError as exc:
+            problems.append(f"{where} dispatch {line!r}: {exc}")
+    if not any(str(entry.get(key) or "").strip() for key in ("dispatch", "exec")) and not entry.get("dispatches"):
+        problems.append(f"{where} needs one of dispatch, dispatches or exec")
+    return problems
+
+
+def validate_config(user_cfg: Any, merged_cfg: Optional[Dict[str, Any]] = None) -> None:
+    """Raise `ConfigError` unless the config file's content is usable.
+
+    `user_cfg` is the parsed file, checked for top-level shape; `merged_cfg`
+    (the file over the defaults) is checked entry by entry, so an entry that
+    only overrides a default's aliases still counts as having an action.
+    """
+    if not isinstance(user_cfg, dict):
+        raise ConfigError("top level must be a JSON object")
+    problems: List[str] = []
+    for key, kind, name in (("apps", list, "a list"), ("commands", list, "a list"), ("search", dict, "an object")):
+        if key in user_cfg and not isinstance(user_cfg[key], kind):
+            problems.append(f"{key} must be {name}")
+    cfg = merged_cfg if merged_cfg is not None else user_cfg
+    for i, app in enumerate(cfg.get("apps", []) if isinstance(cfg.get("apps"), list) else []):
+        if not isinstance(app, dict):
+            problems.append(f"apps[{i}] must be an object")
+        else:
+            problems.extend(_app_problems(f"apps[{i}] ({app.get('id', '?')})", app))
+    for i, entry in enumerate(cfg.get("commands", []) if isinstance(cfg.get("commands"), list) else []):
+        if not isinstance(entry, dict):
+            problems.append(f"commands[{i}] must be an object")
+        else:
+            problems.extend(_command_problems(f"commands[{i}] ({entry.get('id', '?')})", entry))
+    search = cfg.get("search", {})
+    if isinstance(search, dict):
+        engines = search.get("engines", {})
+        if not isinstance(engines, dict):
+            problems.append("search.engines must be an object")
+        else:
+            for name, template in engines.items():
+                if not isinstance(template, str) or "{query}" not in template:
+                    problems.append(f"search.engines.{name} must be a URL containing {{query}}")
+            default_engine = search.get("default_engine", "")
+            if default_engine and default_engine not in engines:
+                problems.append(f"search.default_engine {default_engine!r} is not in search.engines")
+    if problems:
+        raise ConfigError("; ".join(problems))
+
+
+@dataclass(frozen=True)
+class CustomCommand:
+    """One `commands[*]` entry, with its dispatch lines split and joined once."""
+
+    id: str
+    notify: str
+    dispatches: Tuple[str, ...] = ()
+    exec_cmd: str = ""
+    cwd: Optional[str] = None
+    detached: bool = True
+
+    @classmethod
+    def from_config(cls, entry: Dict[str, Any]) -> "CustomCommand":
+        command_id = str(entry.get("id", "custom"))
+        raw = entry.get("dispatches") if isinstance(entry.get("dispatches"), list) else []
+        lines = [str(x).strip() for x in raw if isinstance(x, str) and x.strip()]
+        if not lines and isinstance(entry.get("dispatch"), str) and entry["dispatch"].strip():
+            lines = [entry["dispatch"].strip()]
+        cwd = entry.get("cwd", "")
+        return cls(
+            id=command_id,
+            notify=str(entry.get("notify", command_id)),
+            # `hyprctl dispatch` joined its shell-split arguments with spaces.
+            dispatches=tuple(" ".join(shlex.split(line)) for line in lines),
+            exec_cmd=str(entry.get("exec", "") or "").strip(),
+            cwd=str(Path(cwd).expanduser()) if isinstance(cwd, str) and cwd.strip() else None,
+            detached=bool(entry.get("detached", True)),
+        )
+
+
+@dataclass(frozen=True)
+class CommandModel:
+    """Everything command execution needs from one version of the config, compiled.
+
+    Built off the hot path (at startup and on each config reload) and never
+    mutated, so a reload swaps the whole model in one reference assignment
+    and a command that is already running keeps the model it started with.
+    """
+
+    cfg: Mapping[str, Any]
+    intents: IntentEngine
+    apps: AliasIndex
+    commands: AliasIndex
+    search_template: str
+    grammar: Optional[CommandGrammar] = None
+    version: int = 0
+    source: str = ""
+    _matchers: Mapping[int, WindowMatcher] = field(default_factory=dict, repr=False)
+
+    @staticmethod
+    def freeze_matchers(apps: List[Dict[str, Any]]) -> Mapping[int, WindowMatcher]:
+        return MappingProxyType({id(app): WindowMatcher.from_config(app.get("match", {})) for app in apps})
+
+    def matcher_for(self, app: Dict[str, Any]) -> WindowMatcher:
+        """The compiled `match` rules of one of this model's apps."""
+        matcher = self._matchers.get(id(app))
+        return matcher if matcher is not None else WindowMatcher.from_config(app.get("match", {}))
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+# Editors save in place (close-write) or write a temp file and rename it over (moved-to).
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len; then `len` bytes of name
+
+_POLL_SECONDS = 1.0
+
+
+def _inotify_fd(directory: Path) -> Optional[int]:
+    """An inotify fd watching `directory`, or None where inotify is unavailable."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(str(directory)), _WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+def _names(buf: bytes) -> List[str]:
+    names = []
+    offset = 0
+    while offset + _EVENT_HEADER.size <= len(buf):
+        _wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+        offset += _EVENT_HEADER.size
+        names.append(buf[offset : offset + length].rstrip(b"\0").decode("utf-8", errors="replace"))
+        offset += length
+    return names
+
+
+class ConfigWatcher(Generic[T]):
+    """Keeps a value compiled from a config file current while the daemon runs.
+
+    `load()` reads, validates and compiles the file; it raises on a bad
+    file. `current` is replaced only by a successful load, in a single
+    reference assignment, so readers never see a half-built value and a bad
+    edit leaves the previous one live (`on_error` is told why). If the very
+    first load fails, `fallback()` provides the value. The watch thread
+    uses inotify on the file's directory, so editor save-by-rename is
+    seen too, and waits `debounce_seconds` of quiet before loading. Where
+    inotify is unavailable it polls the file's mtime instead.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        load: Callable[[], T],
+        fallback: Callable[[], T],
+        on_error: Callable[[Exception], None],
+        on_reload: Optional[Callable[[T], None]] = None,
+        debounce_seconds: float = 0.2,
+        name: str = "config-watch",
+    ) -> None:
+        self.path = Path(path)
+        self.name = name
+        self.reloads = 0
+        self.failures = 0
+        self._load = load
+        self._fallback = fallback
+        self._on_error = on_error
+        self._on_reload = on_reload
+        self._debounce = max(0.0, debounce_seconds)
+        self._current: Optional[T] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def current(self) -> T:
+        current = self._current
+        if current is None:
+            with self._lock:
+                if self._current is None:
+                    self.reload()
+                current = self._current
+        assert current is not None
+        return current
+
+    def reload(self) -> bool:
+        """Load the file now; True if the new value is live."""
+        try:
+            value = self._load()
+        except Exception as exc:
+            self.failures += 1
+            if self._current is None:
+                self._current = self._fallback()
+            self._on_error(exc)
+            return False
+        self._current = value
+        self.reloads += 1
+        if self._on_reload is not None:
+            self._on_reload(value)
+        return True
+
+    def start(self) -> None:
+        """Start watching; safe to call again, also right after `stop()`."""
+        if self._thread is not None and self._thread.is_alive():
+            if not self._stop.is_set():
+                return
+            # The stopped thread would exit after we return; let it finish first.
+            self._thread.join()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _mtime(self) -> float:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def _watch(self) -> None:
+        fd = _inotify_fd(self.path.parent)
+        if fd is None:
+            self._poll()
+            return
+        try:
+            while not self._stop.is_set():
+                if not self._wait_for_change(fd, None):
+                    continue
+                # Let the editor finish (several writes, rename, chmod) first.
+                while self._wait_for_change(fd, self._debounce):
+                    pass
+                if self.path.exists():
+                    self.reload()
+        finally:
+            os.close(fd)
+
+    def _wait_for_change(self, fd: int, timeout: Optional[float]) -> bool:
+        """True once an event for our file arrived within `timeout` (None: until stopped)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stop.is_set():
+            wait = _POLL_SECONDS if deadline is None else min(_POLL_SECONDS, deadline - time.monotonic())
+            if wait <= 0.0:
+                return False
+            ready, _, _ = select.select([fd], [], [], wait)
+            if not ready:
+                continue
+            try:
+                buf = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            if self.path.name in _names(buf):
+                return True
+        return False
+
+    def _poll(self) -> None:
+        seen = self._mtime()
+        while not self._stop.wait(_POLL_SECONDS):
+            mtime = self._mtime()
+            if mtime != seen and mtime:
+                seen = mtime
+                self.reload()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import os
+import select
+import socket
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+Handler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+# One request is one JSON object per line; anything larger is a protocol error.
+_MAX_LINE_BYTES = 64 * 1024
+
+# A daemon spawned with a readiness pipe finds the write end's fd number here.
+READY_FD_ENV = "LOCAL_SPEECH_READY_FD"
+
+
+def notify_ready() -> None:
+    """Tell the spawning CLI we are up (control socket listening); no-op otherwise."""
+    raw = os.environ.pop(READY_FD_ENV, "").strip()
+    if not raw:
+        return
+    try:
+        fd = int(raw)
+    except ValueError:
+        return
+    try:
+        os.write(fd, b"ready\n")
+    except OSError:
+        pass
+    finally:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+def wait_ready(read_fd: int, timeout: float) -> bool:
+    """Block until the child calls `notify_ready()`; False on timeout or early exit. Closes `read_fd`."""
+    try:
+        ready, _, _ = select.select([read_fd], [], [], max(0.0, timeout))
+        return bool(ready) and os.read(read_fd, 16).startswith(b"ready")
+    except OSError:
+        return False
+    finally:
+        os.close(read_fd)
+
+
+def send_request(path: Path, payload: Dict[str, Any], timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+    """Send one request and wait for its reply; None when nobody is listening."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline(_MAX_LINE_BYTES)
+    except OSError:
+        return None
+    finally:
+        sock.close()
+    try:
+        reply = json.loads(line.decode("utf-8"))
+    except ValueError:
+        return None
+    return reply if isinstance(reply, dict) else None
+
+
+class ControlServer:
+    """Line-delimited JSON request/reply server on a Unix stream socket.
+
+    Each connection gets its own thread and may send several requests. The
+    handler runs on that thread and must return a JSON-serializable dict; an
+    exception becomes `{"ok": false, "error": ...}`. The socket is created
+    0600 so only the session user can drive it.
+    """
+
+    def __init__(self, path: Path, handler: Handler, name: str = "control-socket") -> None:
+        self.path = Path(path)
+        self.name = name
+        self._handler = handler
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self._conns: List[socket.socket] = []
+        self._conns_lock = threading.Lock()
+
+    def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(str(self.path))
+        finally:
+            os.umask(old_umask)
+        sock.listen(8)
+        self._sock = sock
+        self._thread = threading.Thread(target=self._accept_loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _accept_loop(self) -> None:
+        while not self._closed.is_set():
+            sock = self._sock
+            if sock is None:
+                return
+            try:
+                conn, _addr = sock.accept()
+            except OSError:
+                return
+            with self._conns_lock:
+                self._conns.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), name=f"{self.name}-conn", daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        try:
+            with conn.makefile("rb") as reader:
+                while not self._closed.is_set():
+                    line = reader.readline(_MAX_LINE_BYTES)
+                    if not line:
+                        return
+                    try:
+                        request = json.loads(line.decode("utf-8"))
+                        if not isinstance(request, dict):
+                            raise ValueError("request must be a JSON object")
+                        reply = self._handler(request)
+                    except Exception as exc:
+                        reply = {"ok": False, "error": str(exc)}
+                    conn.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+        except OSError:
+            pass
+        finally:
+            with self._conns_lock:
+                if conn in self._conns:
+                    self._conns.remove(conn)
+            conn.close()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
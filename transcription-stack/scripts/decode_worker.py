@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, List, Optional
+
+from audio_ring_buffer import AudioWindow
+from token_stabilizer import EMPTY_HYPOTHESIS, Hypothesis
+
+
+@dataclass(frozen=True)
+class DecodeJob:
+    window: AudioWindow
+    submitted_ts: float
+    epoch: int
+    pad_seconds: float = 0.0
+    prompt: str = ""
+
+
+@dataclass(frozen=True)
+class DecodeResult:
+    job: DecodeJob
+    hypothesis: Hypothesis
+    started_ts: float
+    finished_ts: float
+
+    @property
+    def text(self) -> str:
+        return self.hypothesis.text
+
+    @property
+    def decode_seconds(self) -> float:
+        return self.finished_ts - self.started_ts
+
+    @property
+    def latency_seconds(self) -> float:
+        return self.finished_ts - self.job.submitted_ts
+
+
+class DecodeWorker:
+    """Background decoder with a single latest-wins job slot.
+
+    `submit()` never blocks: a window that is still waiting when a newer one
+    arrives is dropped (counted in `superseded`) rather than decoded late.
+    Finished hypotheses are collected with `poll()`. `cancel()` bumps the
+    epoch so anything queued or in flight for an older transcript state is
+    discarded. `decode_now()` runs a synchronous decode (used for flushes)
+    serialized with the worker through the model lock. `on_result` is
+    called on the worker thread after each result is queued, so the loop can
+    sleep until there is something to `poll()`.
+    """
+
+    def __init__(
+        self,
+        decode: Callable[[DecodeJob], Hypothesis],
+        name: str = "decode-worker",
+        on_result: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._decode = decode
+        self._on_result = on_result
+        self._cond = threading.Condition()
+        self._model_lock = threading.Lock()
+        self._pending: Optional[DecodeJob] = None
+        self._results: Deque[DecodeResult] = deque()
+        self._epoch = 0
+        self._closed = False
+        self.superseded = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, window: AudioWindow, submitted_ts: float, prompt: str = "") -> None:
+        with self._cond:
+            if self._pending is not None:
+                self.superseded += 1
+            self._pending = DecodeJob(window=window, submitted_ts=submitted_ts, epoch=self._epoch, prompt=prompt)
+            self._cond.notify()
+
+    def poll(self) -> List[DecodeResult]:
+        with self._cond:
+            out = list(self._results)
+            self._results.clear()
+        return out
+
+    def cancel(self) -> None:
+        with self._cond:
+            self._epoch += 1
+            self._pending = None
+            self._results.clear()
+
+    def decode_now(self, window: AudioWindow, pad_seconds: float = 0.0, prompt: str = "") -> Hypothesis:
+        """Drop queued work and decode `window` on the calling thread."""
+        self.cancel()
+        job = DecodeJob(
+            window=window,
+            submitted_ts=time.monotonic(),
+            epoch=self._epoch,
+            pad_seconds=pad_seconds,
+            prompt=prompt,
+        )
+        with self._model_lock:
+            return self._decode(job)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            self._cond.notify()
+        self._thread.join(timeout=30)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job = self._pending
+                self._pending = None
+
+            started = time.monotonic()
+            try:
+                with self._model_lock:
+                    hypothesis = self._decode(job)
+            except Exception:
+                hypothesis = EMPTY_HYPOTHESIS
+            finished = time.monotonic()
+
+            with self._cond:
+                delivered = job.epoch == self._epoch and not self._closed
+                if delivered:
+                    self._results.append(DecodeResult(job=job, hypothesis=hypothesis, started_ts=started, finished_ts=finished))
+            if delivered and self._on_result is not None:
+                self._on_result()
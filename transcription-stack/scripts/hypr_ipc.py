@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+# Hyprland separates the replies of a `[[BATCH]]` request with this.
+BATCH_REPLY_SEP = "\n\n\n"
+_READ_CHUNK = 64 * 1024
+
+
+def instance_dir() -> Optional[Path]:
+    """Runtime dir of the Hyprland instance we run under, like `hyprctl` picks it.
+
+    `HYPRLAND_INSTANCE_SIGNATURE` wins; without it (a service started before
+    the session exported it) the most recently started instance is used.
+    Hyprland < 0.40 kept its sockets under /tmp/hypr.
+    """
+    bases = []
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", "").strip()
+    if runtime_dir:
+        bases.append(Path(runtime_dir) / "hypr")
+    bases.append(Path("/tmp/hypr"))
+
+    signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE", "").strip()
+    if signature:
+        for base in bases:
+            if (base / signature / ".socket.sock").exists():
+                return base / signature
+        return bases[0] / signature
+
+    candidates = []
+    for base in bases:
+        try:
+            candidates.extend(p for p in base.iterdir() if (p / ".socket.sock").exists())
+        except OSError:
+            continue
+    if not candidates:
+        return None
+    return max(candidates, key=lambda p: p.stat().st_mtime)
+
+
+class HyprIpcError(OSError):
+    pass
+
+
+class HyprIpc:
+    """Client for Hyprland's request socket (`.socket.sock`), in place of `hyprctl`.
+
+    Hyprland answers one request per connection and then closes it, so each
+    call is a connect/send/read-to-EOF round trip on a Unix socket; what is
+    kept across calls is the resolved socket path. Requests use hyprctl's
+    wire format: `j/clients` for JSON, `dispatch <args>`, and
+    `[[BATCH]]cmd1;j/cmd2` for several commands in one round trip. Failures
+    raise `HyprIpcError`; a failed connect drops the cached path so a
+    restarted compositor is picked up on the next call.
+    """
+
+    def __init__(self, socket_path: Optional[Path] = None, timeout: float = 2.0) -> None:
+        self._fixed_path = Path(socket_path) if socket_path is not None else None
+        self._path: Optional[Path] = self._fixed_path
+        self.timeout = timeout
+
+    @property
+    def socket_path(self) -> Optional[Path]:
+        if self._path is None:
+            directory = instance_dir()
+            self._path = directory / ".socket.sock" if directory is not None else None
+        return self._path
+
+    def request(self, command: str) -> str:
+        """Send one raw request and return the raw reply."""
+        path = self.socket_path
+        if path is None:
+            raise HyprIpcError("no Hyprland instance socket found")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            try:
+                sock.connect(str(path))
+            except OSError:
+                self._path = self._fixed_path
+                raise
+            sock.sendall(command.encode("utf-8"))
+            chunks: List[bytes] = []
+            while True:
+                chunk = sock.recv(_READ_CHUNK)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except OSError as exc:
+            raise HyprIpcError(f"{command.split(' ', 1)[0]!r} via {path}: {exc}") from exc
+        finally:
+            sock.close()
+        return b"".join(chunks).decode("utf-8", errors="replace")
+
+    def query(self, command: str) -> Any:
+        """JSON query such as `clients` or `activewindow`; the parsed reply."""
+        reply = self.request(f"j/{command}")
+        try:
+            return json.loads(reply)
+        except ValueError as exc:
+            raise HyprIpcError(f"{command!r}: bad JSON reply {reply[:80]!r}") from exc
+
+    def batch(self, commands: Sequence[str], json_replies: bool = False) -> List[str]:
+        """Run `commands` in one request; one reply per command."""
+        commands = [c.strip() for c in commands if c.strip()]
+        if not commands:
+            return []
+        if json_replies:
+            # Flags only apply per command inside a batch.
+            commands = [f"j/{c}" for c in commands]
+        if len(commands) == 1 or any(";" in c for c in commands):
+            # Hyprland splits a batch on every ';', quoted or not.
+            return [self.request(c) for c in commands]
+        replies = self.request(f"[[BATCH]]{';'.join(commands)}").split(BATCH_REPLY_SEP)
+        if len(replies) != len(commands):
+            raise HyprIpcError(f"batch of {len(commands)} got {len(replies)} replies")
+        return replies
+
+    def query_many(self, commands: Sequence[str]) -> List[Any]:
+        """Several JSON queries in one round trip."""
+        parsed: List[Any] = []
+        for command, reply in zip(commands, self.batch(commands, json_replies=True)):
+            try:
+                parsed.append(json.loads(reply))
+            except ValueError as exc:
+                raise HyprIpcError(f"{command!r}: bad JSON reply {reply[:80]!r}") from exc
+        return parsed
+
+    def dispatch(self, *commands: str) -> bool:
+        """Run dispatcher lines (`"focuswindow address:0x..."`) in one request; True if all replied ok."""
+        replies = self.batch([f"dispatch {c}" for c in commands])
+        return bool(replies) and all(reply.strip() == "ok" for reply in replies)
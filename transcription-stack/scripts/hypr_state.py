@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import re
+import socket
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Pattern
+
+from hypr_ipc import HyprIpc, HyprIpcError
+
+_RECONNECT_MIN_SECONDS = 0.5
+_RECONNECT_MAX_SECONDS = 10.0
+
+
+def _address(raw: str) -> str:
+    """socket2 events carry bare hex addresses; `clients -j` uses 0x-prefixed ones."""
+    raw = raw.strip()
+    if not raw or raw == ",":
+        return ""
+    return raw if raw.startswith("0x") else f"0x{raw}"
+
+
+def _contains_pattern(tokens: Iterable[Any]) -> Optional[Pattern[str]]:
+    words = [re.escape(t.lower()) for t in tokens if isinstance(t, str) and t]
+    return re.compile("|".join(words)) if words else None
+
+
+@dataclass(frozen=True)
+class WindowMatcher:
+    """Precompiled `match.class_contains` / `match.title_contains` of one app."""
+
+    class_pattern: Optional[Pattern[str]] = None
+    title_pattern: Optional[Pattern[str]] = None
+
+    @classmethod
+    def from_config(cls, match: Any) -> "WindowMatcher":
+        if not isinstance(match, dict):
+            return cls()
+        class_contains = match.get("class_contains", [])
+        title_contains = match.get("title_contains", [])
+        return cls(
+            _contains_pattern(class_contains if isinstance(class_contains, list) else []),
+            _contains_pattern(title_contains if isinstance(title_contains, list) else []),
+        )
+
+    def matches(self, client: Dict[str, Any]) -> bool:
+        if self.class_pattern is not None and self.class_pattern.search(str(client.get("class", "")).lower()):
+            return True
+        if self.title_pattern is not None and self.title_pattern.search(str(client.get("title", "")).lower()):
+            return True
+        return False
+
+
+class HyprState:
+    """Live client/workspace model kept current from Hyprland's event socket.
+
+    A listener thread reads `.socket2.sock` and applies openwindow,
+    closewindow, movewindow(v2), windowtitle(v2), activewindowv2,
+    workspace(v2) and focusedmon to an in-memory copy of `clients -j` plus
+    the active workspace and window, so resolving and dispatching a command
+    needs no queries. The model is refetched (one batched IPC request) only
+    when it is out of sync: before the first event connection, after the
+    event socket drops, or when an event names a window it has never seen.
+    Without an event connection every read refetches, which is the old
+    query-per-command behaviour.
+
+    Client dicts keep the `clients -j` shape (`address`, `class`, `title`,
+    `workspace: {"id", "name"}`) and are copied out, so callers can hold them.
+    """
+
+    def __init__(self, ipc: HyprIpc, name: str = "hypr-events") -> None:
+        self.ipc = ipc
+        self.name = name
+        self.events = 0
+        self.refreshes = 0
+        self._lock = threading.RLock()
+        self._clients: Dict[str, Dict[str, Any]] = {}
+        self._active_workspace = ""
+        self._active_address = ""
+        self._synced = False
+        self._connected = False
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start following events; safe to call again, also right after `stop()`."""
+        if self._thread is not None and self._thread.is_alive():
+            if not self._stop.is_set():
+                return
+            # The stopped thread would exit after we return; let it finish first.
+            self._thread.join()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    @property
+    def live(self) -> bool:
+        """True while the model is event-fed and in sync (reads need no query)."""
+        with self._lock:
+            return self._connected and self._synced
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._synced = False
+
+    def clients(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_synced()
+            return [dict(c, workspace=dict(c.get("workspace") or {})) for c in self._clients.values()]
+
+    def active_workspace(self) -> str:
+        with self._lock:
+            self._ensure_synced()
+            return self._active_workspace
+
+    def active_address(self) -> str:
+        with self._lock:
+            self._ensure_synced()
+            return self._active_address
+
+    def _ensure_synced(self) -> None:
+        if self._connected and self._synced:
+            return
+        try:
+            clients, workspace, window = self.ipc.query_many(["clients", "activeworkspace", "activewindow"])
+        except HyprIpcError:
+            # Keep whatever we had; the next read tries again.
+            return
+        self.refreshes += 1
+        self._clients = {}
+        for client in clients if isinstance(clients, list) else []:
+            if isinstance(client, dict) and client.get("address"):
+                self._clients[str(client["address"])] = client
+        self._active_workspace = str(workspace.get("name", "")).strip() if isinstance(workspace, dict) else ""
+        self._active_address = str(window.get("address", "")).strip() if isinstance(window, dict) else ""
+        self._synced = True
+
+    def _listen(self) -> None:
+        delay = _RECONNECT_MIN_SECONDS
+        while not self._stop.is_set():
+            path = self.ipc.socket_path
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                if path is None:
+                    raise OSError("no Hyprland instance socket found")
+                sock.connect(str(path.with_name(".socket2.sock")))
+            except OSError:
+                sock.close()
+                self._stop.wait(delay)
+                delay = min(_RECONNECT_MAX_SECONDS, delay * 2)
+                continue
+            delay = _RECONNECT_MIN_SECONDS
+            self._sock = sock
+            with self._lock:
+                # Anything may have changed while we were not listening; sync
+                # now so the first command after a (re)connect needs no query.
+                self._connected = True
+                self._synced = False
+                self._ensure_synced()
+            try:
+                self._read_events(sock)
+            finally:
+                with self._lock:
+                    self._connected = False
+                    self._synced = False
+                self._sock = None
+                sock.close()
+
+    def _read_events(self, sock: socket.socket) -> None:
+        pending = b""
+        while not self._stop.is_set():
+            try:
+                chunk = sock.recv(65536)
+            except OSError:
+                return
+            if not chunk:
+                return
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            with self._lock:
+                for line in lines:
+                    event, sep, data = line.decode("utf-8", errors="replace").partition(">>")
+                    if sep:
+                        self.events += 1
+                        self.apply(event, data)
+
+    def apply(self, event: str, data: str) -> None:
+        """Apply one socket2 event (`event>>data`) to the model."""
+        with self._lock:
+            if not self._synced:
+                # The next read refetches everything anyway.
+                return
+            if event == "openwindow":
+                address, workspace, cls, title = (data.split(",", 3) + ["", "", ""])[:4]
+                address = _address(address)
+                if address:
+                    self._clients[address] = {
+                        "address": address,
+                        "class": cls,
+                        "title": title,
+                        "workspace": {"name": workspace},
+                    }
+            elif event == "closewindow":
+                address = _address(data)
+                self._clients.pop(address, None)
+                if address == self._active_address:
+                    self._active_address = ""
+            elif event == "movewindowv2":
+                address, workspace_id, workspace = (data.split(",", 2) + ["", ""])[:3]
+                self._set_workspace(_address(address), workspace, workspace_id)
+            elif event == "movewindow":
+                address, _, workspace = data.partition(",")
+                self._set_workspace(_address(address), workspace, None)
+            elif event == "windowtitlev2":
+                address, _, title = data.partition(",")
+                client = self._client(_address(address))
+                if client is not None:
+                    client["title"] = title
+            elif event == "activewindowv2":
+                self._active_address = _address(data)
+            elif event == "workspacev2":
+                self._active_workspace = data.partition(",")[2].strip()
+            elif event == "workspace":
+                self._active_workspace = data.strip()
+            elif event == "focusedmon":
+                self._active_workspace = data.partition(",")[2].strip()
+
+    def _client(self, address: str) -> Optional[Dict[str, Any]]:
+        client = self._clients.get(address)
+        if client is None and address:
+            # A window we never saw open: we missed events.
+            self._synced = False
+        return client
+
+    def _set_workspace(self, address: str, name: str, workspace_id: Optional[str]) -> None:
+        client = self._client(address)
+        if client is None:
+            return
+        workspace = dict(client.get("workspace") or {})
+        workspace["name"] = name.strip()
+        if workspace_id is not None:
+            try:
+                workspace["id"] = int(workspace_id)
+            except ValueError:
+                workspace.pop("id", None)
+        client["workspace"] = workspace
+
@@ -6,6 +6,8 @@ Hotkeys:
 - Double RIGHT Ctrl: toggle voice-command mode.
 
 Modes are strictly mutually exclusive. Starting one mode stops the other first.
+When local-speech-engine is running, modes are switched over its socket
+instead of starting/stopping separate daemons.
 """
 
 from __future__ import annotations
@@ -25,6 +27,8 @@ except Exception as exc:
     print(f"[double-ctrl] Failed to import evdev: {exc}", file=sys.stderr, flush=True)
     sys.exit(1)
 
+from control_socket import send_request
+
 LEFT_CTRL_CODE = ecodes.KEY_LEFTCTRL
 RIGHT_CTRL_CODE = ecodes.KEY_RIGHTCTRL
 CTRL_CODES = {LEFT_CTRL_CODE, RIGHT_CTRL_CODE}
@@ -44,7 +48,10 @@ UID = os.getuid()
 XDG_RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{UID}")
 DICTATION_PID_FILE = Path(XDG_RUNTIME_DIR) / "local-live-dictation" / "loop.pid"
 DICTATION_TYPING_FILE = Path(XDG_RUNTIME_DIR) / "local-live-dictation" / "typing.on"
+DICTATION_SOCKET = Path(XDG_RUNTIME_DIR) / "local-live-dictation" / "control.sock"
 VOICE_COMMAND_PID_FILE = Path(XDG_RUNTIME_DIR) / "local-voice-commands" / "loop.pid"
+VOICE_COMMAND_SOCKET = Path(XDG_RUNTIME_DIR) / "local-voice-commands" / "control.sock"
+SPEECH_ENGINE_SOCKET = Path(XDG_RUNTIME_DIR) / "local-speech-engine" / "control.sock"
 
 ENABLE_START_SOUND = os.environ.get("LOCAL_DICT_ENABLE_START_SOUND", "0").strip().lower() not in {"0", "false", "no", "off"}
 ENABLE_STOP_SOUND = os.environ.get("LOCAL_DICT_ENABLE_STOP_SOUND", "1").strip().lower() not in {"0", "false", "no", "off"}
@@ -163,6 +170,76 @@ def _run_mode_cmd(argv: list[str], timeout: float = 20.0) -> tuple[int, str]:
     return rc, out
 
 
+def _engine_mode(mode: str, **extra) -> tuple[int, dict] | None:
+    """Switch the resident speech engine; None when it is not running."""
+    if not SPEECH_ENGINE_SOCKET.exists():
+        return None
+    reply = send_request(SPEECH_ENGINE_SOCKET, {"cmd": "mode", "mode": mode, **extra}, timeout=20.0)
+    if reply is None:
+        return None
+    return (0 if reply.get("ok") else 1), reply
+
+
+def _daemon_request(path: Path, payload: dict) -> dict | None:
+    """One request to a running daemon's control socket; None if it does not answer."""
+    if not path.exists():
+        return None
+    reply = send_request(path, payload, timeout=5.0)
+    return reply if reply is not None and reply.get("ok") else None
+
+
+def _start_dictation() -> tuple[int, str]:
+    engine = _engine_mode("dictation", typing=True)
+    if engine is not None:
+        rc, reply = engine
+        if rc != 0:
+            return rc, str(reply.get("error") or "engine error")
+        already = reply.get("previous") == "dictation" and reply.get("was_typing")
+        return 0, "already-on" if already else "typing-on"
+    _stop_voice_commands_for_switch()
+    if _dictation_running():
+        reply = _daemon_request(DICTATION_SOCKET, {"cmd": "typing", "on": True})
+        if reply is not None:
+            return 0, "already-on" if reply.get("was_typing") else "typing-on"
+    return _run_mode_cmd([LOCAL_DICTATION_CMD, "start"], timeout=20)
+
+
+def _stop_dictation() -> tuple[int, str]:
+    engine = _engine_mode("dictation", if_mode="dictation", typing=False)
+    if engine is not None:
+        rc, reply = engine
+        if rc != 0:
+            return rc, str(reply.get("error") or "engine error")
+        return 0, "typing-off" if reply.get("was_typing") else "already-off"
+    reply = _daemon_request(DICTATION_SOCKET, {"cmd": "typing", "on": False})
+    if reply is not None:
+        return 0, "typing-off" if reply.get("was_typing") else "already-off"
+    return _run_mode_cmd([LOCAL_DICTATION_CMD, "stop"], timeout=15)
+
+
+def _start_voice_commands() -> tuple[int, str]:
+    engine = _engine_mode("commands")
+    if engine is not None:
+        rc, reply = engine
+        if rc != 0:
+            return rc, str(reply.get("error") or "engine error")
+        return 0, "already-running" if reply.get("previous") == "commands" else "started"
+    _stop_dictation_daemon_for_switch()
+    return _run_mode_cmd([VOICE_COMMANDS_CMD, "start"], timeout=20)
+
+
+def _stop_voice_commands() -> tuple[int, str]:
+    engine = _engine_mode("idle", if_mode="commands")
+    if engine is not None:
+        rc, reply = engine
+        if rc != 0:
+            return rc, str(reply.get("error") or "engine error")
+        return 0, "stopped" if reply.get("changed") else "already-stopped"
+    if _daemon_request(VOICE_COMMAND_SOCKET, {"cmd": "stop"}) is not None:
+        return 0, "stopped"
+    return _run_mode_cmd([VOICE_COMMANDS_CMD, "stop"], timeout=15)
+
+
 def _show_mic_indicator(on: bool) -> None:
     try:
         subprocess.Popen(
@@ -205,12 +282,16 @@ def _notify(summary: str, body: str = "") -> None:
 def _stop_dictation_daemon_for_switch() -> None:
     if not _dictation_running():
         return
+    if _daemon_request(DICTATION_SOCKET, {"cmd": "shutdown"}) is not None:
+        return
     _run_mode_cmd([LOCAL_DICTATION_CMD, "daemon-stop"], timeout=25)
 
 
 def _stop_voice_commands_for_switch() -> None:
     if not _voice_commands_running():
         return
+    if _daemon_request(VOICE_COMMAND_SOCKET, {"cmd": "stop"}) is not None:
+        return
     _run_mode_cmd([VOICE_COMMANDS_CMD, "stop"], timeout=20)
 
 
@@ -228,9 +309,8 @@ def _trigger_dictation(now: float, last_dictation_on_ts: float) -> float:
     print(f"[double-ctrl] trigger -> dictation {action}", flush=True)
 
     if action == "start":
-        _stop_voice_commands_for_switch()
         _notify("Dictation", "Starting (commands off)...")
-        rc, out = _run_mode_cmd([LOCAL_DICTATION_CMD, "start"], timeout=20)
+        rc, out = _start_dictation()
         ok = rc == 0 and out in {"started", "typing-on", "already-on", "already-running"}
         if ok:
             _play_state_sound(True)
@@ -241,7 +321,7 @@ def _trigger_dictation(now: float, last_dictation_on_ts: float) -> float:
         print(f"[double-ctrl] dictation start failed rc={rc} out={out}", flush=True)
         return last_dictation_on_ts
 
-    rc, out = _run_mode_cmd([LOCAL_DICTATION_CMD, "stop"], timeout=15)
+    rc, out = _stop_dictation()
     ok = rc == 0 and out in {"typing-off", "already-off", "stopped", "already-stopped"}
     if ok:
         _play_state_sound(False)
@@ -268,9 +348,8 @@ def _trigger_voice_commands(now: float, last_commands_on_ts: float) -> float:
     print(f"[double-ctrl] trigger -> voice-commands {action}", flush=True)
 
     if action == "start":
-        _stop_dictation_daemon_for_switch()
         _notify("Voice Commands", "Starting (dictation off)...")
-        rc, out = _run_mode_cmd([VOICE_COMMANDS_CMD, "start"], timeout=20)
+        rc, out = _start_voice_commands()
         ok = rc == 0 and out in {"started", "already-running"}
         if ok:
             _play_state_sound(True)
@@ -281,7 +360,7 @@ def _trigger_voice_commands(now: float, last_commands_on_ts: float) -> float:
         print(f"[double-ctrl] voice-commands start failed rc={rc} out={out}", flush=True)
         return last_commands_on_ts
 
-    rc, out = _run_mode_cmd([VOICE_COMMANDS_CMD, "stop"], timeout=15)
+    rc, out = _stop_voice_commands()
     ok = rc == 0 and out in {"stopped", "already-stopped"}
     if ok:
         _play_state_sound(False)
@@ -316,8 +395,7 @@ def _bootstrap_default_mode() -> tuple[float, float]:
         time.sleep(DEFAULT_MODE_DELAY_SECONDS)
 
     if mode == "commands":
-        _stop_dictation_daemon_for_switch()
-        rc, out = _run_mode_cmd([VOICE_COMMANDS_CMD, "start"], timeout=20)
+        rc, out = _start_voice_commands()
         ok = rc == 0 and out in {"started", "already-running"}
         if ok:
             print("[double-ctrl] startup -> voice-commands start", flush=True)
@@ -326,8 +404,7 @@ def _bootstrap_default_mode() -> tuple[float, float]:
         print(f"[double-ctrl] startup voice-commands failed rc={rc} out={out}", flush=True)
         return 0.0, 0.0
 
-    _stop_voice_commands_for_switch()
-    rc, out = _run_mode_cmd([LOCAL_DICTATION_CMD, "start"], timeout=20)
+    rc, out = _start_dictation()
     ok = rc == 0 and out in {"started", "typing-on", "already-on", "already-running"}
     if ok:
         print("[double-ctrl] startup -> dictation start", flush=True)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+Builder = Callable[[Dict[str, str]], Tuple[str, str]]
+
+_NAMED_GROUP = re.compile(r"\(\?P<([A-Za-z_][A-Za-z0-9_]*)>")
+_NAMED_BACKREF = re.compile(r"\(\?P=([A-Za-z_][A-Za-z0-9_]*)\)")
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    """One declaratively registered intent.
+
+    `pattern` must match the whole normalized utterance (no anchors needed)
+    and may only use named groups. `build` turns those groups into
+    `(intent, payload)`; returning `("", "")` rejects the utterance outright,
+    the way an early `return "", ""` did in the old cascade. Without `build`
+    the payload is the first named group (or ""). `verbs` are the words the
+    pattern can start with; a rule without verbs is tried for every
+    utterance. `data` is carried through to the match (custom command entry).
+    """
+
+    intent: str
+    pattern: str
+    verbs: Tuple[str, ...] = ()
+    build: Optional[Builder] = None
+    data: Any = None
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    rule: IntentRule
+    intent: str
+    payload: str
+    groups: Dict[str, str]
+
+
+@dataclass
+class IntentEngine:
+    """All intent rules compiled into one regex per leading verb.
+
+    Rules keep registration order (first match wins, as in a cascade), but
+    each verb bucket is a single alternation of the rules that can start
+    with that verb, plus the verb-less rules. A lookup is one dict access on
+    the first word and one `fullmatch`, and `lastgroup` names the rule that
+    matched. Named groups are renamed per rule so rules can reuse names.
+    """
+
+    rules: Sequence[IntentRule]
+    _buckets: Dict[str, "re.Pattern[str]"] = field(default_factory=dict, init=False, repr=False)
+    _fallback: Optional["re.Pattern[str]"] = field(default=None, init=False, repr=False)
+    _group_names: List[Dict[str, str]] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.rules = tuple(self.rules)
+        bodies: List[str] = []
+        for index, rule in enumerate(self.rules):
+            names: Dict[str, str] = {}
+
+            def rename(m: "re.Match[str]", index: int = index, names: Dict[str, str] = names) -> str:
+                names[f"r{index}_{m.group(1)}"] = m.group(1)
+                return f"(?P<r{index}_{m.group(1)}>"
+
+            body = _NAMED_GROUP.sub(rename, rule.pattern)
+            body = _NAMED_BACKREF.sub(lambda m, index=index: f"(?P=r{index}_{m.group(1)})", body)
+            bodies.append(f"(?P<r{index}>{body})")
+            self._group_names.append(names)
+
+        verbs = sorted({verb for rule in self.rules for verb in rule.verbs})
+        for verb in verbs:
+            members = [i for i, rule in enumerate(self.rules) if not rule.verbs or verb in rule.verbs]
+            self._buckets[verb] = re.compile("|".join(bodies[i] for i in members))
+        wildcard = [i for i, rule in enumerate(self.rules) if not rule.verbs]
+        if wildcard:
+            self._fallback = re.compile("|".join(bodies[i] for i in wildcard))
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        """Match a normalized utterance; None when no rule matches or the rule rejected it."""
+        if not text:
+            return None
+        space = text.find(" ")
+        verb = text if space < 0 else text[:space]
+        regex = self._buckets.get(verb, self._fallback)
+        if regex is None:
+            return None
+        m = regex.fullmatch(text)
+        if m is None or m.lastgroup is None:
+            return None
+        index = int(m.lastgroup[1:])
+        rule = self.rules[index]
+        groups = {
+            name: value
+            for full, name in self._group_names[index].items()
+            if (value := m.group(full)) is not None
+        }
+        if rule.build is not None:
+            intent, payload = rule.build(groups)
+        else:
+            intent, payload = rule.intent, next(iter(groups.values()), "")
+        if not intent:
+            return None
+        return IntentMatch(rule=rule, intent=intent, payload=payload, groups=groups)
@@ -8,13 +8,17 @@ import importlib.util
 import re
 import subprocess
 import sys
+import time
 from collections import deque
 from pathlib import Path
-from typing import Deque, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 
 import numpy as np
 from pywhispercpp.model import Model
 
+from step_scheduler import StepScheduler
+from token_stabilizer import Hypothesis, TokenStabilizer, transcribe_hypothesis
+
 SCRIPT_PATH = Path.home() / ".local" / "bin" / "local-live-dictation.py"
 
 
@@ -95,12 +99,15 @@ def _word_error_rate(reference: str, hypothesis: str) -> Tuple[float, int, int,
 
 
 def _transcribe_text(model: Model, audio: np.ndarray, language: str) -> str:
+    return _transcribe_hypothesis(model, audio, language, timed=False).text
+
+
+def _transcribe_hypothesis(model: Model, audio: np.ndarray, language: str, timed: bool) -> Hypothesis:
     kwargs = {}
     if language:
         kwargs["language"] = language
-    segments = model.transcribe(audio, n_processors=None, **kwargs)
-    text = " ".join(seg.text for seg in segments if getattr(seg, "text", ""))
-    return _collapse_ws(text)
+    hypothesis = transcribe_hypothesis(model, audio, timed, **kwargs)
+    return Hypothesis(text=_collapse_ws(hypothesis.text), words=hypothesis.words)
 
 
 def _simulate_realtime(
@@ -119,21 +126,80 @@ def _simulate_realtime(
     emit_history_words: int,
     language: str,
     verbose: bool,
-) -> Tuple[str, List[str]]:
+    scheduler: Optional[StepScheduler] = None,
+    stabilizer: Optional[TokenStabilizer] = None,
+) -> Tuple[str, List[str], Dict[str, float]]:
     step_samples = max(1, int(round(step_seconds * sample_rate)))
     window_samples = max(step_samples, int(round(window_seconds * sample_rate)))
     duration = len(audio) / float(sample_rate)
 
     prev_hyp_words: List[str] = []
+    prev_hyp_ends: List[float] = []
     emitted_words: Deque[str] = deque(maxlen=max(8, emit_history_words))
     out_words: List[str] = []
 
     last_voice_ts = 0.0
     trace: List[str] = []
+    revisions = 0
+    deleted_words = 0
+    latencies: List[float] = []
+
+    def _commit(candidate_words: List[str], candidate_ends: List[float], guard: int, now: float) -> int:
+        """Replay the live commit; return how many leading candidate words the output now holds."""
+        nonlocal revisions, deleted_words
+        guard = max(0, int(guard))
+        if guard > 0 and len(candidate_words) > guard:
+            candidate_words = candidate_words[:-guard]
+        elif guard > 0:
+            candidate_words = []
+        if not candidate_words:
+            return 0
+
+        delete_words = 0
+        new_words = []
+        if hasattr(live, "_resolve_tail_update"):
+            delete_words, new_words = live._resolve_tail_update(
+                history_words=list(emitted_words),
+                candidate_words=candidate_words,
+                max_revise_words=tail_revision_max_words,
+                min_anchor_words=tail_revision_min_anchor_words,
+            )
+        else:
+            new_words = live._compute_unseen_tail(emitted_words, candidate_words)
+
+        if delete_words > 0:
+            delete_words = min(delete_words, len(out_words), len(emitted_words))
+            if delete_words > 0:
+                del out_words[-delete_words:]
+                for _ in range(delete_words):
+                    emitted_words.pop()
+                revisions += 1
+                deleted_words += delete_words
+                if verbose:
+                    trace.append(f"t={now:5.2f}s revise: delete {delete_words} words")
+
+        min_emit_words = max(1, int(getattr(live, "MIN_EMIT_WORDS", 1)))
+        if len(new_words) < min_emit_words:
+            return len(candidate_words) - len(new_words)
+        emitted_words.extend(new_words)
+        out_words.extend(new_words)
+        # Speech-to-commit latency: emit time minus the end of each word in the audio.
+        if len(candidate_ends) == len(candidate_words):
+            latencies.extend(max(0.0, now - t) for t in candidate_ends[len(candidate_words) - len(new_words) :])
+        if verbose:
+            trace.append(f"t={now:5.2f}s emit: {' '.join(new_words)}")
+        return len(candidate_words)
+
+    # Overlap mode is replayed with the untimed params the live loop uses; only tokens mode has word ends.
+    timed = stabilizer is not None
 
     end = step_samples
     while end <= len(audio):
-        clip = audio[max(0, end - window_samples) : end]
+        if scheduler is not None:
+            step_samples = max(1, int(round(scheduler.step_seconds * sample_rate)))
+            window_samples = max(step_samples, scheduler.window_samples(sample_rate))
+        clip_start = max(0, end - window_samples)
+        clip = audio[clip_start:end]
         now = end / float(sample_rate)
 
         if clip.size <= 0:
@@ -159,58 +225,52 @@ def _simulate_realtime(
         if rms < rms_threshold or voiced_ratio < min_voiced_ratio:
             if last_voice_ts > 0.0 and (now - last_voice_ts) >= silence_reset_seconds:
                 if prev_hyp_words:
-                    flush_candidate = list(prev_hyp_words)
-                    guard = max(0, int(silence_flush_guard_words))
-                    if guard > 0 and len(flush_candidate) > guard:
-                        flush_candidate = flush_candidate[:-guard]
-                    elif guard > 0:
-                        flush_candidate = []
-
-                    if flush_candidate:
-                        delete_words = 0
-                        new_words = []
-                        if hasattr(live, "_resolve_tail_update"):
-                            delete_words, new_words = live._resolve_tail_update(
-                                history_words=list(emitted_words),
-                                candidate_words=flush_candidate,
-                                max_revise_words=tail_revision_max_words,
-                                min_anchor_words=tail_revision_min_anchor_words,
-                            )
-                        else:
-                            new_words = live._compute_unseen_tail(emitted_words, flush_candidate)
-
-                        if delete_words > 0:
-                            delete_words = min(delete_words, len(out_words), len(emitted_words))
-                            if delete_words > 0:
-                                del out_words[-delete_words:]
-                                for _ in range(delete_words):
-                                    emitted_words.pop()
-                                if verbose:
-                                    trace.append(f"t={now:5.2f}s revise: delete {delete_words} words")
-
-                        min_emit_words = max(1, int(getattr(live, "MIN_EMIT_WORDS", 1)))
-                        if len(new_words) >= min_emit_words:
-                            emitted_words.extend(new_words)
-                            out_words.extend(new_words)
-                            if verbose:
-                                trace.append(f"t={now:5.2f}s emit: {' '.join(new_words)}")
+                    _commit(list(prev_hyp_words), list(prev_hyp_ends), silence_flush_guard_words, now)
                 prev_hyp_words = []
+                prev_hyp_ends = []
+                if stabilizer is not None:
+                    stabilizer.mark_committed(now)
+                    stabilizer.reset()
             end += step_samples
             continue
 
         last_voice_ts = now
 
-        text = _transcribe_text(model, clip, language)
+        decode_start = time.monotonic()
+        hypothesis = _transcribe_hypothesis(model, clip, language, timed)
+        if scheduler is not None:
+            decision = scheduler.observe(clip.size / float(sample_rate), time.monotonic() - decode_start)
+            if decision and verbose:
+                trace.append(f"t={now:5.2f}s scheduler: {decision}")
+        text = hypothesis.text
         if not text or live._is_hallucination(text):
             end += step_samples
             continue
 
-        words = text.split()
         if verbose:
             trace.append(f"t={now:5.2f}s heard: {text}")
 
+        if stabilizer is not None and hypothesis.words:
+            words_abs = [w.shifted(clip_start / float(sample_rate)) for w in hypothesis.words]
+            stable = stabilizer.update(words_abs, now)
+            if stable:
+                held = _commit([w.text for w in stable], [w.end for w in stable], guard_words, now)
+                if held > 0:
+                    stabilizer.mark_committed(stable[held - 1].end)
+            pending = stabilizer.uncommitted(words_abs)
+            prev_hyp_words = [w.text for w in pending]
+            prev_hyp_ends = [w.end for w in pending]
+            end += step_samples
+            continue
+
+        words = text.split()
+        ends = [clip_start / float(sample_rate) + w.end for w in hypothesis.words]
+        if len(ends) != len(words):
+            ends = []
+
         if not prev_hyp_words:
             prev_hyp_words = words
+            prev_hyp_ends = ends
             end += step_samples
             continue
 
@@ -219,87 +279,26 @@ def _simulate_realtime(
             overlap = live._common_prefix_len(prev_hyp_words, words)
 
         if overlap > 0:
-            stable_candidate = words[:overlap]
-            guard = max(0, int(guard_words))
-            if guard > 0 and len(stable_candidate) > guard:
-                stable_candidate = stable_candidate[:-guard]
-            elif guard > 0:
-                stable_candidate = []
-
-            if not stable_candidate:
-                prev_hyp_words = words
-                end += step_samples
-                continue
-
-            delete_words = 0
-            new_words = []
-            if hasattr(live, "_resolve_tail_update"):
-                delete_words, new_words = live._resolve_tail_update(
-                    history_words=list(emitted_words),
-                    candidate_words=stable_candidate,
-                    max_revise_words=tail_revision_max_words,
-                    min_anchor_words=tail_revision_min_anchor_words,
-                )
-            else:
-                new_words = live._compute_unseen_tail(emitted_words, stable_candidate)
-
-            if delete_words > 0:
-                delete_words = min(delete_words, len(out_words), len(emitted_words))
-                if delete_words > 0:
-                    del out_words[-delete_words:]
-                    for _ in range(delete_words):
-                        emitted_words.pop()
-                    if verbose:
-                        trace.append(f"t={now:5.2f}s revise: delete {delete_words} words")
-
-            min_emit_words = max(1, int(getattr(live, "MIN_EMIT_WORDS", 1)))
-            if len(new_words) >= min_emit_words:
-                emitted_words.extend(new_words)
-                out_words.extend(new_words)
-                if verbose:
-                    trace.append(f"t={now:5.2f}s emit: {' '.join(new_words)}")
+            _commit(words[:overlap], ends[:overlap], guard_words, now)
 
         prev_hyp_words = words
+        prev_hyp_ends = ends
         end += step_samples
 
     if prev_hyp_words:
-        flush_candidate = list(prev_hyp_words)
-        guard = max(0, int(silence_flush_guard_words))
-        if guard > 0 and len(flush_candidate) > guard:
-            flush_candidate = flush_candidate[:-guard]
-        elif guard > 0:
-            flush_candidate = []
-
-        if flush_candidate:
-            delete_words = 0
-            new_words = []
-            if hasattr(live, "_resolve_tail_update"):
-                delete_words, new_words = live._resolve_tail_update(
-                    history_words=list(emitted_words),
-                    candidate_words=flush_candidate,
-                    max_revise_words=tail_revision_max_words,
-                    min_anchor_words=tail_revision_min_anchor_words,
-                )
-            else:
-                new_words = live._compute_unseen_tail(emitted_words, flush_candidate)
+        _commit(list(prev_hyp_words), list(prev_hyp_ends), silence_flush_guard_words, duration)
 
-            if delete_words > 0:
-                delete_words = min(delete_words, len(out_words), len(emitted_words))
-                if delete_words > 0:
-                    del out_words[-delete_words:]
-                    for _ in range(delete_words):
-                        emitted_words.pop()
-                    if verbose:
-                        trace.append(f"t={duration:5.2f}s revise: delete {delete_words} words")
-
-            min_emit_words = max(1, int(getattr(live, "MIN_EMIT_WORDS", 1)))
-            if len(new_words) >= min_emit_words:
-                emitted_words.extend(new_words)
-                out_words.extend(new_words)
-                if verbose:
-                    trace.append(f"t={duration:5.2f}s emit: {' '.join(new_words)}")
-
-    return _collapse_ws(" ".join(out_words)), trace
+    stats: Dict[str, float] = {
+        "revisions": float(revisions),
+        "deleted_words": float(deleted_words),
+        "timed_words": float(len(latencies)),
+    }
+    if latencies:
+        arr = np.asarray(latencies, dtype=np.float64)
+        stats["latency_mean"] = float(arr.mean())
+        stats["latency_p50"] = float(np.percentile(arr, 50))
+        stats["latency_p90"] = float(np.percentile(arr, 90))
+    return _collapse_ws(" ".join(out_words)), trace, stats
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -319,6 +318,17 @@ def _build_parser() -> argparse.ArgumentParser:
     p.add_argument("--tail-revision-max-words", type=int, default=None)
     p.add_argument("--tail-revision-min-anchor-words", type=int, default=None)
     p.add_argument("--emit-history-words", type=int, default=None)
+    p.add_argument(
+        "--stabilizer",
+        choices=("overlap", "tokens"),
+        default=None,
+        help="Commit by hypothesis overlap or by word timestamps/probabilities (defaults to live script setting)",
+    )
+    p.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Drive step/window with the live step scheduler (LOCAL_DICT_ADAPTIVE_* bounds)",
+    )
     p.add_argument("--verbose", action="store_true")
     return p
 
@@ -373,8 +383,23 @@ def main() -> int:
         no_context=True,
     )
 
+    scheduler = None
+    if args.adaptive:
+        max_buffer_seconds = float(getattr(live, "MAX_BUFFER_SECONDS", 8.0))
+        scheduler = StepScheduler.from_env("LOCAL_DICT", step_seconds, window_seconds, max_buffer_seconds)
+        scheduler.enabled = True
+
+    stabilizer_mode = str(_live_or(args.stabilizer, "STABILIZER_MODE", "overlap"))
+    stabilizer = None
+    if stabilizer_mode == "tokens":
+        stabilizer = TokenStabilizer(
+            edge_guard_seconds=float(getattr(live, "TOKEN_EDGE_GUARD_SECONDS", 0.6)),
+            min_prob=float(getattr(live, "TOKEN_MIN_PROB", 0.5)),
+            time_tolerance=float(getattr(live, "TOKEN_TIME_TOLERANCE_SECONDS", 0.3)),
+        )
+
     full_text = _transcribe_text(model, audio, language)
-    simulated_text, trace = _simulate_realtime(
+    simulated_text, trace, stats = _simulate_realtime(
         live=live,
         model=model,
         audio=audio,
@@ -390,6 +415,8 @@ def main() -> int:
         emit_history_words=emit_history_words,
         language=language,
         verbose=args.verbose,
+        scheduler=scheduler,
+        stabilizer=stabilizer,
     )
 
     print("\n=== Full Transcript (single-pass) ===")
@@ -398,6 +425,28 @@ def main() -> int:
     print("\n=== Simulated Realtime Output ===")
     print(simulated_text or "<empty>")
 
+    print("\n=== Stabilization ===")
+    print(
+        f"mode={stabilizer_mode} revisions={int(stats['revisions'])} deleted_words={int(stats['deleted_words'])}"
+    )
+    if "latency_mean" in stats:
+        print(
+            f"commit_latency_s mean={stats['latency_mean']:.2f} p50={stats['latency_p50']:.2f} "
+            f"p90={stats['latency_p90']:.2f} words={int(stats['timed_words'])}"
+        )
+    elif stabilizer_mode == "tokens":
+        print("commit_latency_s unavailable (no timed words were committed)")
+    else:
+        print("commit_latency_s n/a (overlap mode decodes without word timing)")
+
+    if scheduler is not None:
+        print("\n=== Adaptive Scheduler ===")
+        print(
+            f"decodes={scheduler.observations} rtf={scheduler.rtf:.3f} "
+            f"final_step={scheduler.step_seconds:.2f}s final_window={scheduler.window_seconds:.2f}s "
+            f"expected_latency={scheduler.expected_latency():.2f}s target={scheduler.target_latency:.2f}s"
+        )
+
     if args.verbose and trace:
         print("\n=== Realtime Trace ===")
         for line in trace:
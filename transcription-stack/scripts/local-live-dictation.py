@@ -4,7 +4,9 @@
 from __future__ import annotations
 
 import json
+import math
 import os
+import queue
 import re
 import signal
 import subprocess
@@ -14,18 +16,23 @@ import time
 from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Deque, List, Optional, Tuple
+from typing import Callable, Deque, List, Optional, Sequence, Tuple
 
 import numpy as np
 import sounddevice as sd
 from pywhispercpp.model import Model
 
-from audio_ring_buffer import AudioRingBuffer
-
-try:
-    from scipy.signal import resample_poly  # type: ignore
-except Exception:
-    resample_poly = None
+from audio_capture import AudioCapture
+from audio_ring_buffer import AudioRingBuffer, AudioWindow
+from control_socket import READY_FD_ENV, ControlServer, notify_ready, send_request, wait_ready
+from decode_worker import DecodeResult, DecodeWorker
+from loop_wakeup import LoopWakeup
+from model_prewarm import prewarm_model
+from step_scheduler import StepScheduler
+from stream_resampler import WhisperFeed
+from streaming_vad import StreamingVad
+from token_stabilizer import EMPTY_HYPOTHESIS, Hypothesis, TokenStabilizer, transcribe_hypothesis
+from ydotool_channel import KEY_BACKSPACE, YdotoolChannel
 
 WHISPER_SAMPLE_RATE = 16000
 CHANNELS = 1
@@ -36,6 +43,7 @@ WINDOW_SECONDS = float(os.environ.get("LOCAL_DICT_WINDOW_SECONDS", "3.6"))
 MAX_BUFFER_SECONDS = float(os.environ.get("LOCAL_DICT_MAX_BUFFER_SECONDS", "8.0"))
 RMS_THRESHOLD = float(os.environ.get("LOCAL_DICT_RMS_THRESHOLD", "0.00035"))
 KEY_DELAY_MS = int(os.environ.get("LOCAL_DICT_KEY_DELAY_MS", "2"))
+YDOTOOL_BACKEND = os.environ.get("LOCAL_DICT_YDOTOOL_BACKEND", "auto").strip().lower()
 PUNCTUATION_STYLE = os.environ.get("LOCAL_DICT_PUNCTUATION_STYLE", "adaptive").strip().lower()
 SHORT_SENTENCE_TERMINAL_WORDS = int(os.environ.get("LOCAL_DICT_SHORT_SENTENCE_TERMINAL_WORDS", "6"))
 
@@ -60,13 +68,27 @@ MIN_VOICED_RATIO = float(os.environ.get("LOCAL_DICT_MIN_VOICED_RATIO", "0.05"))
 VOICE_CONTINUATION_SECONDS = float(os.environ.get("LOCAL_DICT_VOICE_CONTINUATION_SECONDS", "1.8"))
 RMS_CONTINUATION_FACTOR = float(os.environ.get("LOCAL_DICT_RMS_CONTINUATION_FACTOR", "0.55"))
 VOICED_CONTINUATION_FACTOR = float(os.environ.get("LOCAL_DICT_VOICED_CONTINUATION_FACTOR", "0.55"))
+STABILIZER_MODE = os.environ.get("LOCAL_DICT_STABILIZER", "tokens").strip().lower()
+TOKEN_EDGE_GUARD_SECONDS = float(os.environ.get("LOCAL_DICT_TOKEN_EDGE_GUARD_SECONDS", "0.6"))
+TOKEN_MIN_PROB = float(os.environ.get("LOCAL_DICT_TOKEN_MIN_PROB", "0.5"))
+TOKEN_TIME_TOLERANCE_SECONDS = float(os.environ.get("LOCAL_DICT_TOKEN_TIME_TOLERANCE_SECONDS", "0.3"))
+TRIM_COMMITTED = os.environ.get("LOCAL_DICT_TRIM_COMMITTED", "1").strip().lower() not in {"0", "false", "no", "off"}
+TRIM_OVERLAP_SECONDS = float(os.environ.get("LOCAL_DICT_TRIM_OVERLAP_SECONDS", "0.3"))
+TRIM_MIN_WINDOW_SECONDS = float(os.environ.get("LOCAL_DICT_TRIM_MIN_WINDOW_SECONDS", "1.0"))
+PROMPT_WORDS = int(os.environ.get("LOCAL_DICT_PROMPT_WORDS", "24"))
+SUSPEND_CAPTURE = os.environ.get("LOCAL_DICT_SUSPEND_CAPTURE", "1").strip().lower() not in {"0", "false", "no", "off"}
+# Encoder frames per second of audio (1500 frames cover whisper's 30 s input).
+AUDIO_CTX_PER_SECOND = 50
+AUDIO_CTX_MAX = 1500
+AUDIO_CTX_MARGIN = 64
 
 XDG_RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR", f"/tmp/{os.getuid()}")
 STATE_DIR = Path(XDG_RUNTIME_DIR) / "local-live-dictation"
 PID_FILE = STATE_DIR / "loop.pid"
-STOP_FILE = STATE_DIR / "stop"
 TYPE_ON_FILE = STATE_DIR / "typing.on"
+CONTROL_SOCKET = STATE_DIR / "control.sock"
 VOICE_COMMANDS_PID_FILE = Path(XDG_RUNTIME_DIR) / "local-voice-commands" / "loop.pid"
+SPEECH_ENGINE_SOCKET = Path(XDG_RUNTIME_DIR) / "local-speech-engine" / "control.sock"
 LOG_FILE = Path.home() / ".local" / "state" / "local-live-dictation.log"
 
 HYPRWHSPR_CONFIG = Path.home() / ".config" / "hyprwhspr" / "config.json"
@@ -94,6 +116,10 @@ HALLUCINATION_MARKERS = {
 }
 
 RUNNING = True
+# The session loop sleeps on this; anything that changes what it should do notifies it.
+WAKEUP = LoopWakeup()
+# Connects lazily on first keystroke, so importing this module (eval tool) stays side-effect free.
+TYPER = YdotoolChannel(KEY_DELAY_MS, backend=YDOTOOL_BACKEND, log_prefix="[local-dict]", debug=DEBUG)
 
 
 def _ensure_dirs() -> None:
@@ -148,6 +174,19 @@ def _stop_voice_commands_best_effort() -> None:
         pass
 
 
+def _engine_request(payload: dict) -> Optional[dict]:
+    """Ask the resident speech engine, if one is up; None means run standalone."""
+    if not SPEECH_ENGINE_SOCKET.exists():
+        return None
+    return send_request(SPEECH_ENGINE_SOCKET, payload, timeout=20.0)
+
+
+def _daemon_request(payload: dict) -> Optional[dict]:
+    if not CONTROL_SOCKET.exists():
+        return None
+    return send_request(CONTROL_SOCKET, payload, timeout=5.0)
+
+
 def _is_typing_enabled() -> bool:
     return TYPE_ON_FILE.exists()
 
@@ -165,10 +204,7 @@ def _set_typing_enabled(enabled: bool) -> None:
 def _stop_signal_handler(_signum, _frame):
     global RUNNING
     RUNNING = False
-    try:
-        STOP_FILE.touch(exist_ok=True)
-    except Exception:
-        pass
+    WAKEUP.notify()
 
 
 def _remove_file(path: Path) -> None:
@@ -272,6 +308,14 @@ def _find_input_by_fuzzy_name(devices: list, wanted: str) -> Optional[Tuple[int,
     return None
 
 
+def _rms(audio: np.ndarray) -> float:
+    if audio.size <= 0:
+        return 0.0
+    # np.dot reduces in place; `audio * audio` would allocate a full window copy.
+    return float(np.sqrt(float(np.dot(audio, audio)) / float(audio.size)))
+
+
+# Whole-window gating for the offline eval replay; the daemon uses StreamingVad.
 def _voiced_ratio(audio: np.ndarray, threshold: float, frame_ms: int, sample_rate: int) -> float:
     if audio.size <= 0:
         return 0.0
@@ -279,12 +323,12 @@ def _voiced_ratio(audio: np.ndarray, threshold: float, frame_ms: int, sample_rat
     frame_samples = max(1, int(sample_rate * max(5, frame_ms) / 1000.0))
     n_frames = audio.size // frame_samples
     if n_frames <= 0:
-        return 1.0 if float(np.sqrt(np.mean(audio * audio))) >= threshold else 0.0
+        return 1.0 if _rms(audio) >= threshold else 0.0
 
     clipped = audio[: n_frames * frame_samples]
     frames = clipped.reshape(n_frames, frame_samples)
-    frame_rms = np.sqrt(np.mean(frames * frames, axis=1))
-    voiced = np.count_nonzero(frame_rms >= threshold)
+    frame_energy = np.einsum("ij,ij->i", frames, frames)
+    voiced = np.count_nonzero(frame_energy >= (threshold * threshold) * frame_samples)
     return float(voiced) / float(n_frames)
 
 
@@ -367,20 +411,189 @@ def _pick_device() -> Tuple[Optional[int], Optional[int], str]:
     return None, None, ""
 
 
+class TypingControl:
+    """Typing on/off owned by the loop process.
+
+    Flipped by the control socket (or the speech engine) and read by the
+    loop on every iteration without touching the filesystem. `TYPE_ON_FILE`
+    is still written on each change so waybar and the hotkey listener, which
+    run in other processes, can show the state.
+
+    While a session runs with capture suspension on, `capture` is its
+    stream: switching typing on restarts the mic right here on the caller's
+    thread, so audio is already flowing into the ring by the time the loop
+    wakes up.
+    """
+
+    def __init__(self) -> None:
+        self._enabled = threading.Event()
+        self.capture: Optional[AudioCapture] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled.is_set()
+
+    def set(self, enabled: bool) -> bool:
+        """Switch typing; returns the previous state."""
+        previous = self._enabled.is_set()
+        if enabled:
+            capture = self.capture
+            if capture is not None:
+                try:
+                    capture.resume()
+                except Exception as exc:
+                    # The loop retries when it sees the change.
+                    print(f"[local-dict] capture resume failed: {exc}", flush=True)
+            self._enabled.set()
+        else:
+            self._enabled.clear()
+        _set_typing_enabled(enabled)
+        WAKEUP.notify()
+        return previous
+
+
+TYPING = TypingControl()
+
+
+class TypingWorker:
+    """Injects keystrokes on a background thread, strictly in submission order.
+
+    Type, delete and reset operations are queued from the decode loop and
+    applied to `state` (the session's `typer_state`) only when they run, so
+    a delete always counts the pieces that were actually typed before it.
+    The loop can decode the next window while characters are still going out.
+
+    The worker also owns the emitted word history (`words`/`keys`). It is
+    updated as operations are queued, so the loop resolves each update
+    against what the screen will show and never waits. A delete that finds
+    fewer typed pieces than words puts the words it could not remove back.
+    """
+
+    def __init__(self, state: dict, words: Deque[str], keys: Deque[str]) -> None:
+        self.state = state
+        self.words = words
+        self.keys = keys
+        self._lock = threading.Lock()
+        # Words of queued type operations: already in the history, not yet typed.
+        self._pending_words = 0
+        # Bumped by reset() so operations of an earlier session leave the history alone.
+        self._generation = 0
+        self._queue: "queue.Queue[Optional[Tuple[str, object]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="typing-worker", daemon=True)
+        self._thread.start()
+
+    def history(self) -> Tuple[List[str], List[str]]:
+        with self._lock:
+            return list(self.words), list(self.keys)
+
+    def type_words(self, text: str, words: List[str], keys: List[str]) -> None:
+        with self._lock:
+            self.words.extend(words)
+            self.keys.extend(keys)
+            self._pending_words += len(words)
+            self._queue.put(("type", (text, len(words), self._generation)))
+
+    def delete_words(self, word_count: int) -> None:
+        if word_count <= 0:
+            return
+        with self._lock:
+            dropped: List[Tuple[str, str]] = []
+            while self.words and len(dropped) < word_count:
+                dropped.append((self.words.pop(), self.keys.pop()))
+            dropped.reverse()
+            self._queue.put(("delete", (word_count, dropped, self._generation)))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.words.clear()
+            self.keys.clear()
+            self._pending_words = 0
+            self._generation += 1
+            self._queue.put(("reset", None))
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=30)
+
+    def _restore(self, kept: List[Tuple[str, str]], generation: int) -> None:
+        """Put back words a delete could not remove, in front of the words still queued."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            at = max(0, len(self.words) - self._pending_words)
+            for word, key in kept:
+                if len(self.words) == self.words.maxlen:
+                    if at == 0:
+                        continue
+                    self.words.popleft()
+                    self.keys.popleft()
+                    at -= 1
+                self.words.insert(at, word)
+                self.keys.insert(at, key)
+                at += 1
+
+    def _run(self) -> None:
+        while True:
+            op = self._queue.get()
+            if op is None:
+                return
+            kind, arg = op
+            try:
+                if kind == "type":
+                    text, word_count, generation = arg
+                    try:
+                        _type_text(text, self.state)
+                    finally:
+                        with self._lock:
+                            if generation == self._generation:
+                                self._pending_words -= word_count
+                elif kind == "delete":
+                    word_count, dropped, generation = arg
+                    removed = _delete_last_typed_words(word_count, self.state)
+                    if removed < len(dropped):
+                        self._restore(dropped[: len(dropped) - removed], generation)
+                    if DEBUG:
+                        print(f"[local-dict] revise: removed_words={removed}", flush=True)
+                elif kind == "reset":
+                    self.state["last_char"] = ""
+                    self.state["typed_word_pieces"] = []
+            except Exception as exc:
+                if DEBUG:
+                    print(f"[local-dict] typing worker error: {exc}", flush=True)
+
+
 @dataclass
 class TranscriptSession:
     """Mutable dictation state that can be reset cleanly between sessions."""
 
     emitted_words: Deque[str] = field(default_factory=lambda: deque(maxlen=max(8, EMIT_HISTORY_WORDS)))
+    # Normalized twins of the word lists, computed once when words enter the session.
+    emitted_keys: Deque[str] = field(default_factory=lambda: deque(maxlen=max(8, EMIT_HISTORY_WORDS)))
     prev_hyp_words: List[str] = field(default_factory=list)
+    prev_hyp_keys: List[str] = field(default_factory=list)
     typer_state: dict = field(default_factory=lambda: {"last_char": "", "typed_word_pieces": []})
+    typer: Optional[TypingWorker] = None
+    stabilizer: TokenStabilizer = field(
+        default_factory=lambda: TokenStabilizer(
+            edge_guard_seconds=TOKEN_EDGE_GUARD_SECONDS,
+            min_prob=TOKEN_MIN_PROB,
+            time_tolerance=TOKEN_TIME_TOLERANCE_SECONDS,
+        )
+    )
 
     def reset_pending(self) -> None:
         self.prev_hyp_words = []
+        self.prev_hyp_keys = []
+        self.stabilizer.reset()
 
     def reset_all(self) -> None:
         self.reset_pending()
+        if self.typer is not None:
+            # Ordered behind any keystrokes still queued for the old session.
+            self.typer.reset()
+            return
         self.emitted_words.clear()
+        self.emitted_keys.clear()
         self.typer_state["last_char"] = ""
         self.typer_state["typed_word_pieces"] = []
 
@@ -389,27 +602,74 @@ def _normalize_word(word: str) -> str:
     return re.sub(r"(^\W+|\W+$)", "", word.lower())
 
 
-def _common_prefix_len(a: List[str], b: List[str]) -> int:
+def _normalize_words(words: Sequence[str]) -> List[str]:
+    return [_normalize_word(w) for w in words]
+
+
+def _common_prefix_keys(a: Sequence[str], b: Sequence[str]) -> int:
     n = min(len(a), len(b))
     i = 0
-    while i < n:
-        if _normalize_word(a[i]) != _normalize_word(b[i]):
-            break
+    while i < n and a[i] == b[i]:
         i += 1
     return i
 
 
+def _common_prefix_len(a: List[str], b: List[str]) -> int:
+    return _common_prefix_keys(_normalize_words(a), _normalize_words(b))
+
+
+def _overlap_profile(history_keys: Sequence[str], candidate_keys: Sequence[str], limit: int, tail: int) -> List[int]:
+    """Suffix/prefix overlaps of the last `tail + 1` history prefixes, in one KMP pass.
+
+    `profile[d]` is the longest k <= limit such that the k keys ending
+    `d` positions before the end of `history_keys` equal `candidate_keys[:k]`,
+    i.e. the tail overlap after deleting the last `d` history words.
+    """
+    pattern = candidate_keys[: max(0, limit)]
+    m = len(pattern)
+    n = len(history_keys)
+    tail = max(0, min(tail, n))
+    profile = [0] * (tail + 1)
+    if m <= 0 or n <= 0:
+        return profile
+
+    failure = [0] * m
+    k = 0
+    for i in range(1, m):
+        while k > 0 and pattern[i] != pattern[k]:
+            k = failure[k - 1]
+        if pattern[i] == pattern[k]:
+            k += 1
+        failure[i] = k
+
+    # An overlap never exceeds m, so m keys before the earliest queried end suffice.
+    start = max(0, n - tail - m)
+    k = 0
+    for i in range(start, n):
+        if k == m:
+            k = failure[k - 1]
+        key = history_keys[i]
+        while k > 0 and key != pattern[k]:
+            k = failure[k - 1]
+        if key == pattern[k]:
+            k += 1
+        d = n - 1 - i
+        if d <= tail:
+            profile[d] = k
+    return profile
+
+
+def _tail_overlap_keys(prev_keys: Sequence[str], new_keys: Sequence[str], limit: int = 32) -> int:
+    if not prev_keys or not new_keys:
+        return 0
+    return _overlap_profile(prev_keys, new_keys, limit, 0)[0]
+
+
 def _tail_overlap_words(prev_words: List[str], new_words: List[str], limit: int = 32) -> int:
     if not prev_words or not new_words:
         return 0
-
-    max_overlap = min(len(prev_words), len(new_words), limit)
-    for k in range(max_overlap, 0, -1):
-        left = [_normalize_word(w) for w in prev_words[-k:]]
-        right = [_normalize_word(w) for w in new_words[:k]]
-        if left == right:
-            return k
-    return 0
+    window = max(0, limit)
+    return _tail_overlap_keys(_normalize_words(prev_words[-window:]), _normalize_words(new_words[:window]), limit)
 
 
 def _compute_unseen_tail(emitted_words: Deque[str], candidate_words: List[str]) -> List[str]:
@@ -440,31 +700,8 @@ def _press_backspace(chars: int) -> None:
     if chars <= 0:
         return
 
-    remaining = chars
-    while remaining > 0:
-        chunk = min(remaining, 40)
-        key_events: List[str] = []
-        for _ in range(chunk):
-            key_events.extend(["14:1", "14:0"])  # KEY_BACKSPACE down/up
-
-        try:
-            proc = subprocess.run(
-                ["ydotool", "key", "--key-delay", str(KEY_DELAY_MS), *key_events],
-                check=False,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-                timeout=20,
-            )
-            if proc.returncode != 0 and DEBUG:
-                err = (proc.stderr or "").strip()
-                print(f"[local-dict] backspace rc={proc.returncode} err={err}", flush=True)
-                break
-        except Exception as exc:
-            if DEBUG:
-                print(f"[local-dict] backspace exception: {exc}", flush=True)
-            break
-
-        remaining -= chunk
+    if not TYPER.press_key(KEY_BACKSPACE, chars) and DEBUG:
+        print(f"[local-dict] backspace failed chars={chars}", flush=True)
 
 
 def _delete_last_typed_words(word_count: int, state: dict) -> int:
@@ -489,22 +726,32 @@ def _resolve_tail_update(
     candidate_words: List[str],
     max_revise_words: int,
     min_anchor_words: int,
+    history_keys: Optional[Sequence[str]] = None,
+    candidate_keys: Optional[Sequence[str]] = None,
 ) -> Tuple[int, List[str]]:
     if not candidate_words:
         return 0, []
 
-    base_overlap = _tail_overlap_words(history_words, candidate_words, limit=64)
+    if history_keys is None:
+        history_keys = _normalize_words(history_words)
+    if candidate_keys is None:
+        candidate_keys = _normalize_words(candidate_words)
+
+    max_delete = min(max(0, max_revise_words), len(history_words))
+    # Overlaps for every delete candidate (index = words deleted) in one pass.
+    overlaps = _overlap_profile(history_keys, candidate_keys, 64, max_delete)
+
+    base_overlap = overlaps[0]
     best_overlap = base_overlap
     best_remaining = max(0, len(history_words) - base_overlap)
     best_delete = 0
 
-    max_delete = min(max(0, max_revise_words), len(history_words))
     for delete_n in range(1, max_delete + 1):
-        trimmed = history_words[:-delete_n]
-        overlap = _tail_overlap_words(trimmed, candidate_words, limit=64)
+        trimmed_len = len(history_words) - delete_n
+        overlap = overlaps[delete_n]
         if overlap < max(1, min_anchor_words):
             continue
-        remaining = max(0, len(trimmed) - overlap)
+        remaining = max(0, trimmed_len - overlap)
         better = overlap > best_overlap or (overlap == best_overlap and remaining < best_remaining)
         if not better:
             continue
@@ -547,43 +794,46 @@ def _select_flush_candidate_words(pending_words: List[str], decoded_words: List[
 
 def _commit_stable_words(
     stable_candidate: List[str],
-    emitted_words: Deque[str],
-    typer_state: dict,
+    stable_keys: List[str],
+    typer: TypingWorker,
     guard_words: int,
-) -> None:
+) -> int:
+    """Type what `stable_candidate` adds to the history; return how many leading candidate words it now holds."""
     guard = max(0, guard_words)
     if guard > 0 and len(stable_candidate) > guard:
         stable_candidate = stable_candidate[:-guard]
+        stable_keys = stable_keys[:-guard]
     elif guard > 0:
         stable_candidate = []
 
     if not stable_candidate:
-        return
+        return 0
 
-    history = list(emitted_words)
+    history_words, history_keys = typer.history()
     delete_words, new_words = _resolve_tail_update(
-        history_words=history,
+        history_words=history_words,
         candidate_words=stable_candidate,
         max_revise_words=TAIL_REVISION_MAX_WORDS,
         min_anchor_words=TAIL_REVISION_MIN_ANCHOR_WORDS,
+        history_keys=history_keys,
+        candidate_keys=stable_keys,
     )
 
     if delete_words > 0:
-        removed = _delete_last_typed_words(delete_words, typer_state)
-        for _ in range(removed):
-            if emitted_words:
-                emitted_words.pop()
-        if DEBUG:
-            print(f"[local-dict] revise: removed_words={removed}", flush=True)
+        # The worker resolves the backspace count against what it has typed by then,
+        # and puts back any history word that turns out not to be on screen.
+        typer.delete_words(delete_words)
 
+    # The words before `new_words` are already in the history.
+    held = len(stable_candidate) - len(new_words)
     if len(new_words) < max(1, MIN_EMIT_WORDS):
-        return
+        return held
 
     emit_text = _collapse_whitespace(" ".join(new_words))
     if emit_text and not _is_hallucination(emit_text) and _count_word_like_tokens(emit_text) > 0:
-        _type_text(emit_text, typer_state)
-        for w in new_words:
-            emitted_words.append(w)
+        typer.type_words(emit_text, new_words, stable_keys[held:])
+        return len(stable_candidate)
+    return held
 
 
 def _normalize_emit_text(text: str) -> str:
@@ -625,118 +875,166 @@ def _type_text(text: str, state: dict) -> None:
     if last_char and last_char not in (" ", "\n", "\t", "(", "[", "{") and out[0] not in ".,!?;:)]}":
         out = " " + out
 
+    if TYPER.type_text(out):
+        state["last_char"] = out[-1]
+        pieces = _split_word_pieces_for_backspace(out)
+        typed_pieces: List[str] = state.setdefault("typed_word_pieces", [])
+        typed_pieces.extend(pieces)
+        if DEBUG and LOG_TRANSCRIPTS:
+            preview = out if len(out) <= 120 else out[:117] + "..."
+            print(f"[local-dict] emit: {preview}", flush=True)
+
+
+def _stop_hyprwhspr_realtime() -> None:
+    if not HYPRWHSPR_REALTIME_WRAPPER.exists():
+        return
     try:
-        proc = subprocess.run(
-            ["ydotool", "type", "--key-delay", str(KEY_DELAY_MS), "--file", "-"],
-            input=out,
-            text=True,
+        subprocess.run(
+            [str(HYPRWHSPR_REALTIME_WRAPPER), "stop"],
             check=False,
             stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            timeout=20,
+            stderr=subprocess.DEVNULL,
         )
-        if proc.returncode == 0:
-            state["last_char"] = out[-1]
-            pieces = _split_word_pieces_for_backspace(out)
-            typed_pieces: List[str] = state.setdefault("typed_word_pieces", [])
-            typed_pieces.extend(pieces)
-            if DEBUG and LOG_TRANSCRIPTS:
-                preview = out if len(out) <= 120 else out[:117] + "..."
-                print(f"[local-dict] emit: {preview}", flush=True)
-        elif DEBUG:
-            err = (proc.stderr or "").strip()
-            print(f"[local-dict] ydotool rc={proc.returncode} err={err}", flush=True)
-    except Exception as exc:
-        if DEBUG:
-            print(f"[local-dict] ydotool exception: {exc}", flush=True)
+    except Exception:
+        pass
 
 
-def _resample_to_whisper(audio: np.ndarray, source_rate: int) -> np.ndarray:
-    if source_rate == WHISPER_SAMPLE_RATE:
-        return audio
+def _load_model(model_name: str = MODEL_NAME) -> Model:
+    return Model(
+        model_name,
+        print_realtime=False,
+        print_progress=False,
+        print_timestamps=False,
+        single_segment=False,
+        no_context=True,
+    )
 
-    if audio.size == 0:
-        return audio
 
-    if resample_poly is not None:
-        try:
-            out = resample_poly(audio, WHISPER_SAMPLE_RATE, source_rate).astype(np.float32, copy=False)
-            return out
-        except Exception:
-            pass
-
-    # Fallback linear interpolation if scipy isn't available.
-    duration = audio.size / float(source_rate)
-    target_samples = max(1, int(round(duration * WHISPER_SAMPLE_RATE)))
-    x_old = np.linspace(0.0, 1.0, num=audio.size, endpoint=False)
-    x_new = np.linspace(0.0, 1.0, num=target_samples, endpoint=False)
-    return np.interp(x_new, x_old, audio).astype(np.float32, copy=False)
+def _handle_control(request: dict) -> dict:
+    global RUNNING
+    cmd = str(request.get("cmd", "")).strip().lower()
+    if cmd == "status":
+        return {"ok": True, "pid": os.getpid(), "typing": TYPING.enabled}
+    if cmd in {"start", "stop", "typing"}:
+        enabled = cmd == "start" or (cmd == "typing" and bool(request.get("on", True)))
+        was_typing = TYPING.set(enabled)
+        return {"ok": True, "typing": enabled, "was_typing": was_typing}
+    if cmd == "shutdown":
+        RUNNING = False
+        WAKEUP.notify()
+        return {"ok": True}
+    return {"ok": False, "error": f"unknown cmd {cmd!r}"}
 
 
 def _run_loop() -> int:
+    started_ts = time.monotonic()
     _ensure_dirs()
 
     if _is_running() and _read_pid() != os.getpid():
         return 0
 
-    if HYPRWHSPR_REALTIME_WRAPPER.exists():
-        try:
-            subprocess.run(
-                [str(HYPRWHSPR_REALTIME_WRAPPER), "stop"],
-                check=False,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-        except Exception:
-            pass
+    _stop_hyprwhspr_realtime()
 
     PID_FILE.write_text(str(os.getpid()))
-    _remove_file(STOP_FILE)
 
     signal.signal(signal.SIGINT, _stop_signal_handler)
     signal.signal(signal.SIGTERM, _stop_signal_handler)
 
+    # `start` marks typing on before spawning us; this is the only time the file is read.
+    TYPING.set(_is_typing_enabled())
+    server = ControlServer(CONTROL_SOCKET, _handle_control, name="local-dict-control")
+    server.start()
+    notify_ready()
+
     try:
-        print(f"[local-dict] loading model={MODEL_NAME}", flush=True)
-        model = Model(
-            MODEL_NAME,
-            print_realtime=False,
-            print_progress=False,
-            print_timestamps=False,
-            single_segment=False,
-            no_context=True,
-        )
-    except Exception as exc:
-        print(f"[local-dict] failed to load model: {exc}", flush=True)
-        _remove_file(PID_FILE)
-        _remove_file(STOP_FILE)
-        return 1
+        prewarm_model(MODEL_NAME, "[local-dict]")
+        try:
+            print(f"[local-dict] loading model={MODEL_NAME}", flush=True)
+            load_start = time.monotonic()
+            model = _load_model()
+        except Exception as exc:
+            print(f"[local-dict] failed to load model: {exc}", flush=True)
+            return 1
+        print(f"[local-dict] model loaded in {time.monotonic() - load_start:.2f}s", flush=True)
+
+        device_id, capture_rate, device_name = _pick_device()
+        if device_id is None or capture_rate is None:
+            print("[local-dict] no input device found", flush=True)
+            return 1
 
-    device_id, capture_rate, device_name = _pick_device()
-    if device_id is None or capture_rate is None:
-        print("[local-dict] no input device found", flush=True)
+        print(f"[local-dict] using input device: {device_name} (id={device_id}, rate={capture_rate}Hz)", flush=True)
+
+        with AudioCapture(device_id, capture_rate, CHANNELS, BLOCK_SIZE) as capture:
+            return _run_session(model, capture, lambda: not RUNNING, started_ts=started_ts)
+    finally:
+        server.close()
+        print("[local-dict] stopped", flush=True)
         _remove_file(PID_FILE)
-        _remove_file(STOP_FILE)
-        return 1
+        _remove_file(TYPE_ON_FILE)
 
-    print(f"[local-dict] using input device: {device_name} (id={device_id}, rate={capture_rate}Hz)", flush=True)
 
+def _run_session(
+    model: Model,
+    capture: AudioCapture,
+    should_stop: Callable[[], bool],
+    started_ts: Optional[float] = None,
+) -> int:
+    """Dictate from an open capture stream with a loaded model until `should_stop()`.
+
+    Used by the standalone daemon and by the resident speech engine, which
+    owns the model and the stream and only swaps which mode is listening.
+    `started_ts` is the origin for the time-to-first-hypothesis log line
+    (process start for a cold start); it defaults to the session start.
+    """
+    capture_rate = capture.rate
+    if started_ts is None:
+        started_ts = time.monotonic()
+    first_hypothesis_logged = False
     max_samples = int(MAX_BUFFER_SECONDS * capture_rate)
-    window_samples = int(WINDOW_SECONDS * capture_rate)
 
-    audio_buffer = AudioRingBuffer(max_samples)
+    vad = StreamingVad.for_stream(capture_rate, VOICED_FRAME_MS, RMS_THRESHOLD, MAX_BUFFER_SECONDS)
+    audio_buffer = AudioRingBuffer(max_samples, single_producer=True, vad=vad)
+    whisper_feed = WhisperFeed(audio_buffer, capture_rate, WHISPER_SAMPLE_RATE)
+    scheduler = StepScheduler.from_env("LOCAL_DICT", STEP_SECONDS, WINDOW_SECONDS, MAX_BUFFER_SECONDS)
     session = TranscriptSession()
+    session.typer = TypingWorker(session.typer_state, session.emitted_words, session.emitted_keys)
 
     last_process = 0.0
     last_silence_log = 0.0
     loop_start_ts = time.monotonic()
     last_voice_ts = 0.0
-    typing_enabled = _is_typing_enabled()
+    typing_enabled = TYPING.enabled
 
     def _clear_audio_buffer() -> None:
-        audio_buffer.clear()
+        whisper_feed.clear()
+
+    def _mute_capture() -> None:
+        """Typing went off: stop the mic while warm, then drop what was captured."""
+        if SUSPEND_CAPTURE:
+            try:
+                # Returns once the callback has stopped, so nothing lands after the clear.
+                capture.suspend()
+            except Exception as exc:
+                print(f"[local-dict] capture suspend failed: {exc}", flush=True)
+        _clear_audio_buffer()
+
+    def _unmute_capture() -> bool:
+        """Typing went on; True when the ring holds only audio captured since the toggle."""
+        try:
+            # Usually already done by `TYPING.set()` on the control thread. Needed even
+            # without SUSPEND_CAPTURE: the speech engine suspends the stream while idle.
+            capture.resume()
+        except Exception as exc:
+            print(f"[local-dict] capture resume failed: {exc}", flush=True)
+            return False
+        if not SUSPEND_CAPTURE:
+            _clear_audio_buffer()
+            return False
+        return True
 
     def _reset_transcript_state(clear_history: bool = False) -> None:
+        # Hypotheses still queued or in flight belong to the old transcript.
+        decoder.cancel()
         if clear_history:
             session.reset_all()
             return
@@ -751,76 +1049,125 @@ def _run_loop() -> int:
             return cfg_lang.strip()
         return ""
 
-    def _transcribe_window(audio_window: np.ndarray, pad_seconds: float = 0.0) -> str:
-        if audio_window.size <= 0:
+    trim_committed = TRIM_COMMITTED and STABILIZER_MODE == "tokens"
+
+    def _decode_window() -> AudioWindow:
+        """Trailing window to decode; with trimming, only audio after the committed words."""
+        limit = scheduler.window_samples(WHISPER_SAMPLE_RATE)
+        if not trim_committed:
+            return whisper_feed.view(limit)
+        committed = int((session.stabilizer.committed_until - TRIM_OVERLAP_SECONDS) * WHISPER_SAMPLE_RATE)
+        # Whisper needs some context; never hand it less than the minimum window.
+        newest_start = whisper_feed.generation - int(TRIM_MIN_WINDOW_SECONDS * WHISPER_SAMPLE_RATE)
+        return whisper_feed.view_since(min(committed, newest_start), limit)
+
+    def _decode_prompt() -> str:
+        if not trim_committed or PROMPT_WORDS <= 0:
             return ""
+        return " ".join(session.typer.history()[0][-PROMPT_WORDS:])
+
+    def _transcribe_window(window: AudioWindow, pad_seconds: float = 0.0, prompt: str = "") -> Hypothesis:
+        whisper_audio = window.samples
+        if whisper_audio.size <= 0:
+            return EMPTY_HYPOTHESIS
         if pad_seconds > 0.0:
-            pad_samples = max(1, int(round(pad_seconds * capture_rate)))
+            pad_samples = max(1, int(round(pad_seconds * WHISPER_SAMPLE_RATE)))
             pad = np.zeros(pad_samples, dtype=np.float32)
-            audio_window = np.concatenate([audio_window.astype(np.float32, copy=False), pad], axis=0)
-        whisper_audio = _resample_to_whisper(audio_window, capture_rate)
-        if whisper_audio.size <= 0:
-            return ""
+            whisper_audio = np.concatenate([whisper_audio, pad], axis=0)
         try:
             kwargs = {}
             lang = _current_language()
             if lang:
                 kwargs["language"] = lang
-            segments = model.transcribe(whisper_audio, n_processors=None, **kwargs)
-            text = " ".join(seg.text for seg in segments if getattr(seg, "text", "")).strip()
+            if trim_committed:
+                # pywhispercpp keeps params between calls, so both are set on every decode.
+                seconds = whisper_audio.size / float(WHISPER_SAMPLE_RATE)
+                kwargs["audio_ctx"] = min(AUDIO_CTX_MAX, int(math.ceil(seconds * AUDIO_CTX_PER_SECOND)) + AUDIO_CTX_MARGIN)
+                kwargs["initial_prompt"] = prompt
+            hypothesis = transcribe_hypothesis(model, whisper_audio, STABILIZER_MODE == "tokens", **kwargs)
         except Exception:
-            return ""
-        text = _collapse_whitespace(text)
+            return EMPTY_HYPOTHESIS
+        if not whisper_feed.is_intact(window):
+            # The decode outlived the ring; the view was overwritten mid-read.
+            if DEBUG:
+                print("[local-dict] dropped hypothesis: audio window overwritten during decode", flush=True)
+            return EMPTY_HYPOTHESIS
+        text = _collapse_whitespace(hypothesis.text)
         if not text or _is_hallucination(text):
-            return ""
-        return text
+            return EMPTY_HYPOTHESIS
+        # Word times become absolute stream seconds so hypotheses from different windows line up.
+        offset = window.start / float(WHISPER_SAMPLE_RATE)
+        return Hypothesis(text=text, words=tuple(w.shifted(offset) for w in hypothesis.words))
+
+    decoder = DecodeWorker(
+        lambda job: _transcribe_window(job.window, pad_seconds=job.pad_seconds, prompt=job.prompt),
+        on_result=WAKEUP.notify,
+    )
 
-    def _commit_words(candidate_words: List[str], guard_words: int) -> None:
+    def _commit_words(candidate_words: List[str], guard_words: int, candidate_keys: Optional[List[str]] = None) -> int:
         if not candidate_words:
-            return
-        _commit_stable_words(
+            return 0
+        return _commit_stable_words(
             stable_candidate=candidate_words,
-            emitted_words=session.emitted_words,
-            typer_state=session.typer_state,
+            stable_keys=candidate_keys if candidate_keys is not None else _normalize_words(candidate_words),
+            typer=session.typer,
             guard_words=guard_words,
         )
 
+    def _process_timed_hypothesis(hypothesis: Hypothesis, window_end_s: float) -> None:
+        stable = session.stabilizer.update(hypothesis.words, window_end_s)
+        if stable:
+            held = _commit_words([w.text for w in stable], STABLE_PREFIX_GUARD_WORDS, [w.key for w in stable])
+            # Guarded or too-short runs stay uncommitted and are offered again next window.
+            if held > 0:
+                session.stabilizer.mark_committed(stable[held - 1].end)
+        pending = session.stabilizer.uncommitted(hypothesis.words)
+        session.prev_hyp_words = [w.text for w in pending]
+        session.prev_hyp_keys = [w.key for w in pending]
+
     def _process_hypothesis_text(text: str) -> None:
         words = text.split()
         if not words:
             return
+        keys = _normalize_words(words)
 
         if not session.prev_hyp_words:
             session.prev_hyp_words = words
+            session.prev_hyp_keys = keys
             return
 
-        overlap = _tail_overlap_words(session.prev_hyp_words, words, limit=64)
+        overlap = _tail_overlap_keys(session.prev_hyp_keys, keys, limit=64)
         if overlap <= 0:
-            overlap = _common_prefix_len(session.prev_hyp_words, words)
+            overlap = _common_prefix_keys(session.prev_hyp_keys, keys)
 
         if overlap > 0:
-            _commit_words(words[:overlap], STABLE_PREFIX_GUARD_WORDS)
+            _commit_words(words[:overlap], STABLE_PREFIX_GUARD_WORDS, keys[:overlap])
 
         session.prev_hyp_words = words
+        session.prev_hyp_keys = keys
 
     def _flush_pending(reason: str, guard_words: int, force_decode: bool = False, pad_seconds: float = 0.0) -> None:
         pending_words = list(session.prev_hyp_words)
         decoded_words: List[str] = []
-        audio_now = audio_buffer.snapshot(limit_samples=window_samples)
-        if audio_now.size > 0:
+        whisper_feed.pump()
+        window_now = _decode_window()
+        if window_now.size > 0:
             should_decode = force_decode
             if not should_decode:
-                rms = float(np.sqrt(np.mean(audio_now * audio_now)))
-                voiced_ratio = _voiced_ratio(audio_now, RMS_THRESHOLD, VOICED_FRAME_MS, capture_rate)
+                rms, voiced_ratio = vad.window_stats(scheduler.window_samples(capture_rate))
                 should_decode = rms >= RMS_THRESHOLD and voiced_ratio >= MIN_VOICED_RATIO
 
             if should_decode:
-                text = _transcribe_window(audio_now, pad_seconds=pad_seconds)
-                if text:
+                # Synchronous: waits out any in-flight decode, drops queued ones.
+                hypothesis = decoder.decode_now(window_now, pad_seconds=pad_seconds, prompt=_decode_prompt())
+                text = hypothesis.text
+                if hypothesis.words:
+                    decoded_words = [w.text for w in session.stabilizer.uncommitted(hypothesis.words)]
+                elif text:
                     decoded_words = text.split()
-                    if decoded_words and DEBUG and LOG_TRANSCRIPTS:
-                        preview = text if len(text) <= 120 else text[:117] + "..."
-                        print(f"[local-dict] flush[{reason}]: {preview}", flush=True)
+                if decoded_words and DEBUG and LOG_TRANSCRIPTS:
+                    preview = text if len(text) <= 120 else text[:117] + "..."
+                    print(f"[local-dict] flush[{reason}]: {preview}", flush=True)
 
         final_words = _select_flush_candidate_words(
             pending_words=pending_words,
@@ -828,19 +1175,49 @@ def _run_loop() -> int:
             min_anchor_words=FLUSH_MIN_ANCHOR_WORDS,
         )
         _commit_words(final_words, guard_words)
+        # Everything captured so far has been committed or discarded.
+        session.stabilizer.mark_committed(window_now.end / float(WHISPER_SAMPLE_RATE))
         session.reset_pending()
 
-    def audio_callback(indata, _frames, _time_info, status):
-        if status:
+    def _handle_decode_result(result: DecodeResult) -> None:
+        nonlocal last_voice_ts, first_hypothesis_logged
+        decision = scheduler.observe(result.job.window.size / float(WHISPER_SAMPLE_RATE), result.decode_seconds)
+        if decision and DEBUG:
+            print(f"[local-dict] scheduler: {decision}", flush=True)
+        if not result.text:
             return
-        mono = indata[:, 0].copy()
-        audio_buffer.append(mono)
+
+        if not first_hypothesis_logged:
+            first_hypothesis_logged = True
+            print(
+                f"[local-dict] first hypothesis {result.finished_ts - started_ts:.2f}s after start "
+                f"(decode={result.decode_seconds:.2f}s)",
+                flush=True,
+            )
+
+        # Voice was present when the window was gated, not when decoding ended.
+        last_voice_ts = max(last_voice_ts, result.job.submitted_ts)
+
+        if DEBUG and LOG_TRANSCRIPTS:
+            preview = result.text if len(result.text) <= 120 else result.text[:117] + "..."
+            print(
+                f"[local-dict] heard (decode={result.decode_seconds:.2f}s latency={result.latency_seconds:.2f}s "
+                f"superseded={decoder.superseded}): {preview}",
+                flush=True,
+            )
+
+        if result.hypothesis.words:
+            _process_timed_hypothesis(result.hypothesis, result.job.window.end / float(WHISPER_SAMPLE_RATE))
+        else:
+            _process_hypothesis_text(result.text)
 
     print("[local-dict] started", flush=True)
     if DEBUG:
         print(
             "[local-dict] settings "
             f"step={STEP_SECONDS}s window={WINDOW_SECONDS}s max_buffer={MAX_BUFFER_SECONDS}s "
+            f"adaptive={scheduler.enabled} step_bounds=({scheduler.min_step},{scheduler.max_step}) "
+            f"window_bounds=({scheduler.min_window},{scheduler.max_window}) target_latency={scheduler.target_latency}s "
             f"rms_threshold={RMS_THRESHOLD} min_voiced_ratio={MIN_VOICED_RATIO} "
             f"voice_continuation={VOICE_CONTINUATION_SECONDS}s "
             f"guard_words={STABLE_PREFIX_GUARD_WORDS} tail_revise={TAIL_REVISION_MAX_WORDS} "
@@ -851,140 +1228,173 @@ def _run_loop() -> int:
             flush=True,
         )
 
+    def _on_audio(block: np.ndarray) -> None:
+        # Lock-free SPSC append copies the strided channel straight into the ring.
+        audio_buffer.append(block)
+        WAKEUP.notify_audio()
+
+    last_generation = -1
+    wakeups_at_start = WAKEUP.wakeups
+    log_resume = False
+    capture.attach(_on_audio)
+    TYPING.capture = capture
+    if typing_enabled:
+        log_resume = _unmute_capture()
+    else:
+        _mute_capture()
     try:
-        with sd.InputStream(
-            device=device_id,
-            samplerate=capture_rate,
-            channels=CHANNELS,
-            dtype=np.float32,
-            blocksize=BLOCK_SIZE,
-            callback=audio_callback,
-        ):
-            while RUNNING and not STOP_FILE.exists():
-                now = time.monotonic()
-                next_typing_enabled = _is_typing_enabled()
-                if next_typing_enabled != typing_enabled:
-                    if typing_enabled and not next_typing_enabled:
-                        recent_voice = last_voice_ts > 0.0 and (now - last_voice_ts) <= max(0.0, EXIT_FLUSH_MAX_IDLE_SECONDS)
-                        _flush_pending(
-                            "typing-off",
-                            EXIT_FLUSH_GUARD_WORDS,
-                            force_decode=recent_voice,
-                            pad_seconds=FINAL_FLUSH_PAD_SECONDS if recent_voice else 0.0,
-                        )
-                    typing_enabled = next_typing_enabled
-                    _reset_transcript_state(clear_history=True)
-                    loop_start_ts = now
-                    last_voice_ts = 0.0
-                    last_process = 0.0
-                    _clear_audio_buffer()
-                    if DEBUG:
-                        state = "enabled" if typing_enabled else "disabled"
-                        print(f"[local-dict] typing {state}", flush=True)
-
-                if not typing_enabled:
-                    time.sleep(0.03)
-                    continue
-
-                if now - last_process < STEP_SECONDS:
-                    time.sleep(0.03)
-                    continue
-                last_process = now
-
-                audio = audio_buffer.snapshot(limit_samples=window_samples)
-                if audio.size <= 0:
-                    continue
+        while not should_stop():
+            for result in decoder.poll():
+                _handle_decode_result(result)
+
+            now = time.monotonic()
+            next_typing_enabled = TYPING.enabled
+            if next_typing_enabled != typing_enabled:
+                if typing_enabled and not next_typing_enabled:
+                    recent_voice = last_voice_ts > 0.0 and (now - last_voice_ts) <= max(0.0, EXIT_FLUSH_MAX_IDLE_SECONDS)
+                    _flush_pending(
+                        "typing-off",
+                        EXIT_FLUSH_GUARD_WORDS,
+                        force_decode=recent_voice,
+                        pad_seconds=FINAL_FLUSH_PAD_SECONDS if recent_voice else 0.0,
+                    )
+                typing_enabled = next_typing_enabled
+                _reset_transcript_state(clear_history=True)
+                loop_start_ts = now
+                last_voice_ts = 0.0
+                last_process = 0.0
+                if typing_enabled:
+                    # Pre-roll: the ring was emptied at suspend, so what it holds now is
+                    # speech that started with the toggle; keep it.
+                    log_resume = _unmute_capture()
+                else:
+                    _mute_capture()
+                if DEBUG:
+                    state = "enabled" if typing_enabled else "disabled"
+                    print(f"[local-dict] typing {state}", flush=True)
+
+            if not typing_enabled:
+                # Warm but muted: nothing to do until typing is switched on or we are stopped.
+                WAKEUP.wait()
+                continue
 
-                rms = float(np.sqrt(np.mean(audio * audio)))
-                voiced_ratio = _voiced_ratio(audio, RMS_THRESHOLD, VOICED_FRAME_MS, capture_rate)
-                continuation_open = last_voice_ts > 0.0 and (now - last_voice_ts) <= max(0.0, VOICE_CONTINUATION_SECONDS)
-
-                rms_threshold = RMS_THRESHOLD
-                voiced_threshold = MIN_VOICED_RATIO
-                if continuation_open:
-                    rms_threshold *= max(0.05, RMS_CONTINUATION_FACTOR)
-                    voiced_threshold *= max(0.05, VOICED_CONTINUATION_FACTOR)
-
-                if rms < rms_threshold or voiced_ratio < voiced_threshold:
-                    silence_for = (now - last_voice_ts) if last_voice_ts > 0.0 else (now - loop_start_ts)
-                    if last_voice_ts > 0.0 and silence_for >= SILENCE_RESET_SECONDS:
-                        _flush_pending(
-                            "silence",
-                            SILENCE_FLUSH_GUARD_WORDS,
-                            force_decode=True,
-                            pad_seconds=FINAL_FLUSH_PAD_SECONDS,
-                        )
-                        last_voice_ts = 0.0
-                        loop_start_ts = now
-
-                    if AUTO_STOP_SILENCE_SECONDS > 0 and silence_for >= AUTO_STOP_SILENCE_SECONDS:
-                        print(f"[local-dict] auto-disable typing after {silence_for:.1f}s of inactivity", flush=True)
-                        _set_typing_enabled(False)
-                        typing_enabled = False
-                        _reset_transcript_state(clear_history=True)
-                        loop_start_ts = now
-                        last_voice_ts = 0.0
-                        _clear_audio_buffer()
-                        continue
+            step_deadline = last_process + scheduler.step_seconds
+            if now < step_deadline:
+                # Woken early by a finished decode or a control message.
+                WAKEUP.wait_until(step_deadline)
+                continue
+            if audio_buffer.generation == last_generation:
+                # Nothing new since the last step; the next capture block ends the wait.
+                WAKEUP.wait(scheduler.step_seconds, audio=True)
+                continue
+            last_process = now
+            last_generation = audio_buffer.generation
+            if log_resume and capture.last_first_block_seconds > 0.0:
+                log_resume = False
+                if DEBUG:
+                    print(
+                        f"[local-dict] capture resumed in {capture.last_resume_seconds * 1000.0:.1f}ms, "
+                        f"first block after {capture.last_first_block_seconds * 1000.0:.1f}ms",
+                        flush=True,
+                    )
+
+            # Resample only what arrived since the last step.
+            whisper_feed.pump()
+            window = _decode_window()
+            if window.size <= 0:
+                continue
 
-                    if DEBUG and (now - last_silence_log) >= 5.0:
-                        print(
-                            f"[local-dict] waiting for voice rms={rms:.5f} voiced_ratio={voiced_ratio:.2f} "
-                            f"thresholds=({rms_threshold:.5f},{voiced_threshold:.2f})",
-                            flush=True,
-                        )
-                        last_silence_log = now
-                    continue
+            rms, voiced_ratio = vad.window_stats(scheduler.window_samples(capture_rate))
+            continuation_open = last_voice_ts > 0.0 and (now - last_voice_ts) <= max(0.0, VOICE_CONTINUATION_SECONDS)
+
+            rms_threshold = RMS_THRESHOLD
+            voiced_threshold = MIN_VOICED_RATIO
+            if continuation_open:
+                rms_threshold *= max(0.05, RMS_CONTINUATION_FACTOR)
+                voiced_threshold *= max(0.05, VOICED_CONTINUATION_FACTOR)
+
+            if rms < rms_threshold or voiced_ratio < voiced_threshold:
+                silence_for = (now - last_voice_ts) if last_voice_ts > 0.0 else (now - loop_start_ts)
+                if last_voice_ts > 0.0 and silence_for >= SILENCE_RESET_SECONDS:
+                    _flush_pending(
+                        "silence",
+                        SILENCE_FLUSH_GUARD_WORDS,
+                        force_decode=True,
+                        pad_seconds=FINAL_FLUSH_PAD_SECONDS,
+                    )
+                    last_voice_ts = 0.0
+                    loop_start_ts = now
 
-                text = _transcribe_window(audio)
-                if not text:
+                if AUTO_STOP_SILENCE_SECONDS > 0 and silence_for >= AUTO_STOP_SILENCE_SECONDS:
+                    print(f"[local-dict] auto-disable typing after {silence_for:.1f}s of inactivity", flush=True)
+                    TYPING.set(False)
+                    typing_enabled = False
+                    _reset_transcript_state(clear_history=True)
+                    loop_start_ts = now
+                    last_voice_ts = 0.0
+                    _mute_capture()
                     continue
 
-                last_voice_ts = now
-
-                if DEBUG and LOG_TRANSCRIPTS:
-                    preview = text if len(text) <= 120 else text[:117] + "..."
-                    print(f"[local-dict] heard: {preview}", flush=True)
-
-                _process_hypothesis_text(text)
+                if DEBUG and (now - last_silence_log) >= 5.0:
+                    print(
+                        f"[local-dict] waiting for voice rms={rms:.5f} voiced_ratio={voiced_ratio:.2f} "
+                        f"thresholds=({rms_threshold:.5f},{voiced_threshold:.2f})",
+                        flush=True,
+                    )
+                    last_silence_log = now
+                continue
 
-            exit_idle = (time.monotonic() - last_voice_ts) if last_voice_ts > 0.0 else (time.monotonic() - loop_start_ts)
-            if typing_enabled and exit_idle <= max(0.0, EXIT_FLUSH_MAX_IDLE_SECONDS):
-                _flush_pending("exit", EXIT_FLUSH_GUARD_WORDS, force_decode=True, pad_seconds=FINAL_FLUSH_PAD_SECONDS)
+            # Latest-wins: a window still waiting for the worker is replaced,
+            # so a slow decode never leaves a backlog of stale hypotheses.
+            decoder.submit(window, now, prompt=_decode_prompt())
 
+        exit_idle = (time.monotonic() - last_voice_ts) if last_voice_ts > 0.0 else (time.monotonic() - loop_start_ts)
+        if typing_enabled and exit_idle <= max(0.0, EXIT_FLUSH_MAX_IDLE_SECONDS):
+            _flush_pending("exit", EXIT_FLUSH_GUARD_WORDS, force_decode=True, pad_seconds=FINAL_FLUSH_PAD_SECONDS)
+        if DEBUG:
+            print(f"[local-dict] session ended after {WAKEUP.wakeups - wakeups_at_start} loop wakeups", flush=True)
     finally:
-        print("[local-dict] stopped", flush=True)
-        _remove_file(PID_FILE)
-        _remove_file(STOP_FILE)
-        _remove_file(TYPE_ON_FILE)
+        TYPING.capture = None
+        capture.detach(_on_audio)
+        decoder.close()
+        # Let queued keystrokes finish before the channel goes away.
+        session.typer.close()
+        TYPER.close()
 
     return 0
 
 
 def _daemon_start() -> int:
     _ensure_dirs()
+    reply = _engine_request({"cmd": "mode", "mode": "dictation"})
+    if reply is not None:
+        if not reply.get("ok"):
+            print("start-failed")
+            return 1
+        print("already-running" if reply.get("previous") == "dictation" else "started")
+        return 0
+
     _stop_voice_commands_best_effort()
     if _is_running():
         print("already-running")
         return 0
 
-    _remove_file(STOP_FILE)
-
-    with LOG_FILE.open("a", buffering=1) as log:
-        proc = subprocess.Popen(
-            [str(Path(__file__).resolve()), "run"],
-            stdout=log,
-            stderr=subprocess.STDOUT,
-            start_new_session=True,
-        )
-
-    for _ in range(60):
-        if _is_running():
-            print("started")
-            return 0
-        time.sleep(0.05)
+    # The daemon writes to this pipe once its control socket is listening.
+    read_fd, write_fd = os.pipe()
+    try:
+        with LOG_FILE.open("a", buffering=1) as log:
+            proc = subprocess.Popen(
+                [str(Path(__file__).resolve()), "run"],
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+                pass_fds=(write_fd,),
+                env={**os.environ, READY_FD_ENV: str(write_fd)},
+            )
+    finally:
+        os.close(write_fd)
 
-    if proc.poll() is None:
+    if wait_ready(read_fd, 3.0) or proc.poll() is None:
         print("started")
         return 0
 
@@ -994,51 +1404,75 @@ def _daemon_start() -> int:
 
 def _start() -> int:
     _ensure_dirs()
-    _stop_voice_commands_best_effort()
-    _remove_file(STOP_FILE)
-    was_typing_enabled = _is_typing_enabled()
-    _set_typing_enabled(True)
+    reply = _engine_request({"cmd": "mode", "mode": "dictation", "typing": True})
+    if reply is not None:
+        if not reply.get("ok"):
+            print("start-failed")
+            return 1
+        print("already-on" if reply.get("previous") == "dictation" and reply.get("was_typing") else "typing-on")
+        return 0
 
+    _stop_voice_commands_best_effort()
     if _is_running():
-        print("already-on" if was_typing_enabled else "typing-on")
+        reply = _daemon_request({"cmd": "typing", "on": True})
+        if reply is None or not reply.get("ok"):
+            print("start-failed")
+            return 1
+        print("already-on" if reply.get("was_typing") else "typing-on")
         return 0
 
+    # Read once by the new daemon at startup.
+    _set_typing_enabled(True)
     return _daemon_start()
 
 
 def _stop() -> int:
     _ensure_dirs()
+    reply = _engine_request({"cmd": "mode", "mode": "dictation", "if_mode": "dictation", "typing": False})
+    if reply is not None and reply.get("ok"):
+        print("typing-off" if reply.get("was_typing") else "already-off")
+        return 0
+
     if not _is_running():
         _remove_file(PID_FILE)
-        _remove_file(STOP_FILE)
         _remove_file(TYPE_ON_FILE)
         print("already-off")
         return 0
 
-    if not _is_typing_enabled():
-        print("already-off")
-        return 0
-
-    _set_typing_enabled(False)
-    print("typing-off")
+    reply = _daemon_request({"cmd": "typing", "on": False})
+    if reply is None or not reply.get("ok"):
+        print("stop-failed")
+        return 1
+    print("typing-off" if reply.get("was_typing") else "already-off")
     return 0
 
 
 def _daemon_stop() -> int:
     _ensure_dirs()
+    # The engine keeps the model loaded for voice commands; only leave dictation mode.
+    reply = _engine_request({"cmd": "mode", "mode": "idle", "if_mode": "dictation"})
+    if reply is not None and reply.get("ok"):
+        print("daemon-stopped" if reply.get("changed") else "already-daemon-stopped")
+        return 0
+    if SPEECH_ENGINE_SOCKET.exists():
+        # The PID file holds the engine's pid; signaling it would kill the engine.
+        error = reply.get("error", "request failed") if reply is not None else "no reply"
+        print(f"speech engine did not leave dictation: {error}", file=sys.stderr)
+        return 1
+
     pid = _read_pid()
     if not pid or not _pid_alive(pid):
         _remove_file(PID_FILE)
-        _remove_file(STOP_FILE)
         _remove_file(TYPE_ON_FILE)
         print("already-daemon-stopped")
         return 0
 
-    STOP_FILE.touch(exist_ok=True)
-    try:
-        os.kill(pid, signal.SIGTERM)
-    except OSError:
-        pass
+    reply = _daemon_request({"cmd": "shutdown"})
+    if reply is None or not reply.get("ok"):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
 
     for _ in range(80):
         if not _pid_alive(pid):
@@ -1052,7 +1486,6 @@ def _daemon_stop() -> int:
             pass
 
     _remove_file(PID_FILE)
-    _remove_file(STOP_FILE)
     _remove_file(TYPE_ON_FILE)
     print("daemon-stopped")
     return 0
@@ -1060,7 +1493,10 @@ def _daemon_stop() -> int:
 
 def _status() -> int:
     running = _is_running()
-    typing = running and _is_typing_enabled()
+    typing = False
+    if running:
+        reply = _daemon_request({"cmd": "status"}) or _engine_request({"cmd": "status"})
+        typing = bool(reply.get("typing")) if reply is not None else _is_typing_enabled()
     print(f"running={1 if running else 0} typing={1 if typing else 0}")
     return 0
 
@@ -0,0 +1,283 @@
+#!/home/groot/.local/share/hyprwhspr/venv/bin/python
+"""Resident speech engine: one Whisper model and one mic stream shared by dictation and voice commands."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Optional
+
+from audio_capture import AudioCapture
+from control_socket import ControlServer, send_request
+from model_prewarm import prewarm_model
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def _load_script(filename: str) -> ModuleType:
+    module_name = filename.replace("-", "_").removesuffix(".py")
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPT_DIR / filename)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load {filename}")
+    module = importlib.util.module_from_spec(spec)
+    # Dataclasses look their module up in sys.modules while the class is built.
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+dictation = _load_script("local-live-dictation.py")
+commands = _load_script("local-voice-commands.py")
+
+MODES = ("idle", "dictation", "commands")
+MODEL_NAME = os.environ.get("LOCAL_SPEECH_MODEL", dictation.MODEL_NAME)
+START_MODE = os.environ.get("LOCAL_SPEECH_ENGINE_MODE", "idle").strip().lower()
+SWITCH_TIMEOUT_SECONDS = float(os.environ.get("LOCAL_SPEECH_ENGINE_SWITCH_TIMEOUT_SECONDS", "15.0"))
+SUSPEND_IDLE = os.environ.get("LOCAL_SPEECH_SUSPEND_IDLE", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+XDG_RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR", f"/tmp/{os.getuid()}")
+STATE_DIR = Path(XDG_RUNTIME_DIR) / "local-speech-engine"
+PID_FILE = STATE_DIR / "engine.pid"
+SOCKET_PATH = STATE_DIR / "control.sock"
+
+
+def _read_pid() -> Optional[int]:
+    if not PID_FILE.exists():
+        return None
+    try:
+        return int(PID_FILE.read_text().strip())
+    except Exception:
+        return None
+
+
+def _is_running() -> bool:
+    pid = _read_pid()
+    return bool(pid and dictation._pid_alive(pid))
+
+
+class SpeechEngine:
+    """Runs one mode's session at a time on a shared model and capture stream.
+
+    `mode` is what clients asked for; `active` is the session the main loop
+    is actually running. A mode request flips `mode`, the running session
+    sees its stop predicate turn true (finishing its own flush), and the
+    loop starts the next session on the same model and stream. Requests are
+    acknowledged once the new mode is active, so the reply time is the
+    switch time. The PID/typing files of the standalone daemons are kept up
+    to date with the engine's pid so the waybar module and hotkey checks
+    work unchanged. In idle the stream is suspended (device kept open); a
+    session resumes it when it needs audio.
+    """
+
+    def __init__(self, start_mode: str = "idle") -> None:
+        self.mode = start_mode if start_mode in MODES else "idle"
+        self.active = ""
+        self.running = True
+        # Reentrant: the signal handler may run while the main thread holds it.
+        self._cond = threading.Condition(threading.RLock())
+
+    def stop(self) -> None:
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        self._wake_sessions()
+
+    def _wake_sessions(self) -> None:
+        # Sessions sleep on their module's wakeup, not on our condition.
+        dictation.WAKEUP.notify()
+        commands.WAKEUP.notify()
+
+    def _should_stop(self, mode: str) -> bool:
+        return not self.running or self.mode != mode
+
+    def _enter(self, mode: str) -> None:
+        pid = str(os.getpid())
+        if mode == "dictation":
+            dictation._ensure_dirs()
+            dictation.PID_FILE.write_text(pid)
+        elif mode == "commands":
+            commands._ensure_dirs()
+            commands.PID_FILE.write_text(pid)
+
+    def _leave(self, mode: str) -> None:
+        if mode == "dictation":
+            dictation._remove_file(dictation.PID_FILE)
+            dictation.TYPING.set(False)
+        elif mode == "commands":
+            commands._remove_file(commands.PID_FILE)
+
+    def run(self, model: Any, capture: AudioCapture, started_ts: Optional[float] = None) -> None:
+        """Serve modes until stopped; the first session measures from `started_ts` (cold start)."""
+        while self.running:
+            with self._cond:
+                mode = self.mode
+                self._enter(mode)
+                self.active = mode
+                self._cond.notify_all()
+            print(f"[speech-engine] mode={mode}", flush=True)
+            try:
+                if mode == "dictation":
+                    dictation._run_session(model, capture, lambda: self._should_stop("dictation"), started_ts)
+                    started_ts = None
+                elif mode == "commands":
+                    commands._run_session(model, capture, lambda: self._should_stop("commands"), started_ts)
+                    started_ts = None
+                else:
+                    if SUSPEND_IDLE:
+                        capture.suspend()
+                    with self._cond:
+                        self._cond.wait_for(lambda: self._should_stop("idle"))
+            except Exception as exc:
+                print(f"[speech-engine] {mode} session failed: {exc}", flush=True)
+                with self._cond:
+                    if self.mode == mode:
+                        self.mode = "idle"
+            finally:
+                with self._cond:
+                    self.active = ""
+                    self._leave(mode)
+
+    def _status(self) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "pid": os.getpid(),
+            "model": MODEL_NAME,
+            "mode": self.mode,
+            "active": self.active,
+            "typing": self.active == "dictation" and dictation.TYPING.enabled,
+        }
+
+    def _switch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        mode = str(request.get("mode", "")).strip().lower()
+        if mode not in MODES:
+            return {"ok": False, "error": f"unknown mode {mode!r}"}
+        if_mode = request.get("if_mode")
+        typing = request.get("typing")
+
+        started = time.monotonic()
+        with self._cond:
+            previous = self.mode
+            was_typing = previous == "dictation" and dictation.TYPING.enabled
+            if if_mode and previous != if_mode:
+                return {"ok": True, "mode": previous, "previous": previous, "changed": False, "was_typing": was_typing}
+            if mode == "dictation" and typing is not None:
+                dictation._ensure_dirs()
+                dictation.TYPING.set(bool(typing))
+            self.mode = mode
+            self._cond.notify_all()
+            self._wake_sessions()
+            self._cond.wait_for(
+                lambda: not self.running or self.mode != mode or self.active == mode,
+                timeout=SWITCH_TIMEOUT_SECONDS,
+            )
+            ok = self.active == mode
+        switch_ms = (time.monotonic() - started) * 1000.0
+        if previous != mode:
+            print(f"[speech-engine] switch {previous} -> {mode} ok={ok} in {switch_ms:.1f}ms", flush=True)
+        reply: Dict[str, Any] = {
+            "ok": ok,
+            "mode": mode,
+            "previous": previous,
+            "changed": previous != mode,
+            "was_typing": was_typing,
+            "switch_ms": round(switch_ms, 1),
+        }
+        if not ok:
+            reply["error"] = "engine stopping" if not self.running else "switch timed out"
+        return reply
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        cmd = str(request.get("cmd", "")).strip().lower()
+        if cmd == "status":
+            return self._status()
+        if cmd == "mode":
+            return self._switch(request)
+        if cmd == "stop":
+            self.stop()
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown cmd {cmd!r}"}
+
+
+def _run() -> int:
+    started_ts = time.monotonic()
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    if _is_running() and _read_pid() != os.getpid():
+        print("already-running")
+        return 0
+
+    PID_FILE.write_text(str(os.getpid()))
+    engine = SpeechEngine(START_MODE)
+
+    def _stop_signal_handler(_signum, _frame):
+        engine.stop()
+
+    signal.signal(signal.SIGINT, _stop_signal_handler)
+    signal.signal(signal.SIGTERM, _stop_signal_handler)
+
+    # Listen before the model loads: early mode requests wait for it instead
+    # of falling back to spawning a standalone daemon.
+    server = ControlServer(SOCKET_PATH, engine.handle, name="speech-engine-control")
+    server.start()
+    try:
+        prewarm_model(MODEL_NAME, "[speech-engine]")
+        load_start = time.monotonic()
+        print(f"[speech-engine] loading model={MODEL_NAME}", flush=True)
+        try:
+            model = dictation._load_model(MODEL_NAME)
+        except Exception as exc:
+            print(f"[speech-engine] failed to load model: {exc}", flush=True)
+            return 1
+        print(f"[speech-engine] model loaded in {time.monotonic() - load_start:.2f}s", flush=True)
+        # hyprwhspr's own realtime mode would fight over the mic; stop it once, not per switch.
+        dictation._stop_hyprwhspr_realtime()
+
+        device_id, capture_rate, device_name = dictation._pick_device()
+        if device_id is None or capture_rate is None:
+            print("[speech-engine] no input device found", flush=True)
+            return 1
+        print(f"[speech-engine] using input device: {device_name} (id={device_id}, rate={capture_rate}Hz)", flush=True)
+
+        with AudioCapture(device_id, capture_rate, dictation.CHANNELS, dictation.BLOCK_SIZE) as capture:
+            engine.run(model, capture, started_ts)
+    finally:
+        engine.stop()
+        server.close()
+        dictation.TYPER.close()
+        dictation._remove_file(PID_FILE)
+        print("[speech-engine] stopped", flush=True)
+    return 0
+
+
+def _request(payload: Dict[str, Any]) -> int:
+    reply = send_request(SOCKET_PATH, payload, timeout=SWITCH_TIMEOUT_SECONDS + 5.0) if SOCKET_PATH.exists() else None
+    if reply is None:
+        print("not-running")
+        return 1
+    print(json.dumps(reply))
+    return 0 if reply.get("ok") else 1
+
+
+def main() -> int:
+    cmd = (sys.argv[1] if len(sys.argv) > 1 else "status").lower()
+    if cmd == "run":
+        return _run()
+    if cmd == "status":
+        return _request({"cmd": "status"})
+    if cmd == "mode" and len(sys.argv) > 2:
+        return _request({"cmd": "mode", "mode": sys.argv[2].lower()})
+    if cmd == "stop":
+        return _request({"cmd": "stop"})
+
+    print(f"unknown command: {cmd}", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,7 +3,9 @@
 
 from __future__ import annotations
 
+import itertools
 import json
+import math
 import os
 import re
 import shlex
@@ -14,19 +16,32 @@ import threading
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import quote_plus
 
 import numpy as np
 import sounddevice as sd
 from pywhispercpp.model import Model
 
-from audio_ring_buffer import AudioRingBuffer
-
-try:
-    from scipy.signal import resample_poly  # type: ignore
-except Exception:
-    resample_poly = None
+from action_executor import Action, ActionExecutor, ActionResult
+from alias_index import AliasIndex
+from audio_capture import AudioCapture
+from audio_ring_buffer import AudioRingBuffer, AudioWindow
+from command_grammar import CommandGrammar
+from command_model import CommandModel, ConfigError, CustomCommand, validate_config
+from config_watcher import ConfigWatcher
+from control_socket import READY_FD_ENV, ControlServer, notify_ready, send_request, wait_ready
+from hypr_ipc import HyprIpc, HyprIpcError
+from hypr_state import HyprState, WindowMatcher
+from intent_engine import IntentEngine, IntentRule
+from loop_wakeup import LoopWakeup
+from model_prewarm import prewarm_model
+from speech_segmenter import SpeechEvent, SpeechSegmenter
+from step_scheduler import StepScheduler
+from stream_resampler import WhisperFeed
+from streaming_vad import StreamingVad
+from token_stabilizer import transcribe_hypothesis
+from ydotool_channel import KEY_EQUAL, KEY_LEFTCTRL, KEY_MINUS, YdotoolChannel, repeat_chord
 
 WHISPER_SAMPLE_RATE = 16000
 CHANNELS = 1
@@ -37,8 +52,24 @@ WINDOW_SECONDS = float(os.environ.get("LOCAL_VCMD_WINDOW_SECONDS", "3.4"))
 MAX_BUFFER_SECONDS = float(os.environ.get("LOCAL_VCMD_MAX_BUFFER_SECONDS", "8.0"))
 RMS_THRESHOLD = float(os.environ.get("LOCAL_VCMD_RMS_THRESHOLD", "0.00035"))
 VOICED_FRAME_MS = int(os.environ.get("LOCAL_VCMD_VOICED_FRAME_MS", "30"))
-MIN_VOICED_RATIO = float(os.environ.get("LOCAL_VCMD_MIN_VOICED_RATIO", "0.05"))
-SILENCE_COMMIT_SECONDS = float(os.environ.get("LOCAL_VCMD_SILENCE_COMMIT_SECONDS", "0.85"))
+SILENCE_COMMIT_SECONDS = float(os.environ.get("LOCAL_VCMD_SILENCE_COMMIT_SECONDS", "0.6"))
+ONSET_SECONDS = float(os.environ.get("LOCAL_VCMD_ONSET_SECONDS", "0.09"))
+PREROLL_SECONDS = float(os.environ.get("LOCAL_VCMD_PREROLL_SECONDS", "0.3"))
+SEGMENT_TAIL_SECONDS = float(os.environ.get("LOCAL_VCMD_SEGMENT_TAIL_SECONDS", "0.15"))
+MIN_UTTERANCE_SECONDS = float(os.environ.get("LOCAL_VCMD_MIN_UTTERANCE_SECONDS", "0.12"))
+MAX_UTTERANCE_SECONDS = float(os.environ.get("LOCAL_VCMD_MAX_UTTERANCE_SECONDS", "6.0"))
+SEGMENT_POLL_SECONDS = float(os.environ.get("LOCAL_VCMD_SEGMENT_POLL_SECONDS", "0.1"))
+PARTIAL_DECODES = os.environ.get("LOCAL_VCMD_PARTIAL_DECODES", "1").strip().lower() not in {"0", "false", "no", "off"}
+GRAMMAR_MODE = os.environ.get("LOCAL_VCMD_GRAMMAR", "1").strip().lower() not in {"0", "false", "no", "off"}
+GRAMMAR_SNAP_CUTOFF = float(os.environ.get("LOCAL_VCMD_GRAMMAR_SNAP_CUTOFF", "0.8"))
+GRAMMAR_MAX_TOKENS = int(os.environ.get("LOCAL_VCMD_GRAMMAR_MAX_TOKENS", "24"))
+FUZZY_ALIASES = os.environ.get("LOCAL_VCMD_FUZZY_ALIASES", "1").strip().lower() not in {"0", "false", "no", "off"}
+FUZZY_MIN_CHARS = int(os.environ.get("LOCAL_VCMD_FUZZY_MIN_CHARS", "6"))
+FUZZY_CHARS_PER_EDIT = int(os.environ.get("LOCAL_VCMD_FUZZY_CHARS_PER_EDIT", "4"))
+# Encoder frames per second of audio (1500 frames cover whisper's 30 s input).
+AUDIO_CTX_PER_SECOND = 50
+AUDIO_CTX_MAX = 1500
+AUDIO_CTX_MARGIN = 64
 FINAL_PAD_SECONDS = float(os.environ.get("LOCAL_VCMD_FINAL_PAD_SECONDS", "0.80"))
 MIN_FINAL_ANCHOR_WORDS = int(os.environ.get("LOCAL_VCMD_MIN_FINAL_ANCHOR_WORDS", "2"))
 COMMAND_CONFIRM_REPETITIONS = int(os.environ.get("LOCAL_VCMD_COMMAND_CONFIRM_REPETITIONS", "1"))
@@ -46,6 +77,11 @@ COMMAND_COOLDOWN_SECONDS = float(os.environ.get("LOCAL_VCMD_COMMAND_COOLDOWN_SEC
 ZOOM_KEY_DELAY_MS = int(os.environ.get("LOCAL_VCMD_ZOOM_KEY_DELAY_MS", "14"))
 ZOOM_STEP_SLEEP_MS = int(os.environ.get("LOCAL_VCMD_ZOOM_STEP_SLEEP_MS", "40"))
 ZOOM_REPEAT_MAX = max(1, int(os.environ.get("LOCAL_VCMD_ZOOM_REPEAT_MAX", "30")))
+YDOTOOL_BACKEND = os.environ.get("LOCAL_VCMD_YDOTOOL_BACKEND", "auto").strip().lower()
+ACTION_WORKERS = max(1, int(os.environ.get("LOCAL_VCMD_ACTION_WORKERS", "3")))
+ACTION_QUEUE = max(0, int(os.environ.get("LOCAL_VCMD_ACTION_QUEUE", "4")))
+ACTION_TIMEOUT_SECONDS = float(os.environ.get("LOCAL_VCMD_ACTION_TIMEOUT_SECONDS", "600"))
+DESKTOP_ACTION_TIMEOUT_SECONDS = float(os.environ.get("LOCAL_VCMD_DESKTOP_ACTION_TIMEOUT_SECONDS", "10"))
 
 MODEL_NAME = os.environ.get("LOCAL_VCMD_MODEL", "base.en")
 LANGUAGE_OVERRIDE = os.environ.get("LOCAL_VCMD_LANGUAGE", "en")
@@ -109,8 +145,9 @@ REPEAT_NUMBER_WORDS = {
 XDG_RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR", f"/tmp/{os.getuid()}")
 STATE_DIR = Path(XDG_RUNTIME_DIR) / "local-voice-commands"
 PID_FILE = STATE_DIR / "loop.pid"
-STOP_FILE = STATE_DIR / "stop"
+CONTROL_SOCKET = STATE_DIR / "control.sock"
 DICTATION_PID_FILE = Path(XDG_RUNTIME_DIR) / "local-live-dictation" / "loop.pid"
+SPEECH_ENGINE_SOCKET = Path(XDG_RUNTIME_DIR) / "local-speech-engine" / "control.sock"
 LOG_FILE = Path.home() / ".local" / "state" / "local-voice-commands.log"
 CONFIG_FILE = Path.home() / ".config" / "local-voice-commands" / "config.json"
 LOCAL_DICTATION_CMD = Path.home() / ".local" / "bin" / "local-live-dictation.py"
@@ -235,6 +272,19 @@ DEFAULT_CONFIG: Dict[str, Any] = {
 }
 
 RUNNING = True
+# The session loop sleeps on this between steps; stop requests notify it.
+WAKEUP = LoopWakeup()
+# One Hyprland IPC client for every query and dispatch (no hyprctl processes).
+HYPR = HyprIpc()
+# Windows and workspaces as Hyprland's event socket reports them; started with a session.
+HYPR_STATE = HyprState(HYPR)
+# Zoom keystrokes go through one persistent ydotoold connection.
+ZOOM_KEYS = YdotoolChannel(ZOOM_KEY_DELAY_MS, backend=YDOTOOL_BACKEND, log_prefix="[voice-cmd]", debug=DEBUG)
+# Command side effects run here, never on the capture/decode loop.
+ACTIONS = ActionExecutor(ACTION_WORKERS, name="voice-cmd-action", log_prefix="[voice-cmd]", debug=DEBUG)
+# Window, key, search and notification actions share one ordered lane, so
+# "open firefox" then "move firefox to workspace two" happen in that order.
+DESKTOP_LANE = "desktop"
 
 
 def _ensure_dirs() -> None:
@@ -250,13 +300,14 @@ def _ensure_config_file() -> None:
 
 
 def _load_config() -> Dict[str, Any]:
+    """The config file merged over DEFAULT_CONFIG; raises `ConfigError` if it is unusable."""
     _ensure_config_file()
     try:
         cfg = json.loads(CONFIG_FILE.read_text())
-    except Exception:
-        return DEFAULT_CONFIG
+    except (OSError, ValueError) as exc:
+        raise ConfigError(f"{CONFIG_FILE}: {exc}") from exc
     if not isinstance(cfg, dict):
-        return DEFAULT_CONFIG
+        raise ConfigError(f"{CONFIG_FILE}: top level must be a JSON object")
     out = dict(DEFAULT_CONFIG)
 
     def _merge_dict(default_dict: Any, user_dict: Any) -> Dict[str, Any]:
@@ -307,6 +358,7 @@ def _load_config() -> Dict[str, Any]:
     out["commands"] = _merge_named_list(DEFAULT_CONFIG.get("commands"), cfg.get("commands"))
     out["search"] = _merge_dict(DEFAULT_CONFIG.get("search"), cfg.get("search"))
 
+    validate_config(cfg, out)
     return out
 
 
@@ -367,6 +419,19 @@ def _stop_dictation_best_effort() -> None:
         pass
 
 
+def _engine_request(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Ask the resident speech engine, if one is up; None means run standalone."""
+    if not SPEECH_ENGINE_SOCKET.exists():
+        return None
+    return send_request(SPEECH_ENGINE_SOCKET, payload, timeout=20.0)
+
+
+def _daemon_request(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not CONTROL_SOCKET.exists():
+        return None
+    return send_request(CONTROL_SOCKET, payload, timeout=5.0)
+
+
 def _remove_file(path: Path) -> None:
     try:
         path.unlink(missing_ok=True)
@@ -377,10 +442,7 @@ def _remove_file(path: Path) -> None:
 def _stop_signal_handler(_signum, _frame):
     global RUNNING
     RUNNING = False
-    try:
-        STOP_FILE.touch(exist_ok=True)
-    except Exception:
-        pass
+    WAKEUP.notify()
 
 
 def _collapse_ws(text: str) -> str:
@@ -547,88 +609,41 @@ def _pick_device() -> Tuple[Optional[int], Optional[int], str]:
     return None, None, ""
 
 
-def _resample_to_whisper(audio: np.ndarray, source_rate: int) -> np.ndarray:
-    if source_rate == WHISPER_SAMPLE_RATE:
-        return audio
-    if audio.size == 0:
-        return audio
-
-    if resample_poly is not None:
-        try:
-            out = resample_poly(audio, WHISPER_SAMPLE_RATE, source_rate).astype(np.float32, copy=False)
-            return out
-        except Exception:
-            pass
-
-    duration = audio.size / float(source_rate)
-    target_samples = max(1, int(round(duration * WHISPER_SAMPLE_RATE)))
-    x_old = np.linspace(0.0, 1.0, num=audio.size, endpoint=False)
-    x_new = np.linspace(0.0, 1.0, num=target_samples, endpoint=False)
-    return np.interp(x_new, x_old, audio).astype(np.float32, copy=False)
-
-
-def _voiced_ratio(audio: np.ndarray, threshold: float, frame_ms: int, sample_rate: int) -> float:
-    if audio.size <= 0:
-        return 0.0
-    frame_samples = max(1, int(sample_rate * max(5, frame_ms) / 1000.0))
-    n_frames = audio.size // frame_samples
-    if n_frames <= 0:
-        return 1.0 if float(np.sqrt(np.mean(audio * audio))) >= threshold else 0.0
-    clipped = audio[: n_frames * frame_samples]
-    frames = clipped.reshape(n_frames, frame_samples)
-    frame_rms = np.sqrt(np.mean(frames * frames, axis=1))
-    voiced = np.count_nonzero(frame_rms >= threshold)
-    return float(voiced) / float(n_frames)
-
-
 def _run_hypr_exec(command_text: str) -> bool:
     try:
-        proc = subprocess.run(
-            ["hyprctl", "dispatch", "exec", command_text],
-            check=False,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=8,
-        )
-        return proc.returncode == 0
-    except Exception:
+        return HYPR.dispatch(f"exec {command_text}")
+    except HyprIpcError as exc:
+        if DEBUG:
+            print(f"[voice-cmd] hypr exec failed: {exc}", flush=True)
         return False
 
 
-def _run_hypr_dispatch(dispatch_text: str) -> bool:
+def _send_hypr_dispatches(lines: Tuple[str, ...]) -> bool:
+    """Send already-joined dispatcher lines in one IPC round trip; True if all succeeded."""
+    if not lines or not all(lines):
+        return False
     try:
-        parts = shlex.split(dispatch_text)
-        if not parts:
-            return False
-        proc = subprocess.run(
-            ["hyprctl", "dispatch", *parts],
-            check=False,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=8,
-        )
-        return proc.returncode == 0
-    except Exception:
+        return HYPR.dispatch(*lines)
+    except HyprIpcError as exc:
+        if DEBUG:
+            print(f"[voice-cmd] hypr dispatch failed: {exc}", flush=True)
         return False
 
 
-def _run_ydotool_key_events(key_events: List[str], key_delay_ms: int) -> bool:
-    if not key_events:
-        return False
+def _run_hypr_dispatches(dispatch_texts: List[str]) -> bool:
+    """Run dispatcher lines (`workspace +1`) in one IPC round trip; True if all succeeded."""
     try:
-        proc = subprocess.run(
-            ["ydotool", "key", "--key-delay", str(key_delay_ms), *key_events],
-            check=False,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            timeout=20,
-            text=True,
-        )
-        return proc.returncode == 0
-    except Exception:
+        # `hyprctl dispatch` joined its shell-split arguments with spaces.
+        lines = tuple(" ".join(shlex.split(text)) for text in dispatch_texts)
+    except ValueError as exc:
+        if DEBUG:
+            print(f"[voice-cmd] hypr dispatch failed: {exc}", flush=True)
         return False
+    return _send_hypr_dispatches(lines)
+
+
+def _run_hypr_dispatch(dispatch_text: str) -> bool:
+    return _run_hypr_dispatches([dispatch_text])
 
 
 def _extract_repeat_factors(text: str) -> List[int]:
@@ -686,15 +701,18 @@ def _parse_repeat_count(text: str, default_value: int = 1) -> int:
 
 def _zoom_focused_window(steps: int, zoom_in: bool) -> bool:
     steps = max(1, min(int(steps), ZOOM_REPEAT_MAX))
-    key_code = "13" if zoom_in else "12"  # KEY_EQUAL / KEY_MINUS
-
-    step_events = ["29:1", f"{key_code}:1", f"{key_code}:0", "29:0"]  # Ctrl + (=|-)
-    for idx in range(steps):
-        if not _run_ydotool_key_events(step_events, key_delay_ms=ZOOM_KEY_DELAY_MS):
-            return False
-        if idx + 1 < steps and ZOOM_STEP_SLEEP_MS > 0:
-            time.sleep(ZOOM_STEP_SLEEP_MS / 1000.0)
-    return True
+    # Every Ctrl + (=|-) step in one batch, the step pause encoded as timing.
+    events, pauses = repeat_chord(
+        [KEY_LEFTCTRL],
+        KEY_EQUAL if zoom_in else KEY_MINUS,
+        steps,
+        gap_seconds=max(0, ZOOM_STEP_SLEEP_MS) / 1000.0,
+    )
+    started = time.monotonic()
+    ok = ZOOM_KEYS.send_key_events(events, pauses=pauses)
+    if DEBUG:
+        print(f"[voice-cmd] zoom steps={steps} sent in {(time.monotonic() - started) * 1e3:.0f}ms ok={ok}", flush=True)
+    return ok
 
 
 def _normalize_target(text: str) -> str:
@@ -717,29 +735,18 @@ def _app_aliases(app: Dict[str, Any]) -> List[str]:
     return list(dict.fromkeys(aliases))
 
 
-def _resolve_app(cfg: Dict[str, Any], target: str) -> Optional[Dict[str, Any]]:
-    target = _normalize_target(target)
-    apps = cfg.get("apps", [])
-    if not isinstance(apps, list):
-        return None
+# A guessed name must never pick the window to close; these resolve exactly.
+_EXACT_APP_INTENTS = frozenset({"close"})
 
-    # Exact alias match first.
-    for app in apps:
-        if not isinstance(app, dict):
-            continue
-        aliases = _app_aliases(app)
-        if target in aliases:
-            return app
 
-    # Substring fallback for natural speech variants.
-    for app in apps:
-        if not isinstance(app, dict):
-            continue
-        aliases = _app_aliases(app)
-        for alias in aliases:
-            if target == alias or target in alias or alias in target:
-                return app
-    return None
+def _resolve_app(command_model: CommandModel, target: str, intent: str = "") -> Optional[Dict[str, Any]]:
+    target = _normalize_target(target)
+    hit = command_model.apps.lookup(target, fuzzy=FUZZY_ALIASES and intent not in _EXACT_APP_INTENTS)
+    if hit is None:
+        return None
+    if DEBUG and hit.kind != "exact":
+        print(f"[voice-cmd] app {target!r} -> {hit.alias!r} ({hit.kind}, distance={hit.distance})", flush=True)
+    return hit.value
 
 
 def _custom_aliases(entry: Dict[str, Any]) -> List[str]:
@@ -755,91 +762,35 @@ def _custom_aliases(entry: Dict[str, Any]) -> List[str]:
     return list(dict.fromkeys([a for a in aliases if a]))
 
 
-def _resolve_custom_command(cfg: Dict[str, Any], normalized_text: str) -> Optional[Dict[str, Any]]:
-    commands = cfg.get("commands", [])
-    if not isinstance(commands, list):
-        return None
-
-    run_prefixes = ("run ", "execute ", "start ")
+def _resolve_custom_command(command_model: CommandModel, normalized_text: str) -> Optional[CustomCommand]:
+    """Custom command whose id/alias is near `normalized_text`; exact aliases are matched by the intent engine."""
+    index = command_model.commands
     candidate_texts = [normalized_text]
-    for prefix in run_prefixes:
+    for prefix in ("run ", "execute ", "start "):
         if normalized_text.startswith(prefix):
             candidate_texts.append(normalized_text[len(prefix) :].strip())
-
     for candidate in candidate_texts:
-        if not candidate:
-            continue
-        for entry in commands:
-            if not isinstance(entry, dict):
-                continue
-            if candidate in _custom_aliases(entry):
-                return entry
+        hit = index.lookup(candidate, fuzzy=FUZZY_ALIASES)
+        if hit is not None:
+            if DEBUG:
+                print(
+                    f"[voice-cmd] command {candidate!r} -> {hit.alias!r} ({hit.kind}, distance={hit.distance})",
+                    flush=True,
+                )
+            return hit.value
     return None
 
 
-def _expand_path(text: str) -> str:
-    return str(Path(text).expanduser())
-
-
 def _load_hypr_clients() -> List[Dict[str, Any]]:
-    try:
-        proc = subprocess.run(
-            ["hyprctl", "clients", "-j"],
-            check=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True,
-            timeout=5,
-        )
-        if proc.returncode != 0:
-            return []
-        data = json.loads(proc.stdout or "[]")
-        if isinstance(data, list):
-            return [x for x in data if isinstance(x, dict)]
-        return []
-    except Exception:
-        return []
+    return HYPR_STATE.clients()
 
 
 def _active_window_address() -> str:
-    try:
-        proc = subprocess.run(
-            ["hyprctl", "activewindow", "-j"],
-            check=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True,
-            timeout=5,
-        )
-        if proc.returncode != 0:
-            return ""
-        data = json.loads(proc.stdout or "{}")
-        if isinstance(data, dict):
-            address = str(data.get("address", "")).strip()
-            return address
-        return ""
-    except Exception:
-        return ""
+    return HYPR_STATE.active_address()
 
 
 def _active_workspace_name() -> str:
-    try:
-        proc = subprocess.run(
-            ["hyprctl", "activeworkspace", "-j"],
-            check=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True,
-            timeout=5,
-        )
-        if proc.returncode != 0:
-            return ""
-        data = json.loads(proc.stdout or "{}")
-        if isinstance(data, dict):
-            return str(data.get("name", "")).strip()
-        return ""
-    except Exception:
-        return ""
+    return HYPR_STATE.active_workspace()
 
 
 def _client_workspace_name(client: Dict[str, Any]) -> str:
@@ -875,47 +826,17 @@ def _normalize_workspace_target(text: str) -> str:
 def _close_window_by_address(address: str) -> bool:
     if not address:
         return False
-    try:
-        proc = subprocess.run(
-            ["hyprctl", "dispatch", "closewindow", f"address:{address}"],
-            check=False,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            timeout=5,
-        )
-        return proc.returncode == 0
-    except Exception:
-        return False
+    return _run_hypr_dispatch(f"closewindow address:{address}")
 
 
 def _focus_window_by_address(address: str) -> bool:
     if not address:
         return False
-    try:
-        proc = subprocess.run(
-            ["hyprctl", "dispatch", "focuswindow", f"address:{address}"],
-            check=False,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            timeout=5,
-        )
-        return proc.returncode == 0
-    except Exception:
-        return False
+    return _run_hypr_dispatch(f"focuswindow address:{address}")
 
 
 def _close_active_window() -> bool:
-    try:
-        proc = subprocess.run(
-            ["hyprctl", "dispatch", "killactive"],
-            check=False,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            timeout=5,
-        )
-        return proc.returncode == 0
-    except Exception:
-        return False
+    return _run_hypr_dispatch("killactive")
 
 
 def _move_window_to_workspace(address: str, workspace_target: str, *, silent: bool = False) -> bool:
@@ -934,30 +855,18 @@ def _move_active_window_to_workspace(workspace_target: str, *, silent: bool = Fa
     return _move_window_to_workspace(address, workspace_target, silent=silent)
 
 
-def _match_client_for_app(client: Dict[str, Any], app: Dict[str, Any]) -> bool:
-    match = app.get("match", {})
-    if not isinstance(match, dict):
-        return False
-    cls = str(client.get("class", "")).lower()
-    title = str(client.get("title", "")).lower()
+def _app_matcher(command_model: CommandModel, app: Dict[str, Any]) -> WindowMatcher:
+    """The app's `match` rules, compiled with the command model it came from."""
+    return command_model.matcher_for(app)
 
-    class_contains = match.get("class_contains", [])
-    if isinstance(class_contains, list):
-        for token in class_contains:
-            if isinstance(token, str) and token.lower() in cls:
-                return True
 
-    title_contains = match.get("title_contains", [])
-    if isinstance(title_contains, list):
-        for token in title_contains:
-            if isinstance(token, str) and token.lower() in title:
-                return True
-    return False
+def _match_client_for_app(command_model: CommandModel, client: Dict[str, Any], app: Dict[str, Any]) -> bool:
+    return _app_matcher(command_model, app).matches(client)
 
 
-def _matching_clients_for_app(app: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _matching_clients_for_app(command_model: CommandModel, app: Dict[str, Any]) -> List[Dict[str, Any]]:
     clients = _load_hypr_clients()
-    return [client for client in clients if _match_client_for_app(client, app)]
+    return [client for client in clients if _match_client_for_app(command_model, client, app)]
 
 
 def _select_preferred_client(clients: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
@@ -990,32 +899,34 @@ def _open_app(app: Dict[str, Any]) -> bool:
         return _run_hypr_exec(launch_cmd)
 
 
-def _show_app(app: Dict[str, Any]) -> bool:
-    client = _select_preferred_client(_matching_clients_for_app(app))
+def _show_app(command_model: CommandModel, app: Dict[str, Any]) -> bool:
+    client = _select_preferred_client(_matching_clients_for_app(command_model, app))
     if client is not None:
         if _focus_window_by_address(str(client.get("address", ""))):
             return True
     return _open_app(app)
 
 
-def _focus_app(app: Dict[str, Any]) -> bool:
-    client = _select_preferred_client(_matching_clients_for_app(app))
+def _focus_app(command_model: CommandModel, app: Dict[str, Any]) -> bool:
+    client = _select_preferred_client(_matching_clients_for_app(command_model, app))
     if client is None:
         return False
     return _focus_window_by_address(str(client.get("address", "")))
 
 
-def _move_app_to_workspace(app: Dict[str, Any], workspace_target: str, *, silent: bool = False) -> bool:
-    client = _select_preferred_client(_matching_clients_for_app(app))
+def _move_app_to_workspace(
+    command_model: CommandModel, app: Dict[str, Any], workspace_target: str, *, silent: bool = False
+) -> bool:
+    client = _select_preferred_client(_matching_clients_for_app(command_model, app))
     if client is None:
         return False
     return _move_window_to_workspace(str(client.get("address", "")), workspace_target, silent=silent)
 
 
-def _close_app(app: Dict[str, Any]) -> bool:
+def _close_app(command_model: CommandModel, app: Dict[str, Any]) -> bool:
     clients = _load_hypr_clients()
     for client in clients:
-        if _match_client_for_app(client, app):
+        if _match_client_for_app(command_model, client, app):
             if _close_window_by_address(str(client.get("address", ""))):
                 return True
 
@@ -1025,11 +936,7 @@ def _close_app(app: Dict[str, Any]) -> bool:
     return False
 
 
-def _search_web(cfg: Dict[str, Any], query: str) -> bool:
-    query = _collapse_ws(query)
-    if not query:
-        return False
-
+def _search_template(cfg: Dict[str, Any]) -> str:
     search_cfg = cfg.get("search", {})
     if not isinstance(search_cfg, dict):
         search_cfg = DEFAULT_CONFIG.get("search", {})
@@ -1042,8 +949,15 @@ def _search_web(cfg: Dict[str, Any], query: str) -> bool:
     template = engines.get(default_engine) or DEFAULT_CONFIG["search"]["engines"]["duckduckgo"]
     if not isinstance(template, str) or "{query}" not in template:
         template = DEFAULT_CONFIG["search"]["engines"]["duckduckgo"]
+    return template
+
+
+def _search_web(command_model: CommandModel, query: str) -> bool:
+    query = _collapse_ws(query)
+    if not query:
+        return False
 
-    url = template.format(query=quote_plus(query))
+    url = command_model.search_template.format(query=quote_plus(query))
     try:
         subprocess.Popen(["xdg-open", url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         return True
@@ -1051,29 +965,16 @@ def _search_web(cfg: Dict[str, Any], query: str) -> bool:
         return _run_hypr_exec(f"xdg-open {shlex.quote(url)}")
 
 
-def _execute_custom_command(entry: Dict[str, Any]) -> bool:
-    dispatches_cmd = entry.get("dispatches", [])
-    if isinstance(dispatches_cmd, list):
-        commands = [str(x).strip() for x in dispatches_cmd if isinstance(x, str) and str(x).strip()]
-        if commands:
-            for dispatch_text in commands:
-                if not _run_hypr_dispatch(dispatch_text):
-                    return False
-            return True
-
-    dispatch_cmd = entry.get("dispatch", "")
-    if isinstance(dispatch_cmd, str) and dispatch_cmd.strip():
-        return _run_hypr_dispatch(dispatch_cmd.strip())
+def _execute_custom_command(command: CustomCommand, timeout: Optional[float] = None) -> bool:
+    if command.dispatches:
+        return _send_hypr_dispatches(command.dispatches)
 
-    exec_cmd = entry.get("exec", "")
-    if not isinstance(exec_cmd, str) or not exec_cmd.strip():
+    exec_cmd = command.exec_cmd
+    if not exec_cmd:
         return False
 
-    cwd_raw = entry.get("cwd", "")
-    cwd = _expand_path(cwd_raw) if isinstance(cwd_raw, str) and cwd_raw.strip() else None
-    detached = bool(entry.get("detached", True))
-
-    if detached:
+    cwd = command.cwd
+    if command.detached:
         try:
             subprocess.Popen(
                 ["bash", "-lc", exec_cmd],
@@ -1093,10 +994,12 @@ def _execute_custom_command(entry: Dict[str, Any]) -> bool:
             check=False,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
-            timeout=600,
+            timeout=timeout,
             text=True,
         )
         return proc.returncode == 0
+    except subprocess.TimeoutExpired as exc:
+        raise TimeoutError(f"{command.id!r} still running after {timeout:g}s; killed") from exc
     except Exception:
         return False
 
@@ -1121,85 +1024,253 @@ def _strip_polite_prefix(text: str) -> str:
     return text.strip()
 
 
-def _parse_intent(text: str) -> Tuple[str, str]:
-    s = _normalize_command_text(text)
-    if not s:
+# Every verb `INTENT_RULES` understands, as phrases; with the fillers below
+# they seed the recognition grammar.
+COMMAND_PHRASES = (
+    "open launch start run execute",
+    "focus on activate",
+    "show bring raise switch to",
+    "close quit exit stop kill",
+    "current this active app application window",
+    "move send to workspace desktop number num",
+    "zoom in out enhance increase decrease reduce shrink",
+    "times time x by once twice thrice",
+    "open the browser web internet and search",
+)
+# What `_strip_polite_prefix` / `_normalize_target` drop; never a command on its own.
+FILLER_PHRASES = ("please", "now", "can you", "could you", "would you", "i want to", "i'd like to", "the a an")
+# Everything after these is a search query, not a command word.
+FREE_TEXT_PREFIXES = ("search", "search for", "search web", "search web for", "find", "look up", "google")
+# The word after these may be a workspace name ("workspace code", "switch to special").
+WORKSPACE_NAME_PREFIXES = ("workspace", "desktop", "switch to")
+# Example commands for the decoding prompt.
+PROMPT_PHRASES = (
+    "open terminal",
+    "focus browser",
+    "close window",
+    "zoom in times 3",
+    "zoom out",
+    "move window to workspace 2",
+    "search for",
+)
+
+
+def _pattern_words(cfg: Dict[str, Any]) -> List[str]:
+    """Literal words in `commands[*].patterns`, so the grammar lets them through."""
+    words: List[str] = []
+    commands = cfg.get("commands", [])
+    for entry in commands if isinstance(commands, list) else []:
+        patterns = entry.get("patterns", []) if isinstance(entry, dict) else []
+        for pattern in patterns if isinstance(patterns, list) else []:
+            if isinstance(pattern, str):
+                # Drop group names and escapes (`(?P<name>`, `\s`) before taking words.
+                literal = re.sub(r"\(\?P?<[^>]*>|\\[A-Za-z]", " ", pattern)
+                words.extend(re.findall(r"[a-z']{2,}", literal.lower()))
+    return words
+
+
+def _command_grammar(cfg: Dict[str, Any]) -> CommandGrammar:
+    return CommandGrammar.from_config(
+        cfg,
+        COMMAND_PHRASES,
+        FREE_TEXT_PREFIXES,
+        FILLER_PHRASES,
+        extra_words=[*WORKSPACE_NUMBER_WORDS, *REPEAT_NUMBER_WORDS, *_pattern_words(cfg)],
+        prompt_phrases=PROMPT_PHRASES,
+        snap_cutoff=GRAMMAR_SNAP_CUTOFF,
+        literal_after=WORKSPACE_NAME_PREFIXES,
+        min_snap_chars=FUZZY_MIN_CHARS,
+    )
+
+
+_ACTIVE_WINDOW_TARGETS = frozenset(
+    {
+        "window",
+        "current window",
+        "active window",
+        "this window",
+        "current",
+        "active",
+        "this",
+        "app",
+        "application",
+        "current app",
+        "active app",
+        "this app",
+    }
+)
+_CLOSE_ACTIVE_TARGETS = frozenset({"app", "application", "window", "this", "current", "current window", "active window"})
+
+
+def _search_intent(groups: Dict[str, str]) -> Tuple[str, str]:
+    return "search", _collapse_ws(groups["query"])
+
+
+def _zoom_intent(intent: str) -> Callable[[Dict[str, str]], Tuple[str, str]]:
+    def build(groups: Dict[str, str]) -> Tuple[str, str]:
+        return intent, str(_parse_repeat_count(groups.get("count", ""), default_value=1))
+
+    return build
+
+
+def _target_intent(intent: str) -> Callable[[Dict[str, str]], Tuple[str, str]]:
+    def build(groups: Dict[str, str]) -> Tuple[str, str]:
+        return intent, _normalize_target(groups["target"])
+
+    return build
+
+
+def _move_intent(groups: Dict[str, str]) -> Tuple[str, str]:
+    app_target = _normalize_target(groups["target"])
+    workspace_target = _normalize_workspace_target(groups["workspace"])
+    if not workspace_target:
         return "", ""
+    if app_target in _ACTIVE_WINDOW_TARGETS:
+        return "move-active-workspace", workspace_target
+    return "move-app-workspace", _encode_pair_payload(app_target, workspace_target)
+
+
+def _close_intent(groups: Dict[str, str]) -> Tuple[str, str]:
+    target = _normalize_target(groups["target"])
+    if target in _CLOSE_ACTIVE_TARGETS:
+        return "close-active", target
+    return "close", target
+
+
+_CLOSE_VERBS = ("close", "quit", "exit", "stop", "kill")
+
+# Built-in intents, in priority order (first match wins). Patterns match the
+# whole normalized utterance; `verbs` are the first words each can start with.
+INTENT_RULES: Tuple[IntentRule, ...] = (
+    IntentRule(
+        "close-active",
+        r"(?:close|quit|exit|stop|kill)(?:\s+(?:current|this|active))?(?:\s+(?:app|application|window))?",
+        _CLOSE_VERBS,
+        build=lambda _groups: ("close-active", "active-window"),
+    ),
+    IntentRule(
+        "search",
+        r"(?:search(?: web)?(?: for)?|find|look up|google)\s+(?P<query>.+)",
+        ("search", "find", "look", "google"),
+        build=_search_intent,
+    ),
+    IntentRule(
+        "search",
+        r"open (?:the )?(?:browser|web|internet)(?: and)? search(?: for)?\s+(?P<query>.+)",
+        ("open",),
+        build=_search_intent,
+    ),
+    IntentRule(
+        "zoom-in",
+        r"(?:enhance|zoom in|increase zoom)(?:\s+(?P<count>.+))?",
+        ("enhance", "zoom", "increase"),
+        build=_zoom_intent("zoom-in"),
+    ),
+    IntentRule(
+        "zoom-out",
+        r"(?:zoom out|decrease zoom|reduce zoom|shrink)(?:\s+(?P<count>.+))?",
+        ("zoom", "decrease", "reduce", "shrink"),
+        build=_zoom_intent("zoom-out"),
+    ),
+    IntentRule("open", r"(?:open|launch|start|run)\s+(?P<target>.+)", ("open", "launch", "start", "run"), build=_target_intent("open")),
+    IntentRule("focus", r"(?:focus|activate)(?:\s+on)?\s+(?P<target>.+)", ("focus", "activate"), build=_target_intent("focus")),
+    IntentRule("show", r"(?:show|bring|raise|switch to)\s+(?P<target>.+)", ("show", "bring", "raise", "switch"), build=_target_intent("show")),
+    IntentRule(
+        "move-app-workspace",
+        r"(?:move|send)\s+(?P<target>.+?)\s+to\s+(?:workspace|desktop)\s+(?P<workspace>.+)",
+        ("move", "send"),
+        build=_move_intent,
+    ),
+    IntentRule("close", r"(?:close|quit|exit|stop|kill)\s+(?P<target>.+)", _CLOSE_VERBS, build=_close_intent),
+)
+
+
+def _custom_intent_rules(entries: List[Tuple[Dict[str, Any], CustomCommand]]) -> List[IntentRule]:
+    """Rules for `commands` in config; they win over the built-in intents.
+
+    Every entry's id/aliases are tried first, then the same names behind a
+    run/execute/start verb, then the entry's own `patterns` (regexes over the
+    normalized utterance, checked by `validate_config`).
+    """
+    exact: List[IntentRule] = []
+    prefixed: List[IntentRule] = []
+    declared: List[IntentRule] = []
+    for entry, command in entries:
+        for alias in _custom_aliases(entry):
+            exact.append(IntentRule("custom", re.escape(alias), (alias.split(" ", 1)[0],), data=command))
+            prefixed.append(
+                IntentRule("custom", r"(?:run|execute|start) " + re.escape(alias), ("run", "execute", "start"), data=command)
+            )
+        patterns = entry.get("patterns", [])
+        for pattern in patterns if isinstance(patterns, list) else []:
+            if isinstance(pattern, str) and pattern.strip():
+                declared.append(IntentRule("custom", pattern, data=command))
+    return [*exact, *prefixed, *declared]
+
 
-    if re.match(r"^(?:close|quit|exit|stop|kill)(?:\s+(?:current|this|active))?(?:\s+(?:app|application|window))?$", s):
-        return "close-active", "active-window"
-
-    for pattern in (
-        r"^(?:search(?: web)?(?: for)?|find|look up|google)\s+(.+)$",
-        r"^open (?:the )?(?:browser|web|internet)(?: and)? search(?: for)?\s+(.+)$",
-    ):
-        m = re.match(pattern, s)
-        if m:
-            return "search", _collapse_ws(m.group(1))
-
-    m = re.match(r"^(?:enhance|zoom in|increase zoom)(?:\s+(.+))?$", s)
-    if m:
-        count = _parse_repeat_count(m.group(1) or "", default_value=1)
-        return "zoom-in", str(count)
-
-    m = re.match(r"^(?:zoom out|decrease zoom|reduce zoom|shrink)(?:\s+(.+))?$", s)
-    if m:
-        count = _parse_repeat_count(m.group(1) or "", default_value=1)
-        return "zoom-out", str(count)
-
-    m = re.match(r"^(?:open|launch|start|run)\s+(.+)$", s)
-    if m:
-        return "open", _normalize_target(m.group(1))
-
-    m = re.match(r"^(?:focus|activate)(?:\s+on)?\s+(.+)$", s)
-    if m:
-        return "focus", _normalize_target(m.group(1))
-
-    m = re.match(r"^(?:show|bring|raise|switch to)\s+(.+)$", s)
-    if m:
-        return "show", _normalize_target(m.group(1))
-
-    m = re.match(r"^(?:move|send)\s+(.+?)\s+to\s+(?:workspace|desktop)\s+(.+)$", s)
-    if m:
-        app_target = _normalize_target(m.group(1))
-        workspace_target = _normalize_workspace_target(m.group(2))
-        if not workspace_target:
-            return "", ""
-        active_targets = {
-            "window",
-            "current window",
-            "active window",
-            "this window",
-            "current",
-            "active",
-            "this",
-            "app",
-            "application",
-            "current app",
-            "active app",
-            "this app",
-        }
-        if app_target in active_targets:
-            return "move-active-workspace", workspace_target
-        return "move-app-workspace", _encode_pair_payload(app_target, workspace_target)
-
-    m = re.match(r"^(?:close|quit|exit|stop|kill)\s+(.+)$", s)
-    if m:
-        target = _normalize_target(m.group(1))
-        if target in {"app", "application", "window", "this", "current", "current window", "active window"}:
-            return "close-active", target
-        return "close", target
-
-    return "", ""
+_MODEL_VERSIONS = itertools.count(1)
+
+
+def _compile_command_model(cfg: Dict[str, Any], version: int = 0, source: str = "") -> CommandModel:
+    """Compile a merged, validated config into the model commands run against."""
+    apps = [app for app in cfg.get("apps", []) if isinstance(app, dict)]
+    entries = [(entry, CustomCommand.from_config(entry)) for entry in cfg.get("commands", []) if isinstance(entry, dict)]
+    app_index: AliasIndex = AliasIndex(partial=True, min_fuzzy_chars=FUZZY_MIN_CHARS, chars_per_edit=FUZZY_CHARS_PER_EDIT)
+    for app in apps:
+        for alias in _app_aliases(app):
+            app_index.add(alias, app)
+    command_index: AliasIndex = AliasIndex(min_fuzzy_chars=FUZZY_MIN_CHARS, chars_per_edit=FUZZY_CHARS_PER_EDIT)
+    for entry, command in entries:
+        for alias in _custom_aliases(entry):
+            command_index.add(alias, command)
+    return CommandModel(
+        cfg=cfg,
+        intents=IntentEngine((*_custom_intent_rules(entries), *INTENT_RULES)),
+        apps=app_index,
+        commands=command_index,
+        search_template=_search_template(cfg),
+        grammar=_command_grammar(cfg) if GRAMMAR_MODE else None,
+        version=version,
+        source=source,
+        _matchers=CommandModel.freeze_matchers(apps),
+    )
+
+
+def _load_command_model() -> CommandModel:
+    started = time.perf_counter()
+    cfg = _load_config()
+    command_model = _compile_command_model(cfg, version=next(_MODEL_VERSIONS), source=str(CONFIG_FILE))
+    if DEBUG:
+        print(
+            f"[voice-cmd] config v{command_model.version}: {len(cfg['apps'])} apps, {len(cfg['commands'])} commands, "
+            f"compiled in {(time.perf_counter() - started) * 1e3:.1f} ms",
+            flush=True,
+        )
+    return command_model
+
+
+def _config_error(exc: Exception) -> None:
+    print(f"[voice-cmd] config rejected: {exc}", flush=True)
+    _notify("Command config error", f"{exc}\nKeeping the previous config.")
+
+
+# Compiled lazily on first use; `_run_session` starts watching the file.
+COMMAND_CONFIG: ConfigWatcher[CommandModel] = ConfigWatcher(
+    CONFIG_FILE,
+    _load_command_model,
+    fallback=lambda: _compile_command_model(DEFAULT_CONFIG),
+    on_error=_config_error,
+    name="voice-cmd-config",
+)
 
 
 def _intent_key(intent: str, payload: str) -> str:
     return f"{intent}:{_collapse_ws(payload).lower()}"
 
 
-def _execute_intent(intent: str, payload: str, cfg: Dict[str, Any]) -> bool:
+def _execute_intent(intent: str, payload: str, command_model: CommandModel) -> bool:
     if intent == "search":
-        ok = _search_web(cfg, payload)
+        ok = _search_web(command_model, payload)
         if DEBUG:
             print(f"[voice-cmd] command search payload={payload!r} ok={ok}", flush=True)
         _notify("Search", payload if ok else f"failed: {payload}")
@@ -1242,14 +1313,14 @@ def _execute_intent(intent: str, payload: str, cfg: Dict[str, Any]) -> bool:
                 print(f"[voice-cmd] bad move-app-workspace payload={payload!r}", flush=True)
             _notify("Move App", "invalid command payload")
             return False
-        app = _resolve_app(cfg, app_target)
+        app = _resolve_app(command_model, app_target)
         if app is None:
             _notify("Unknown app", app_target)
             if DEBUG:
                 print(f"[voice-cmd] unknown-app: {app_target}", flush=True)
             return False
         app_id = str(app.get("id", app_target))
-        ok = _move_app_to_workspace(app, workspace_target, silent=True)
+        ok = _move_app_to_workspace(command_model, app, workspace_target, silent=True)
         if DEBUG:
             print(
                 f"[voice-cmd] command move-app-workspace app={app_id!r} workspace={workspace_target!r} ok={ok}",
@@ -1258,7 +1329,7 @@ def _execute_intent(intent: str, payload: str, cfg: Dict[str, Any]) -> bool:
         _notify("Move App", f"{app_id} -> workspace {workspace_target}: {'ok' if ok else 'failed'}")
         return ok
 
-    app = _resolve_app(cfg, payload)
+    app = _resolve_app(command_model, payload, intent)
     if app is None:
         _notify("Unknown app", payload)
         if DEBUG:
@@ -1274,21 +1345,21 @@ def _execute_intent(intent: str, payload: str, cfg: Dict[str, Any]) -> bool:
         return ok
 
     if intent == "show":
-        ok = _show_app(app)
+        ok = _show_app(command_model, app)
         if DEBUG:
             print(f"[voice-cmd] command show app={app_id!r} ok={ok}", flush=True)
         _notify("Show App", f"{app_id}: {'ok' if ok else 'failed'}")
         return ok
 
     if intent == "focus":
-        ok = _focus_app(app)
+        ok = _focus_app(command_model, app)
         if DEBUG:
             print(f"[voice-cmd] command focus app={app_id!r} ok={ok}", flush=True)
         _notify("Focus App", f"{app_id}: {'ok' if ok else 'failed'}")
         return ok
 
     if intent == "close":
-        ok = _close_app(app)
+        ok = _close_app(command_model, app)
         if DEBUG:
             print(f"[voice-cmd] command close app={app_id!r} ok={ok}", flush=True)
         _notify("Close App", f"{app_id}: {'ok' if ok else 'failed'}")
@@ -1297,77 +1368,203 @@ def _execute_intent(intent: str, payload: str, cfg: Dict[str, Any]) -> bool:
     return False
 
 
-def _execute_command(text: str, cfg: Dict[str, Any]) -> bool:
+def _match_command(command_model: CommandModel, text: str) -> Tuple[Optional[CustomCommand], str, str]:
+    """`(custom command, intent, payload)` for an utterance.
+
+    The intent engine decides first (exact custom aliases, then built-ins);
+    only an utterance it does not recognize is looked up fuzzily among the
+    custom command aliases.
+    """
     normalized = _normalize_command_text(text)
-    custom = _resolve_custom_command(cfg, normalized)
+    match = command_model.intents.match(normalized)
+    if match is None:
+        return (_resolve_custom_command(command_model, normalized) if normalized else None), "", ""
+    if match.intent == "custom":
+        return match.rule.data, "", ""
+    return None, match.intent, match.payload
+
+
+def _custom_command_done(command: CustomCommand, result: ActionResult) -> None:
+    if DEBUG:
+        print(f"[voice-cmd] command custom id={command.id!r} {result.status}", flush=True)
+    outcome = {"ok": "ok", "busy": "already running", "timeout": "timed out"}.get(result.status, "failed")
+    _notify("Run Command", f"{command.notify}: {outcome}")
+
+
+def _intent_done(intent: str, result: ActionResult) -> None:
+    # Intents notify their own outcome; only report what they could not.
+    if result.status in {"busy", "timeout", "error"}:
+        _notify("Command not run" if result.status == "busy" else "Command failed", f"{intent}: {result.status}")
+
+
+def _custom_command_action(command: CustomCommand) -> Action:
+    if command.dispatches or command.detached or not command.exec_cmd:
+        return Action(
+            DESKTOP_LANE,
+            lambda: _execute_custom_command(command),
+            label=f"custom {command.id}",
+            timeout=DESKTOP_ACTION_TIMEOUT_SECONDS,
+            max_queued=ACTION_QUEUE,
+            on_done=lambda result: _custom_command_done(command, result),
+        )
+    # A blocking script gets a lane of its own: it never holds up window
+    # commands, and saying it again while it runs is refused, not queued.
+    return Action(
+        f"custom:{command.id}",
+        lambda: _execute_custom_command(command, ACTION_TIMEOUT_SECONDS),
+        label=f"custom {command.id}",
+        timeout=ACTION_TIMEOUT_SECONDS,
+        max_queued=0,
+        on_done=lambda result: _custom_command_done(command, result),
+    )
+
+
+def _intent_action(intent: str, payload: str, command_model: CommandModel) -> Action:
+    return Action(
+        DESKTOP_LANE,
+        lambda: _execute_intent(intent, payload, command_model),
+        label=intent,
+        timeout=DESKTOP_ACTION_TIMEOUT_SECONDS,
+        max_queued=ACTION_QUEUE,
+        on_done=lambda result: _intent_done(intent, result),
+    )
+
+
+def _run_action(action: Action, wait: bool) -> bool:
+    """Queue `action` on the pool, or with `wait` run it here and return its outcome."""
+    if wait:
+        return ACTIONS.run_now(action).ok
+    return ACTIONS.submit(action)
+
+
+def _execute_command(text: str, command_model: CommandModel, wait: bool = False) -> bool:
+    """Match `text` and hand its action to the executor; True if it was queued (or, with `wait`, succeeded)."""
+    custom, intent, payload = _match_command(command_model, text)
     if custom is not None:
-        ok = _execute_custom_command(custom)
-        custom_id = str(custom.get("id", "custom"))
-        custom_notify = str(custom.get("notify", custom_id))
-        if DEBUG:
-            print(f"[voice-cmd] command custom id={custom_id!r} ok={ok}", flush=True)
-        _notify("Run Command", f"{custom_notify}: {'ok' if ok else 'failed'}")
-        return ok
+        return _run_action(_custom_command_action(custom), wait)
 
-    intent, payload = _parse_intent(text)
     if not intent or not payload:
         if DEBUG:
             print(f"[voice-cmd] ignored: {text}", flush=True)
-        _notify("No command recognized", text)
+        notice = Action(DESKTOP_LANE, lambda: _notify("No command recognized", text) or True, label="notify")
+        _run_action(notice, wait)
         return False
-    return _execute_intent(intent, payload, cfg)
+    return _run_action(_intent_action(intent, payload, command_model), wait)
+
+
+def _load_model(model_name: str = MODEL_NAME) -> Model:
+    return Model(
+        model_name,
+        print_realtime=False,
+        print_progress=False,
+        print_timestamps=False,
+        single_segment=False,
+        no_context=True,
+    )
+
+
+def _handle_control(request: Dict[str, Any]) -> Dict[str, Any]:
+    global RUNNING
+    cmd = str(request.get("cmd", "")).strip().lower()
+    if cmd == "status":
+        return {"ok": True, "pid": os.getpid()}
+    if cmd in {"stop", "shutdown"}:
+        RUNNING = False
+        WAKEUP.notify()
+        return {"ok": True}
+    return {"ok": False, "error": f"unknown cmd {cmd!r}"}
 
 
 def _run_loop() -> int:
+    started_ts = time.monotonic()
     _ensure_dirs()
 
     if _is_running() and _read_pid() != os.getpid():
         return 0
 
     PID_FILE.write_text(str(os.getpid()))
-    _remove_file(STOP_FILE)
 
     signal.signal(signal.SIGINT, _stop_signal_handler)
     signal.signal(signal.SIGTERM, _stop_signal_handler)
 
-    cfg = _load_config()
+    server = ControlServer(CONTROL_SOCKET, _handle_control, name="voice-cmd-control")
+    server.start()
+    notify_ready()
 
     try:
-        print(f"[voice-cmd] loading model={MODEL_NAME}", flush=True)
-        model = Model(
-            MODEL_NAME,
-            print_realtime=False,
-            print_progress=False,
-            print_timestamps=False,
-            single_segment=False,
-            no_context=True,
-        )
-    except Exception as exc:
-        print(f"[voice-cmd] failed to load model: {exc}", flush=True)
+        prewarm_model(MODEL_NAME, "[voice-cmd]")
+        try:
+            print(f"[voice-cmd] loading model={MODEL_NAME}", flush=True)
+            load_start = time.monotonic()
+            model = _load_model()
+        except Exception as exc:
+            print(f"[voice-cmd] failed to load model: {exc}", flush=True)
+            return 1
+        print(f"[voice-cmd] model loaded in {time.monotonic() - load_start:.2f}s", flush=True)
+
+        device_id, capture_rate, device_name = _pick_device()
+        if device_id is None or capture_rate is None:
+            print("[voice-cmd] no input device found", flush=True)
+            return 1
+
+        print(f"[voice-cmd] using input device: {device_name} (id={device_id}, rate={capture_rate}Hz)", flush=True)
+
+        with AudioCapture(device_id, capture_rate, CHANNELS, BLOCK_SIZE) as capture:
+            return _run_session(model, capture, lambda: not RUNNING, started_ts=started_ts)
+    finally:
+        server.close()
+        print("[voice-cmd] stopped", flush=True)
         _remove_file(PID_FILE)
-        _remove_file(STOP_FILE)
-        return 1
 
-    device_id, capture_rate, device_name = _pick_device()
-    if device_id is None or capture_rate is None:
-        print("[voice-cmd] no input device found", flush=True)
-        _remove_file(PID_FILE)
-        _remove_file(STOP_FILE)
-        return 1
 
-    print(f"[voice-cmd] using input device: {device_name} (id={device_id}, rate={capture_rate}Hz)", flush=True)
+def _run_session(
+    model: Model,
+    capture: AudioCapture,
+    should_stop: Callable[[], bool],
+    started_ts: Optional[float] = None,
+) -> int:
+    """Listen for commands on an open capture stream until `should_stop()`.
+
+    A `SpeechSegmenter` cuts the stream into utterances. Each one is decoded
+    once when it ends (pre-roll included), with optional partial decodes
+    while it is still being spoken so a clear command can run early.
+    `started_ts` is the origin for the time-to-first-hypothesis log line.
+    """
+    capture_rate = capture.rate
+    if started_ts is None:
+        started_ts = time.monotonic()
+    first_hypothesis_logged = False
+    COMMAND_CONFIG.current  # compile before the first utterance, not during it
+    COMMAND_CONFIG.start()
+    HYPR_STATE.start()
+    ACTIONS.start()
 
     max_samples = int(MAX_BUFFER_SECONDS * capture_rate)
-    window_samples = int(WINDOW_SECONDS * capture_rate)
-    audio_buffer = AudioRingBuffer(max_samples)
+    vad = StreamingVad.for_stream(capture_rate, VOICED_FRAME_MS, RMS_THRESHOLD, MAX_BUFFER_SECONDS)
+    audio_buffer = AudioRingBuffer(max_samples, single_producer=True, vad=vad)
+    whisper_feed = WhisperFeed(audio_buffer, capture_rate, WHISPER_SAMPLE_RATE)
+    # Off unless asked for: faster steps only cost CPU on short commands.
+    scheduler = StepScheduler.from_env("LOCAL_VCMD", STEP_SECONDS, WINDOW_SECONDS, MAX_BUFFER_SECONDS, enabled=False)
+    segmenter = SpeechSegmenter.for_stream(
+        vad,
+        capture_rate,
+        onset_seconds=ONSET_SECONDS,
+        hangover_seconds=SILENCE_COMMIT_SECONDS,
+        preroll_seconds=PREROLL_SECONDS,
+        tail_seconds=SEGMENT_TAIL_SECONDS,
+        min_voiced_seconds=MIN_UTTERANCE_SECONDS,
+        max_seconds=min(MAX_UTTERANCE_SECONDS, MAX_BUFFER_SECONDS - PREROLL_SECONDS),
+    )
 
-    last_process = 0.0
+    last_poll = 0.0
+    last_partial = 0.0
     phrase_text = ""
-    phrase_started_ts = 0.0
-    last_voice_ts = 0.0
     candidate_key = ""
     candidate_repetitions = 0
     last_execute_ts = 0.0
+    # Set once a partial hypothesis ran a command; the rest of that utterance is ignored.
+    utterance_consumed = False
+    utterance_decodes = 0
 
     def _current_language() -> str:
         lang = LANGUAGE_OVERRIDE.strip()
@@ -1375,63 +1572,119 @@ def _run_loop() -> int:
             return lang
         return "en"
 
-    def _transcribe_window(audio_window: np.ndarray, pad_seconds: float = 0.0) -> str:
-        if audio_window.size <= 0:
-            return ""
-        if pad_seconds > 0.0:
-            pad_samples = max(1, int(round(pad_seconds * capture_rate)))
-            audio_window = np.concatenate([audio_window, np.zeros(pad_samples, dtype=np.float32)], axis=0)
-
-        whisper_audio = _resample_to_whisper(audio_window, capture_rate)
+    def _transcribe_window(window: AudioWindow, pad_seconds: float = 0.0) -> str:
+        whisper_audio = window.samples
         if whisper_audio.size <= 0:
             return ""
+        if pad_seconds > 0.0:
+            pad_samples = max(1, int(round(pad_seconds * WHISPER_SAMPLE_RATE)))
+            whisper_audio = np.concatenate([whisper_audio, np.zeros(pad_samples, dtype=np.float32)], axis=0)
 
+        # One model per decode: a reload between prompt and constrain must not mix vocabularies.
+        grammar = COMMAND_CONFIG.current.grammar
         try:
-            kwargs = {}
+            kwargs: Dict[str, Any] = {}
             lang = _current_language()
             if lang:
                 kwargs["language"] = lang
-            segments = model.transcribe(whisper_audio, n_processors=None, **kwargs)
-            text = " ".join(seg.text for seg in segments if getattr(seg, "text", "")).strip()
+            if grammar is not None:
+                # Encoder sized to the utterance instead of 30 s, prompt primed with the
+                # vocabulary, and no room for the long runs Whisper invents on noise.
+                seconds = whisper_audio.size / float(WHISPER_SAMPLE_RATE)
+                kwargs["audio_ctx"] = min(AUDIO_CTX_MAX, int(math.ceil(seconds * AUDIO_CTX_PER_SECOND)) + AUDIO_CTX_MARGIN)
+                kwargs["initial_prompt"] = grammar.prompt
+                kwargs["max_tokens"] = GRAMMAR_MAX_TOKENS
+            text = transcribe_hypothesis(model, whisper_audio, False, **kwargs).text
         except Exception:
             return ""
 
+        if not whisper_feed.is_intact(window):
+            if DEBUG:
+                print("[voice-cmd] dropped hypothesis: audio window overwritten during decode", flush=True)
+            return ""
+
         text = _collapse_ws(text)
         if not text or _is_hallucination(text):
             return ""
+        if grammar is not None:
+            match = grammar.constrain(text)
+            if match is None:
+                if DEBUG and LOG_TRANSCRIPTS:
+                    print(f"[voice-cmd] out of grammar: {text}", flush=True)
+                return ""
+            if match.snapped and DEBUG:
+                print(f"[voice-cmd] snapped {text!r} -> {match.text!r}", flush=True)
+            text = match.text
         return text
 
-    def _finalize_phrase() -> None:
-        nonlocal phrase_text, phrase_started_ts, last_voice_ts, candidate_key, candidate_repetitions
-
-        pending = _collapse_ws(phrase_text)
-        if not pending:
-            return
-
-        audio_now = audio_buffer.snapshot(limit_samples=window_samples)
-        decoded = _transcribe_window(audio_now, pad_seconds=FINAL_PAD_SECONDS) if audio_now.size > 0 else ""
-        final_text = _choose_final_text(pending, decoded, MIN_FINAL_ANCHOR_WORDS)
+    def _decode(window: AudioWindow, pad_seconds: float = 0.0) -> str:
+        nonlocal first_hypothesis_logged, utterance_decodes
+        decode_start = time.monotonic()
+        text = _transcribe_window(window, pad_seconds=pad_seconds)
+        decode_seconds = time.monotonic() - decode_start
+        utterance_decodes += 1
+        decision = scheduler.observe(window.size / float(WHISPER_SAMPLE_RATE), decode_seconds)
+        if decision and DEBUG:
+            print(f"[voice-cmd] scheduler: {decision}", flush=True)
+        if text and not first_hypothesis_logged:
+            first_hypothesis_logged = True
+            print(
+                f"[voice-cmd] first hypothesis {time.monotonic() - started_ts:.2f}s after start "
+                f"(decode={decode_seconds:.2f}s)",
+                flush=True,
+            )
+        return text
 
-        if DEBUG and LOG_TRANSCRIPTS:
-            print(f"[voice-cmd] finalize: {final_text}", flush=True)
+    def _utterance_window(event: SpeechEvent) -> AudioWindow:
+        """Whisper-rate audio for the event's frames; the ring's newest samples are 'now'."""
+        now_frame = vad.frame_count
+        window = whisper_feed.view(segmenter.samples_for(now_frame - event.start_frame, WHISPER_SAMPLE_RATE))
+        trim = min(window.size, segmenter.samples_for(now_frame - event.end_frame, WHISPER_SAMPLE_RATE))
+        if trim <= 0:
+            return window
+        return AudioWindow(samples=window.samples[: window.size - trim], start=window.start)
 
-        _execute_command(final_text, cfg)
+    def _finalize_utterance(event: SpeechEvent) -> None:
+        nonlocal phrase_text, candidate_key, candidate_repetitions, utterance_consumed, utterance_decodes
 
+        pending = _collapse_ws(phrase_text)
+        consumed = utterance_consumed
         phrase_text = ""
-        phrase_started_ts = 0.0
-        last_voice_ts = 0.0
         candidate_key = ""
         candidate_repetitions = 0
-        audio_buffer.clear()
+        utterance_consumed = False
+        if consumed:
+            return
+        if event.kind == "noise":
+            if DEBUG:
+                print(f"[voice-cmd] skipped noise ({event.voiced_frames} voiced frames)", flush=True)
+            return
+
+        whisper_feed.pump()
+        window = _utterance_window(event)
+        decoded = _decode(window, pad_seconds=FINAL_PAD_SECONDS) if window.size > 0 else ""
+        final_text = _choose_final_text(pending, decoded, MIN_FINAL_ANCHOR_WORDS)
+
+        if DEBUG:
+            since_speech = (vad.frame_count - event.end_frame) * segmenter.frame_seconds
+            print(
+                f"[voice-cmd] utterance {window.size / float(WHISPER_SAMPLE_RATE):.2f}s"
+                f"{' (max length)' if event.forced else ''} decodes={utterance_decodes} "
+                f"decided {since_speech:.2f}s after speech end"
+                + (f": {final_text}" if LOG_TRANSCRIPTS else ""),
+                flush=True,
+            )
+        utterance_decodes = 0
+        if final_text:
+            _execute_command(final_text, COMMAND_CONFIG.current)
 
     def _try_execute_live_command(text: str, now: float) -> bool:
-        nonlocal phrase_text, phrase_started_ts, last_voice_ts, candidate_key, candidate_repetitions, last_execute_ts
+        nonlocal phrase_text, candidate_key, candidate_repetitions, last_execute_ts, utterance_consumed
 
-        normalized = _normalize_command_text(text)
-        custom = _resolve_custom_command(cfg, normalized)
+        command_model = COMMAND_CONFIG.current
+        custom, intent, payload = _match_command(command_model, text)
         if custom is not None:
-            custom_id = str(custom.get("id", "custom"))
-            key = f"custom:{custom_id}"
+            key = f"custom:{custom.id}"
 
             if key == candidate_key:
                 candidate_repetitions += 1
@@ -1444,21 +1697,14 @@ def _run_loop() -> int:
             if (now - last_execute_ts) < max(0.0, COMMAND_COOLDOWN_SECONDS):
                 return False
 
-            ok = _execute_custom_command(custom)
-            custom_notify = str(custom.get("notify", custom_id))
-            if DEBUG:
-                print(f"[voice-cmd] command custom id={custom_id!r} ok={ok}", flush=True)
-            _notify("Run Command", f"{custom_notify}: {'ok' if ok else 'failed'}")
+            ok = ACTIONS.submit(_custom_command_action(custom))
             last_execute_ts = now
             candidate_key = ""
             candidate_repetitions = 0
             phrase_text = ""
-            phrase_started_ts = 0.0
-            last_voice_ts = 0.0
-            audio_buffer.clear()
+            utterance_consumed = True
             return ok
 
-        intent, payload = _parse_intent(text)
         if not intent or not payload:
             candidate_key = ""
             candidate_repetitions = 0
@@ -1476,108 +1722,125 @@ def _run_loop() -> int:
         if (now - last_execute_ts) < max(0.0, COMMAND_COOLDOWN_SECONDS):
             return False
 
-        ok = _execute_intent(intent, payload, cfg)
+        ok = ACTIONS.submit(_intent_action(intent, payload, command_model))
         last_execute_ts = now
         candidate_key = ""
         candidate_repetitions = 0
         phrase_text = ""
-        phrase_started_ts = 0.0
-        last_voice_ts = 0.0
-        audio_buffer.clear()
+        utterance_consumed = True
         return ok
 
-    def audio_callback(indata, _frames, _time_info, status):
-        if status:
-            return
-        mono = indata[:, 0].copy()
-        audio_buffer.append(mono)
-
     print("[voice-cmd] started", flush=True)
     if DEBUG:
         print(
             "[voice-cmd] settings "
             f"step={STEP_SECONDS}s window={WINDOW_SECONDS}s max_buffer={MAX_BUFFER_SECONDS}s "
-            f"rms_threshold={RMS_THRESHOLD} min_voiced_ratio={MIN_VOICED_RATIO} "
-            f"silence_commit={SILENCE_COMMIT_SECONDS}s final_pad={FINAL_PAD_SECONDS}s "
+            f"adaptive={scheduler.enabled} step_bounds=({scheduler.min_step},{scheduler.max_step}) "
+            f"window_bounds=({scheduler.min_window},{scheduler.max_window}) target_latency={scheduler.target_latency}s "
+            f"rms_threshold={RMS_THRESHOLD} onset={ONSET_SECONDS}s preroll={PREROLL_SECONDS}s "
+            f"silence_commit={SILENCE_COMMIT_SECONDS}s tail={SEGMENT_TAIL_SECONDS}s "
+            f"min_utterance={MIN_UTTERANCE_SECONDS}s max_utterance={MAX_UTTERANCE_SECONDS}s "
+            f"partial_decodes={PARTIAL_DECODES} final_pad={FINAL_PAD_SECONDS}s "
             f"confirm_repetitions={COMMAND_CONFIRM_REPETITIONS} cooldown={COMMAND_COOLDOWN_SECONDS}s",
             flush=True,
         )
 
+    def _on_audio(block: np.ndarray) -> None:
+        # Lock-free SPSC append copies the strided channel straight into the ring.
+        audio_buffer.append(block)
+        WAKEUP.notify_audio()
+
+    last_generation = -1
+    capture.attach(_on_audio)
+    # The speech engine suspends the shared stream while idle.
+    capture.resume()
     try:
-        with sd.InputStream(
-            device=device_id,
-            samplerate=capture_rate,
-            channels=CHANNELS,
-            dtype=np.float32,
-            blocksize=BLOCK_SIZE,
-            callback=audio_callback,
-        ):
-            while RUNNING and not STOP_FILE.exists():
-                now = time.monotonic()
-                if now - last_process < STEP_SECONDS:
-                    time.sleep(0.03)
-                    continue
-                last_process = now
-
-                audio = audio_buffer.snapshot(limit_samples=window_samples)
-                if audio.size <= 0:
-                    continue
-
-                rms = float(np.sqrt(np.mean(audio * audio)))
-                voiced_ratio = _voiced_ratio(audio, RMS_THRESHOLD, VOICED_FRAME_MS, capture_rate)
-                is_voiced = rms >= RMS_THRESHOLD and voiced_ratio >= MIN_VOICED_RATIO
-
-                if is_voiced:
-                    text = _transcribe_window(audio)
-                    if text:
-                        phrase_text = text
-                        if phrase_started_ts <= 0.0:
-                            phrase_started_ts = now
-                        last_voice_ts = now
-                        if DEBUG and LOG_TRANSCRIPTS:
-                            preview = text if len(text) <= 140 else text[:137] + "..."
-                            print(f"[voice-cmd] heard: {preview}", flush=True)
-                        _try_execute_live_command(text, now)
-                    continue
-
-                if phrase_text and last_voice_ts > 0.0 and (now - last_voice_ts) >= SILENCE_COMMIT_SECONDS:
-                    _finalize_phrase()
-
-            if phrase_text:
-                _finalize_phrase()
+        while not should_stop():
+            now = time.monotonic()
+            poll_deadline = last_poll + SEGMENT_POLL_SECONDS
+            if now < poll_deadline:
+                WAKEUP.wait_until(poll_deadline)
+                continue
+            if audio_buffer.generation == last_generation:
+                # Nothing new since the last poll; the next capture block ends the wait.
+                WAKEUP.wait(SEGMENT_POLL_SECONDS, audio=True)
+                continue
+            last_poll = now
+            last_generation = audio_buffer.generation
+
+            whisper_feed.pump()
+            for event in segmenter.update():
+                if event.kind == "onset":
+                    utterance_decodes = 0
+                    # The first partial waits one step so it has something to decode.
+                    last_partial = now
+                else:
+                    _finalize_utterance(event)
+
+            if not PARTIAL_DECODES or not segmenter.in_speech or utterance_consumed:
+                continue
+            if now - last_partial < scheduler.step_seconds:
+                continue
+            last_partial = now
 
+            limit = min(
+                segmenter.samples_for(segmenter.speech_frames(), WHISPER_SAMPLE_RATE),
+                scheduler.window_samples(WHISPER_SAMPLE_RATE),
+            )
+            window = whisper_feed.view(limit)
+            if window.size <= 0:
+                continue
+            text = _decode(window)
+            if text:
+                phrase_text = text
+                if DEBUG and LOG_TRANSCRIPTS:
+                    preview = text if len(text) <= 140 else text[:137] + "..."
+                    print(f"[voice-cmd] heard: {preview}", flush=True)
+                _try_execute_live_command(text, now)
+
+        if segmenter.in_speech and phrase_text:
+            _finalize_utterance(SpeechEvent("offset", segmenter.start_frame, vad.frame_count, 0, forced=True))
     finally:
-        print("[voice-cmd] stopped", flush=True)
-        _remove_file(PID_FILE)
-        _remove_file(STOP_FILE)
+        capture.detach(_on_audio)
+        # The engine may switch to dictation or idle; nothing of this session keeps running.
+        HYPR_STATE.stop()
+        COMMAND_CONFIG.stop()
+        ACTIONS.stop()
 
     return 0
 
 
 def _daemon_start() -> int:
     _ensure_dirs()
+    reply = _engine_request({"cmd": "mode", "mode": "commands"})
+    if reply is not None:
+        if not reply.get("ok"):
+            print("start-failed")
+            return 1
+        print("already-running" if reply.get("previous") == "commands" else "started")
+        return 0
+
     _stop_dictation_best_effort()
     if _is_running():
         print("already-running")
         return 0
 
-    _remove_file(STOP_FILE)
-
-    with LOG_FILE.open("a", buffering=1) as log:
-        proc = subprocess.Popen(
-            [str(Path(__file__).resolve()), "run"],
-            stdout=log,
-            stderr=subprocess.STDOUT,
-            start_new_session=True,
-        )
-
-    for _ in range(60):
-        if _is_running():
-            print("started")
-            return 0
-        time.sleep(0.05)
+    # The daemon writes to this pipe once its control socket is listening.
+    read_fd, write_fd = os.pipe()
+    try:
+        with LOG_FILE.open("a", buffering=1) as log:
+            proc = subprocess.Popen(
+                [str(Path(__file__).resolve()), "run"],
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+                pass_fds=(write_fd,),
+                env={**os.environ, READY_FD_ENV: str(write_fd)},
+            )
+    finally:
+        os.close(write_fd)
 
-    if proc.poll() is None:
+    if wait_ready(read_fd, 3.0) or proc.poll() is None:
         print("started")
         return 0
 
@@ -1587,18 +1850,28 @@ def _daemon_start() -> int:
 
 def _daemon_stop() -> int:
     _ensure_dirs()
+    reply = _engine_request({"cmd": "mode", "mode": "idle", "if_mode": "commands"})
+    if reply is not None and reply.get("ok"):
+        print("stopped" if reply.get("changed") else "already-stopped")
+        return 0
+    if SPEECH_ENGINE_SOCKET.exists():
+        # The PID file holds the engine's pid; signaling it would kill the engine.
+        error = reply.get("error", "request failed") if reply is not None else "no reply"
+        print(f"speech engine did not leave command mode: {error}", file=sys.stderr)
+        return 1
+
     pid = _read_pid()
     if not pid or not _pid_alive(pid):
         _remove_file(PID_FILE)
-        _remove_file(STOP_FILE)
         print("already-stopped")
         return 0
 
-    STOP_FILE.touch(exist_ok=True)
-    try:
-        os.kill(pid, signal.SIGTERM)
-    except OSError:
-        pass
+    reply = _daemon_request({"cmd": "stop"})
+    if reply is None or not reply.get("ok"):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
 
     for _ in range(80):
         if not _pid_alive(pid):
@@ -1612,7 +1885,6 @@ def _daemon_stop() -> int:
             pass
 
     _remove_file(PID_FILE)
-    _remove_file(STOP_FILE)
     print("stopped")
     return 0
 
@@ -1628,9 +1900,17 @@ def _simulate(text: str) -> int:
     if not phrase:
         print("simulate-empty")
         return 2
-    cfg = _load_config()
+    command_model = COMMAND_CONFIG.current
     print(f"simulate: {phrase}")
-    _execute_command(phrase, cfg)
+    if command_model.grammar is not None:
+        match = command_model.grammar.constrain(phrase)
+        if match is None:
+            print("simulate: out of grammar")
+            return 1
+        if match.snapped:
+            print(f"simulate: snapped -> {match.text}")
+        phrase = match.text
+    _execute_command(phrase, command_model, wait=True)
     return 0
 
 
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+
+class LoopWakeup:
+    """What the daemon loops block on between steps.
+
+    `notify()` is called for anything the loop must react to right away: a
+    control message (typing toggled, stop, mode switch) or a finished decode.
+    New audio only wakes the loop while it asked for it with
+    `wait(..., audio=True)`; otherwise `notify_audio()` from the capture
+    callback is a single attribute read, so a warm daemon with typing off
+    sleeps until it is told something changed. Notifications are latched:
+    one that lands between two waits ends the next wait immediately.
+
+    The condition is reentrant because signal handlers call `notify()` on
+    the main thread, which may be inside `wait()` at the time.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.RLock())
+        self._pending = False
+        self._want_audio = False
+        self.wakeups = 0
+
+    def notify(self) -> None:
+        with self._cond:
+            self._pending = True
+            self._cond.notify_all()
+
+    def notify_audio(self) -> None:
+        if self._want_audio:
+            self.notify()
+
+    def wait(self, timeout: Optional[float] = None, audio: bool = False) -> bool:
+        """Block until notified or `timeout` seconds pass (forever with None); True if notified."""
+        with self._cond:
+            self._want_audio = audio
+            try:
+                if not self._pending:
+                    if timeout is None:
+                        self._cond.wait_for(lambda: self._pending)
+                    elif timeout > 0.0:
+                        self._cond.wait_for(lambda: self._pending, timeout)
+                notified = self._pending
+                self._pending = False
+            finally:
+                self._want_audio = False
+            self.wakeups += 1
+            return notified
+
+    def wait_until(self, deadline: float, audio: bool = False) -> bool:
+        """`wait()` up to the `time.monotonic()` instant `deadline`."""
+        return self.wait(deadline - time.monotonic(), audio=audio)
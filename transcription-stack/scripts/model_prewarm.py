@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Pull Whisper ggml model files into the page cache before they are loaded.
+
+whisper.cpp reads the model with buffered `fread`, so a cold start pays for
+the disk reads inside `Model(...)`. Mapping the file, advising the kernel
+with `posix_fadvise`/`madvise(MADV_WILLNEED)` and touching one byte per page
+makes those reads hit memory instead. Run it from a login unit to warm the
+cache ahead of the first mode switch, or call `prewarm_model()` right before
+loading. Stdlib only, so the systemd hook needs no venv.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+_FALSEY = {"0", "false", "no", "off"}
+
+
+@dataclass(frozen=True)
+class PrewarmResult:
+    path: Path
+    size_bytes: int
+    seconds: float
+    populated: bool
+
+    @property
+    def mib_per_second(self) -> float:
+        return self.size_bytes / (1024.0 * 1024.0) / max(1e-9, self.seconds)
+
+
+def prewarm_enabled() -> bool:
+    return os.environ.get("LOCAL_SPEECH_PREWARM", "1").strip().lower() not in _FALSEY
+
+
+def models_dir() -> Path:
+    """Where pywhispercpp keeps downloaded models (platformdirs user_data_dir)."""
+    override = os.environ.get("LOCAL_SPEECH_MODELS_DIR", "").strip()
+    if override:
+        return Path(override).expanduser()
+    data_home = os.environ.get("XDG_DATA_HOME", "").strip() or str(Path.home() / ".local" / "share")
+    return Path(data_home) / "pywhispercpp" / "models"
+
+
+def resolve_model_path(model_name: str) -> Optional[Path]:
+    """Map a pywhispercpp model name (or a file path) to the ggml file on disk."""
+    name = model_name.strip()
+    if not name:
+        return None
+    direct = Path(name).expanduser()
+    if direct.is_file():
+        return direct
+    candidate = models_dir() / f"ggml-{name}.bin"
+    return candidate if candidate.is_file() else None
+
+
+def prewarm_file(path: Path, populate: bool = True) -> PrewarmResult:
+    """Read-ahead `path` into the page cache; with `populate`, fault in every page."""
+    started = time.monotonic()
+    fd = os.open(str(path), os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if size <= 0:
+            return PrewarmResult(path, 0, time.monotonic() - started, False)
+        if hasattr(os, "posix_fadvise"):
+            # Starts asynchronous readahead of the whole file.
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_WILLNEED)
+            if populate:
+                # One byte per page: a strided slice faults each page in without copying the file.
+                mapped[:: mmap.PAGESIZE]
+    finally:
+        os.close(fd)
+    return PrewarmResult(path, size, time.monotonic() - started, populate)
+
+
+def prewarm_model(model_name: str, log_prefix: str = "[prewarm]", populate: bool = True) -> Optional[PrewarmResult]:
+    """Prewarm a model by name; never raises, returns None when skipped."""
+    if not prewarm_enabled():
+        return None
+    path = resolve_model_path(model_name)
+    if path is None:
+        print(f"{log_prefix} prewarm skipped: no local file for model={model_name}", flush=True)
+        return None
+    try:
+        result = prewarm_file(path, populate=populate)
+    except OSError as exc:
+        print(f"{log_prefix} prewarm failed for {path}: {exc}", flush=True)
+        return None
+    print(
+        f"{log_prefix} prewarmed {path.name} ({result.size_bytes / 1048576.0:.0f} MiB) "
+        f"in {result.seconds * 1000.0:.0f}ms",
+        flush=True,
+    )
+    return result
+
+
+def main() -> int:
+    names: List[str] = sys.argv[1:]
+    if not names:
+        names = [os.environ.get("LOCAL_DICT_MODEL", "base.en"), os.environ.get("LOCAL_VCMD_MODEL", "base.en")]
+    seen = set()
+    for name in names:
+        if name in seen:
+            continue
+        seen.add(name)
+        prewarm_model(name)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
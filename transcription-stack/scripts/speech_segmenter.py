@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List
+
+from streaming_vad import StreamingVad
+
+
+@dataclass(frozen=True)
+class SpeechEvent:
+    """An utterance boundary, in `StreamingVad` frame indices.
+
+    `kind` is `onset` (speech started; `end_frame` is the frame that
+    triggered it), `offset` (speech ended; `end_frame` is just past the last
+    voiced frame plus the tail) or `noise` (it ended before enough voiced
+    frames to be worth decoding). `start_frame` includes the pre-roll.
+    """
+
+    kind: str
+    start_frame: int
+    end_frame: int
+    voiced_frames: int
+    forced: bool = False
+
+
+@dataclass
+class SpeechSegmenter:
+    """Onset/offset state machine over the per-frame voiced flags of a `StreamingVad`.
+
+    Onset fires once `onset_frames` voiced frames fall within the last
+    `2 * onset_frames`, and the utterance is backdated to its first voiced
+    frame minus `preroll_frames`, but never into the previous utterance (a
+    forced cut is followed straight by the next onset). Offset fires after `hangover_frames`
+    without a voiced frame, or when the utterance reaches `max_frames`
+    (`forced`). Utterances with fewer than `min_voiced_frames` voiced frames
+    close as `noise`. `update()` is consumer-side and only reads frames
+    completed since the previous call, so it is cheap to run often.
+    """
+
+    vad: StreamingVad
+    sample_rate: int
+    onset_frames: int
+    hangover_frames: int
+    preroll_frames: int = 0
+    tail_frames: int = 0
+    min_voiced_frames: int = 1
+    max_frames: int = 0
+    in_speech: bool = field(default=False, init=False)
+    start_frame: int = field(default=0, init=False)
+    _cursor: int = field(default=0, init=False, repr=False)
+    _last_voiced: int = field(default=0, init=False, repr=False)
+    _voiced_frames: int = field(default=0, init=False, repr=False)
+    _previous_end: int = field(default=0, init=False, repr=False)
+    _recent: Deque[int] = field(default_factory=deque, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.onset_frames = max(1, int(self.onset_frames))
+        self.hangover_frames = max(1, int(self.hangover_frames))
+        self.preroll_frames = max(0, int(self.preroll_frames))
+        self.tail_frames = max(0, int(self.tail_frames))
+        self.min_voiced_frames = max(1, int(self.min_voiced_frames))
+        self.max_frames = max(0, int(self.max_frames))
+        self._recent = deque(maxlen=2 * self.onset_frames)
+        self._cursor = self.vad.frame_count
+
+    @classmethod
+    def for_stream(
+        cls,
+        vad: StreamingVad,
+        sample_rate: int,
+        onset_seconds: float,
+        hangover_seconds: float,
+        preroll_seconds: float = 0.0,
+        tail_seconds: float = 0.0,
+        min_voiced_seconds: float = 0.0,
+        max_seconds: float = 0.0,
+    ) -> "SpeechSegmenter":
+        frame_seconds = vad.frame_samples / float(sample_rate)
+
+        def frames(seconds: float) -> int:
+            return int(round(max(0.0, seconds) / frame_seconds))
+
+        return cls(
+            vad=vad,
+            sample_rate=sample_rate,
+            onset_frames=frames(onset_seconds),
+            hangover_frames=frames(hangover_seconds),
+            preroll_frames=frames(preroll_seconds),
+            tail_frames=frames(tail_seconds),
+            min_voiced_frames=frames(min_voiced_seconds),
+            max_frames=frames(max_seconds),
+        )
+
+    @property
+    def frame_seconds(self) -> float:
+        return self.vad.frame_samples / float(self.sample_rate)
+
+    def samples_for(self, frames: int, rate: int) -> int:
+        """Length of `frames` VAD frames in samples at `rate`."""
+        return int(round(max(0, frames) * self.frame_seconds * rate))
+
+    def speech_frames(self) -> int:
+        """Frames from the current utterance's start (pre-roll included) to now."""
+        return self.vad.frame_count - self.start_frame if self.in_speech else 0
+
+    def update(self) -> List[SpeechEvent]:
+        """Advance over the frames completed since the last call."""
+        first, flags = self.vad.voiced_flags(self._cursor, self.vad.frame_count)
+        if first > self._cursor and not self.in_speech:
+            # A reset or overrun skipped frames; a half-seen onset no longer counts.
+            self._recent.clear()
+        self._cursor = first + int(flags.size)
+
+        events: List[SpeechEvent] = []
+        for offset, voiced in enumerate(flags.tolist()):
+            frame = first + offset
+            if not self.in_speech:
+                self._recent.append(voiced)
+                if voiced and sum(self._recent) >= self.onset_frames:
+                    events.append(self._open(frame))
+                continue
+            if voiced:
+                self._last_voiced = frame
+                self._voiced_frames += 1
+            silent = frame - self._last_voiced
+            forced = self.max_frames > 0 and frame + 1 - self.start_frame >= self.max_frames
+            if silent >= self.hangover_frames or forced:
+                events.append(self._close(frame, forced and silent < self.hangover_frames))
+        return events
+
+    def _open(self, frame: int) -> SpeechEvent:
+        first_voiced = frame - (len(self._recent) - 1 - list(self._recent).index(1))
+        self.in_speech = True
+        self.start_frame = max(self.vad.floor_frame, self._previous_end, first_voiced - self.preroll_frames)
+        self._last_voiced = frame
+        self._voiced_frames = sum(self._recent)
+        self._recent.clear()
+        return SpeechEvent("onset", self.start_frame, frame + 1, self._voiced_frames)
+
+    def _close(self, frame: int, forced: bool) -> SpeechEvent:
+        end = min(frame + 1, self._last_voiced + 1 + self.tail_frames)
+        kind = "offset" if self._voiced_frames >= self.min_voiced_frames else "noise"
+        event = SpeechEvent(kind, self.start_frame, end, self._voiced_frames, forced)
+        self.in_speech = False
+        self._voiced_frames = 0
+        self._previous_end = end
+        return event
+
+    def reset(self) -> None:
+        """Drop any open utterance and start again from the newest frame."""
+        self.in_speech = False
+        self._voiced_frames = 0
+        self._recent.clear()
+        self._cursor = self.vad.frame_count
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Step cadence is kept this much above the expected decode time so the decoder
+# is busy most of the time without queueing behind itself.
+_STEP_HEADROOM = 1.15
+# Only report/apply a new setting when it moves by more than this fraction.
+_CHANGE_EPSILON = 0.05
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() not in {"0", "false", "no", "off"}
+
+
+@dataclass
+class StepScheduler:
+    """Adapts step cadence and window length to measured decode speed.
+
+    Every `model.transcribe` call is reported through `observe()` with the
+    seconds of audio decoded and the wall time it took. The smoothed
+    real-time factor (decode time / audio time) predicts the cost of the next
+    window. The step is kept just above that cost, so a slow machine stops
+    falling behind and a fast one decodes more often. When the expected
+    latency (half a step of waiting plus one decode) overshoots
+    `target_latency`, the window shrinks; when there is room it grows back.
+    Both stay inside `[min_*, max_*]`.
+    """
+
+    step_seconds: float
+    window_seconds: float
+    min_step: float
+    max_step: float
+    min_window: float
+    max_window: float
+    target_latency: float
+    smoothing: float = 0.3
+    enabled: bool = True
+    rtf: float = field(default=0.0, init=False)
+    observations: int = field(default=0, init=False)
+    _decode_seconds: float = field(default=0.0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.min_step = max(0.05, float(self.min_step))
+        self.max_step = max(self.min_step, float(self.max_step))
+        self.min_window = max(0.5, float(self.min_window))
+        self.max_window = max(self.min_window, float(self.max_window))
+        self.step_seconds = min(self.max_step, max(self.min_step, float(self.step_seconds)))
+        self.window_seconds = min(self.max_window, max(self.min_window, float(self.window_seconds)))
+        self.smoothing = min(1.0, max(0.01, float(self.smoothing)))
+
+    @classmethod
+    def from_env(
+        cls,
+        prefix: str,
+        step_seconds: float,
+        window_seconds: float,
+        max_buffer_seconds: float,
+        enabled: bool = True,
+    ) -> "StepScheduler":
+        """Build from `<prefix>_ADAPTIVE*` settings; `enabled` is the default of `<prefix>_ADAPTIVE`.
+
+        Disabled keeps the fixed values.
+        """
+        max_window = _env_float(f"{prefix}_ADAPTIVE_MAX_WINDOW_SECONDS", window_seconds)
+        return cls(
+            step_seconds=step_seconds,
+            window_seconds=window_seconds,
+            min_step=_env_float(f"{prefix}_ADAPTIVE_MIN_STEP_SECONDS", min(0.25, step_seconds)),
+            max_step=_env_float(f"{prefix}_ADAPTIVE_MAX_STEP_SECONDS", max(2.0, step_seconds)),
+            min_window=_env_float(f"{prefix}_ADAPTIVE_MIN_WINDOW_SECONDS", min(2.0, window_seconds)),
+            max_window=min(max_window, max_buffer_seconds),
+            target_latency=_env_float(f"{prefix}_ADAPTIVE_TARGET_LATENCY_SECONDS", 1.0),
+            enabled=_env_flag(f"{prefix}_ADAPTIVE", enabled),
+        )
+
+    def window_samples(self, sample_rate: int) -> int:
+        return int(self.window_seconds * sample_rate)
+
+    def observe(self, audio_seconds: float, decode_seconds: float) -> Optional[str]:
+        """Record one decode; return a description if step/window changed."""
+        if audio_seconds <= 0.0 or decode_seconds <= 0.0:
+            return None
+
+        rtf = decode_seconds / audio_seconds
+        if self.observations == 0:
+            self.rtf = rtf
+            self._decode_seconds = decode_seconds
+        else:
+            self.rtf += self.smoothing * (rtf - self.rtf)
+            self._decode_seconds += self.smoothing * (decode_seconds - self._decode_seconds)
+        self.observations += 1
+        if not self.enabled:
+            return None
+
+        window = self._plan_window()
+        step = min(self.max_step, max(self.min_step, self.rtf * window * _STEP_HEADROOM))
+
+        changed = _moved(self.window_seconds, window) or _moved(self.step_seconds, step)
+        if not changed:
+            return None
+        previous = (self.step_seconds, self.window_seconds)
+        self.step_seconds = step
+        self.window_seconds = window
+        return (
+            f"rtf={self.rtf:.2f} decode={self._decode_seconds:.2f}s "
+            f"step={previous[0]:.2f}->{step:.2f}s window={previous[1]:.2f}->{window:.2f}s "
+            f"expected_latency={self.expected_latency():.2f}s target={self.target_latency:.2f}s"
+        )
+
+    def _plan_window(self) -> float:
+        if self.rtf <= 0.0:
+            return self.window_seconds
+        # latency ~= step / 2 + decode, with step ~= decode * headroom:
+        # solve rtf * window * (1 + headroom / 2) == target.
+        fit = self.target_latency / (self.rtf * (1.0 + _STEP_HEADROOM / 2.0))
+        return min(self.max_window, max(self.min_window, fit))
+
+    def expected_latency(self) -> float:
+        return self.step_seconds / 2.0 + self.rtf * self.window_seconds
+
+
+def _moved(old: float, new: float) -> bool:
+    return abs(new - old) > _CHANGE_EPSILON * max(old, 1e-6)
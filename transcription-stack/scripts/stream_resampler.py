@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from audio_ring_buffer import AudioRingBuffer, AudioWindow
+
+
+def _design_lowpass(up: int, down: int) -> np.ndarray:
+    """Anti-aliasing FIR matching `scipy.signal.resample_poly` defaults.
+
+    Kaiser window (beta=5), half length 10 * max(up, down), cutoff at the
+    narrower Nyquist, scaled by `up` to keep unity passband gain.
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    n = np.arange(-half_len, half_len + 1, dtype=np.float64)
+    taps = np.sinc(n / max_rate) * np.kaiser(2 * half_len + 1, 5.0)
+    taps /= taps.sum()
+    return taps * up
+
+
+class StreamingResampler:
+    """Polyphase rational resampler that keeps its filter and state across calls.
+
+    The FIR is designed once. Each call consumes only new input samples and
+    carries the last `taps_per_phase - 1` inputs forward, so a stream fed in
+    arbitrary block sizes produces the same output as one long call.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int) -> None:
+        g = gcd(int(source_rate), int(target_rate))
+        self.up = int(target_rate) // g
+        self.down = int(source_rate) // g
+
+        taps = _design_lowpass(self.up, self.down)
+        taps_per_phase = -(-taps.size // self.up)
+        padded = np.zeros(taps_per_phase * self.up, dtype=np.float64)
+        padded[: taps.size] = taps
+        # phases[p, q] = taps[p + q * up]; reversed so a row dots with x[j - Q + 1 .. j].
+        phases = padded.reshape(taps_per_phase, self.up).T[:, ::-1]
+        self._phases = np.ascontiguousarray(phases, dtype=np.float32)
+        self._taps_per_phase = taps_per_phase
+        # Outputs covering the filter's group delay are dropped so the stream
+        # lines up with the input like resample_poly does.
+        self._delay_outputs = (taps.size // 2) // self.down
+        self.reset()
+
+    def reset(self) -> None:
+        self._history = np.zeros(self._taps_per_phase - 1, dtype=np.float32)
+        self._in_count = 0
+        self._out_count = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        data = np.asarray(block, dtype=np.float32).reshape(-1)
+        if data.size <= 0:
+            return np.empty(0, dtype=np.float32)
+
+        ext = np.concatenate((self._history, data))
+        base = self._in_count - self._history.size
+        self._in_count += data.size
+        if self._history.size:
+            self._history = ext[-self._history.size :].copy()
+
+        out_end = (self._in_count * self.up - 1) // self.down + 1
+        first = max(self._out_count, self._delay_outputs)
+        self._out_count = out_end
+        if out_end <= first:
+            return np.empty(0, dtype=np.float32)
+
+        out = np.empty(out_end - first, dtype=np.float32)
+        step = ext.strides[0]
+        # Outputs m and m + up share a filter phase and their input windows are
+        # exactly `down` samples apart, so each phase is one strided mat-vec.
+        for r in range(min(self.up, out.size)):
+            t = (first + r) * self.down
+            oldest = t // self.up - base - (self._taps_per_phase - 1)
+            count = len(range(r, out.size, self.up))
+            frames = as_strided(
+                ext[oldest:],
+                shape=(count, self._taps_per_phase),
+                strides=(self.down * step, step),
+                writeable=False,
+            )
+            out[r :: self.up] = frames @ self._phases[t % self.up]
+        return out
+
+
+class WhisperFeed:
+    """Resamples each captured block exactly once into a decode-rate ring.
+
+    Call `pump()` from the consumer thread before reading; `view()` then
+    returns the trailing window already at `rate`. When capture already runs
+    at the decode rate the source ring is used directly.
+    """
+
+    def __init__(self, source: AudioRingBuffer, source_rate: int, rate: int) -> None:
+        self.source = source
+        self.rate = int(rate)
+        if int(source_rate) == self.rate:
+            self._resampler = None
+            self.buffer = source
+        else:
+            self._resampler = StreamingResampler(source_rate, self.rate)
+            capacity = int(source.capacity * self.rate / float(source_rate)) + 1
+            self.buffer = AudioRingBuffer(capacity, single_producer=True)
+        self._cursor = source.generation
+
+    def pump(self) -> int:
+        """Resample samples captured since the last pump; returns outputs added."""
+        if self._resampler is None:
+            return 0
+        window = self.source.view_since(self._cursor)
+        if window.start != self._cursor:
+            # Dropped input (overrun or clear): restart the filter on the new data.
+            self._resampler.reset()
+        self._cursor = window.end
+        if window.size <= 0:
+            return 0
+        out = self._resampler.process(window.samples)
+        self.buffer.append(out)
+        return int(out.size)
+
+    def view(self, limit_samples: int) -> AudioWindow:
+        return self.buffer.view(limit_samples)
+
+    def view_since(self, start: int, limit_samples: int) -> AudioWindow:
+        return self.buffer.view_since(start, limit_samples)
+
+    @property
+    def generation(self) -> int:
+        return self.buffer.generation
+
+    def is_intact(self, window: AudioWindow) -> bool:
+        return self.buffer.is_intact(window)
+
+    def clear(self) -> None:
+        self.source.clear()
+        if self._resampler is not None:
+            self.buffer.clear()
+            self._resampler.reset()
+            self._cursor = self.source.generation
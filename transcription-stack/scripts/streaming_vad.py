@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Tuple
+
+import numpy as np
+
+# Extra slots between the newest and oldest cumulative entries so a reader
+# never lands on the slot the producer is currently rewriting.
+_GUARD_FRAMES = 8
+
+
+@dataclass
+class StreamingVad:
+    """Streaming frame-energy voice activity state.
+
+    Fed with every captured block (see `AudioRingBuffer.vad`). Each completed
+    frame adds its energy and voiced flag to running totals stored in a
+    circular prefix-sum array, so RMS and voiced ratio over any trailing
+    window are O(1) and never rescan or copy audio. Like the ring buffer this
+    is single-producer/single-consumer: the producer owns `_frames` and the
+    partial frame, the consumer owns `_floor_frame`.
+    """
+
+    frame_samples: int
+    capacity_frames: int
+    threshold: float
+    _cum_energy: np.ndarray = field(init=False, repr=False)
+    _cum_voiced: np.ndarray = field(init=False, repr=False)
+    _frames: int = field(default=0, init=False, repr=False)
+    _floor_frame: int = field(default=0, init=False, repr=False)
+    _energy_total: float = field(default=0.0, init=False, repr=False)
+    _voiced_total: int = field(default=0, init=False, repr=False)
+    _partial_energy: float = field(default=0.0, init=False, repr=False)
+    _partial_count: int = field(default=0, init=False, repr=False)
+    _voiced_energy: float = field(default=0.0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.frame_samples = max(1, int(self.frame_samples))
+        self.capacity_frames = max(1, int(self.capacity_frames))
+        slots = self.capacity_frames + _GUARD_FRAMES + 1
+        self._cum_energy = np.zeros(slots, dtype=np.float64)
+        self._cum_voiced = np.zeros(slots, dtype=np.int64)
+        self._voiced_energy = float(self.threshold) * float(self.threshold) * self.frame_samples
+
+    @classmethod
+    def for_stream(cls, sample_rate: int, frame_ms: int, threshold: float, max_seconds: float) -> "StreamingVad":
+        frame_samples = max(1, int(sample_rate * max(5, frame_ms) / 1000.0))
+        capacity_frames = max(1, int(max_seconds * sample_rate) // frame_samples + 1)
+        return cls(frame_samples=frame_samples, capacity_frames=capacity_frames, threshold=threshold)
+
+    def update(self, data: np.ndarray) -> None:
+        """Producer side: account for a newly captured block."""
+        n = int(data.size)
+        i = 0
+        if self._partial_count > 0:
+            take = min(self.frame_samples - self._partial_count, n)
+            seg = data[:take]
+            self._partial_energy += float(np.dot(seg, seg))
+            self._partial_count += take
+            i = take
+            if self._partial_count < self.frame_samples:
+                return
+            self._complete_frame(self._partial_energy)
+            self._partial_energy = 0.0
+            self._partial_count = 0
+
+        frame = self.frame_samples
+        while n - i >= frame:
+            seg = data[i : i + frame]
+            self._complete_frame(float(np.dot(seg, seg)))
+            i += frame
+
+        if i < n:
+            seg = data[i:]
+            self._partial_energy = float(np.dot(seg, seg))
+            self._partial_count = n - i
+
+    def _complete_frame(self, energy: float) -> None:
+        self._energy_total += energy
+        if energy >= self._voiced_energy:
+            self._voiced_total += 1
+        frames = self._frames + 1
+        slot = frames % self._cum_energy.size
+        self._cum_energy[slot] = self._energy_total
+        self._cum_voiced[slot] = self._voiced_total
+        # Publish only after the cumulative entry is in place.
+        self._frames = frames
+
+    @property
+    def frame_count(self) -> int:
+        """Frames completed so far; only ever grows (frame `k` covers samples `[k * frame_samples, ...)`)."""
+        return self._frames
+
+    @property
+    def floor_frame(self) -> int:
+        """First frame still counted after the last `reset()`."""
+        return self._floor_frame
+
+    def voiced_flags(self, start_frame: int, end_frame: int) -> Tuple[int, np.ndarray]:
+        """Per-frame voiced flags for frames `[start, end)`, clamped to what is retained.
+
+        Returns `(first_frame, flags)`; `first_frame` is later than `start_frame`
+        when older frames were reset or fell out of the history.
+        """
+        slots = self._cum_voiced.size
+        end = min(int(end_frame), self._frames)
+        start = max(int(start_frame), self._floor_frame, end - self.capacity_frames)
+        if end <= start:
+            return end, np.zeros(0, dtype=np.int64)
+        idx = np.arange(start, end + 1) % slots
+        # Differences of consecutive cumulative counts are the per-frame flags.
+        return start, np.diff(self._cum_voiced[idx])
+
+    def window_stats(self, window_samples: int) -> Tuple[float, float]:
+        """Return `(rms, voiced_ratio)` over the trailing `window_samples`."""
+        slots = self._cum_energy.size
+        while True:
+            frames = self._frames
+            available = min(self.capacity_frames, frames - self._floor_frame)
+            count = min(available, max(0, int(window_samples)) // self.frame_samples)
+            if count <= 0:
+                return 0.0, 0.0
+            new, old = frames % slots, (frames - count) % slots
+            energy = float(self._cum_energy[new] - self._cum_energy[old])
+            voiced = int(self._cum_voiced[new] - self._cum_voiced[old])
+            if self._frames - frames < _GUARD_FRAMES:
+                break
+
+        rms = float(np.sqrt(max(0.0, energy) / float(count * self.frame_samples)))
+        return rms, float(voiced) / float(count)
+
+    def reset(self) -> None:
+        """Consumer side: forget everything captured so far."""
+        self._floor_frame = self._frames
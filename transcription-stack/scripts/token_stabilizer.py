@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+# whisper.cpp reports segment times in 10 ms ticks.
+_TICK_SECONDS = 0.01
+
+# pywhispercpp keeps params passed to transcribe() for later calls, and the
+# speech engine shares one model between modes, so any setting a caller may
+# change is reset to whisper.cpp's default unless the caller passes it again.
+_RESET_PARAMS: Dict[str, Any] = {"audio_ctx": 0, "initial_prompt": "", "max_tokens": 0}
+
+# One segment per word with token-level timestamps; the untimed set is explicit too.
+TIMED_PARAMS: Dict[str, Any] = {**_RESET_PARAMS, "token_timestamps": True, "max_len": 1, "split_on_word": True}
+UNTIMED_PARAMS: Dict[str, Any] = {**_RESET_PARAMS, "token_timestamps": False, "max_len": 0, "split_on_word": False}
+
+
+def _normalize_key(word: str) -> str:
+    return re.sub(r"(^\W+|\W+$)", "", word.lower())
+
+
+@dataclass(frozen=True)
+class TimedWord:
+    text: str
+    key: str
+    start: float
+    end: float
+    prob: float
+
+    def shifted(self, offset: float) -> "TimedWord":
+        return TimedWord(self.text, self.key, self.start + offset, self.end + offset, self.prob)
+
+    @property
+    def center(self) -> float:
+        return (self.start + self.end) / 2.0
+
+
+@dataclass(frozen=True)
+class Hypothesis:
+    """One decode: the joined text plus per-word timing when it was requested."""
+
+    text: str
+    words: Tuple[TimedWord, ...] = ()
+
+
+EMPTY_HYPOTHESIS = Hypothesis("")
+
+
+def hypothesis_from_segments(segments: Sequence[Any], timed: bool) -> Hypothesis:
+    """Build a `Hypothesis` from pywhispercpp segments.
+
+    With `TIMED_PARAMS` every segment is (roughly) one word. Segments that
+    still hold several words share their time span evenly; punctuation-only
+    pieces are glued onto the previous word. A missing probability (older
+    pywhispercpp) is treated as fully confident.
+    """
+    if not timed:
+        text = " ".join(seg.text for seg in segments if getattr(seg, "text", "")).strip()
+        return Hypothesis(text=text)
+
+    words: List[TimedWord] = []
+    for seg in segments:
+        pieces = str(getattr(seg, "text", "") or "").split()
+        if not pieces:
+            continue
+        t0 = float(getattr(seg, "t0", 0)) * _TICK_SECONDS
+        t1 = max(t0, float(getattr(seg, "t1", 0)) * _TICK_SECONDS)
+        prob = float(getattr(seg, "probability", math.nan))
+        if math.isnan(prob):
+            prob = 1.0
+        span = (t1 - t0) / len(pieces)
+        for i, piece in enumerate(pieces):
+            key = _normalize_key(piece)
+            if not key and words:
+                last = words[-1]
+                words[-1] = TimedWord(last.text + piece, last.key, last.start, last.end, min(last.prob, prob))
+                continue
+            words.append(TimedWord(piece, key, t0 + i * span, t0 + (i + 1) * span, prob))
+
+    return Hypothesis(text=" ".join(w.text for w in words), words=tuple(words))
+
+
+def transcribe_hypothesis(model: Any, audio: Any, timed: bool, **kwargs: Any) -> Hypothesis:
+    params = dict(TIMED_PARAMS if timed else UNTIMED_PARAMS)
+    params.update(kwargs)
+    if not timed:
+        return hypothesis_from_segments(model.transcribe(audio, n_processors=None, **params), False)
+    try:
+        segments = model.transcribe(audio, n_processors=None, extract_probability=True, **params)
+    except (TypeError, AttributeError):
+        # pywhispercpp before segment probabilities: timing only.
+        segments = model.transcribe(audio, n_processors=None, **params)
+    return hypothesis_from_segments(segments, True)
+
+
+@dataclass
+class TokenStabilizer:
+    """Commits words by timing and confidence instead of string overlap.
+
+    Word times are absolute stream seconds (shift a `Hypothesis` by its
+    window start). A word becomes stable once it ends at least
+    `edge_guard_seconds` before the trailing edge of the decoded audio, has
+    probability >= `min_prob`, and the previous hypothesis had the same word
+    ending within `time_tolerance`. Only a leading run of stable words is
+    offered. The caller moves `committed_until` with `mark_committed()` to
+    the end of the last word it actually typed, so words it held back are
+    offered again and words already typed never are.
+    """
+
+    edge_guard_seconds: float = 0.6
+    min_prob: float = 0.5
+    time_tolerance: float = 0.3
+    committed_until: float = 0.0
+    _previous: Dict[str, List[TimedWord]] = field(default_factory=dict, init=False, repr=False)
+
+    def reset(self) -> None:
+        """Forget the previous hypothesis; the committed position is kept."""
+        self._previous = {}
+
+    def mark_committed(self, until: float) -> None:
+        self.committed_until = max(self.committed_until, float(until))
+
+    def uncommitted(self, words: Sequence[TimedWord]) -> List[TimedWord]:
+        return [w for w in words if w.center > self.committed_until]
+
+    def _seen_before(self, word: TimedWord) -> bool:
+        for prev in self._previous.get(word.key, ()):
+            if abs(prev.end - word.end) <= self.time_tolerance and prev.prob >= self.min_prob:
+                return True
+        return False
+
+    def update(self, words: Sequence[TimedWord], window_end: float) -> List[TimedWord]:
+        """Feed one hypothesis (absolute times); return the leading run of stable uncommitted words."""
+        stable: List[TimedWord] = []
+        for word in self.uncommitted(words):
+            if window_end - word.end < self.edge_guard_seconds:
+                break
+            if word.prob < self.min_prob or not self._seen_before(word):
+                break
+            stable.append(word)
+
+        previous: Dict[str, List[TimedWord]] = {}
+        for word in words:
+            previous.setdefault(word.key, []).append(word)
+        self._previous = previous
+        return stable
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import os
+import socket
+import struct
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+EV_SYN = 0x00
+EV_KEY = 0x01
+SYN_REPORT = 0
+
+KEY_MINUS = 12
+KEY_EQUAL = 13
+KEY_TAB = 15
+KEY_ENTER = 28
+KEY_LEFTCTRL = 29
+KEY_LEFTSHIFT = 42
+KEY_BACKSPACE = 14
+KEY_SPACE = 57
+
+# struct input_event: struct timeval (two longs), __u16 type, __u16 code, __s32 value.
+# ydotoold reads exactly one event per datagram and fills in the timestamp itself.
+_INPUT_EVENT = struct.Struct("@llHHi")
+
+_UNSHIFTED = "1234567890-=qwertyuiop[]asdfghjkl;'`\\zxcvbnm,./"
+_SHIFTED = '!@#$%^&*()_+QWERTYUIOP{}ASDFGHJKL:"~|ZXCVBNM<>?'
+_CODES = (
+    list(range(2, 14))  # 1..0 - =
+    + list(range(16, 28))  # q..p [ ]
+    + list(range(30, 42))  # a..l ; ' `
+    + [43]  # backslash
+    + list(range(44, 54))  # z..m , . /
+)
+
+# US layout, the same table `ydotool type` uses.
+KEYMAP: Dict[str, Tuple[int, bool]] = {" ": (KEY_SPACE, False), "\t": (KEY_TAB, False), "\n": (KEY_ENTER, False)}
+for _char, _code in zip(_UNSHIFTED, _CODES):
+    KEYMAP[_char] = (_code, False)
+for _char, _code in zip(_SHIFTED, _CODES):
+    KEYMAP[_char] = (_code, True)
+
+KeyEvent = Tuple[int, int]
+
+
+def default_socket_path() -> Path:
+    env_path = os.environ.get("YDOTOOL_SOCKET", "").strip()
+    if env_path:
+        return Path(env_path)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", "").strip()
+    if runtime_dir and (Path(runtime_dir) / ".ydotool_socket").exists():
+        return Path(runtime_dir) / ".ydotool_socket"
+    return Path("/tmp/.ydotool_socket")
+
+
+def text_to_key_events(text: str) -> Optional[List[KeyEvent]]:
+    """Translate text to key down/up pairs; None if a char has no US keycode."""
+    events: List[KeyEvent] = []
+    for char in text:
+        mapped = KEYMAP.get(char)
+        if mapped is None:
+            return None
+        code, shifted = mapped
+        if shifted:
+            events.append((KEY_LEFTSHIFT, 1))
+        events.extend(((code, 1), (code, 0)))
+        if shifted:
+            events.append((KEY_LEFTSHIFT, 0))
+    return events
+
+
+def held_keys(events: Sequence[KeyEvent]) -> List[int]:
+    """Keys that `events` leave pressed, in press order."""
+    held: List[int] = []
+    for code, value in events:
+        if value and code not in held:
+            held.append(code)
+        elif not value and code in held:
+            held.remove(code)
+    return held
+
+
+def typed_chars(text: str, sent: int) -> int:
+    """How many chars of `text` had their key pressed by the first `sent` of its `text_to_key_events`."""
+    offset = 0
+    for index, char in enumerate(text):
+        shifted = KEYMAP[char][1]
+        if offset + (1 if shifted else 0) >= sent:
+            return index
+        offset += 4 if shifted else 2
+    return len(text)
+
+
+def repeat_chord(
+    modifiers: Sequence[int], code: int, count: int, gap_seconds: float = 0.0
+) -> Tuple[List[KeyEvent], Dict[int, float]]:
+    """`count` presses of `modifiers` + `code` as one event batch.
+
+    Returns the events and the pauses for `send_key_events`: `gap_seconds`
+    after each chord but the last.
+    """
+    chord: List[KeyEvent] = [(m, 1) for m in modifiers] + [(code, 1), (code, 0)] + [(m, 0) for m in reversed(modifiers)]
+    events = chord * max(0, int(count))
+    pauses: Dict[int, float] = {}
+    if gap_seconds > 0.0:
+        for step in range(1, max(0, int(count))):
+            pauses[step * len(chord) - 1] = gap_seconds
+    return events, pauses
+
+
+def _run_subprocess(args: List[str], stdin_text: Optional[str] = None) -> Tuple[bool, str]:
+    try:
+        proc = subprocess.run(
+            args,
+            input=stdin_text,
+            text=True,
+            check=False,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=20,
+        )
+    except Exception as exc:
+        return False, str(exc)
+    return proc.returncode == 0, f"rc={proc.returncode} err={(proc.stderr or '').strip()}"
+
+
+class YdotoolChannel:
+    """Long-lived connection to ydotoold for keystroke injection.
+
+    Events are written straight to the daemon's datagram socket, the same wire
+    format the `ydotool` client uses, so typing a chunk costs a few syscalls
+    instead of a process spawn. Pacing matches `ydotool --key-delay`: the
+    delay is applied after every key release. When the socket is missing or
+    a send fails, or the text contains characters outside the US keymap, the
+    call falls back to running `ydotool` as before; after a failed send it
+    picks up where the socket stopped instead of starting over. `backend` is `auto`,
+    `socket` (never spawn) or `subprocess` (never use the socket).
+    """
+
+    def __init__(
+        self,
+        key_delay_ms: int,
+        backend: str = "auto",
+        socket_path: Optional[Path] = None,
+        log_prefix: str = "[ydotool]",
+        debug: bool = False,
+    ) -> None:
+        self.key_delay_ms = max(0, int(key_delay_ms))
+        self.backend = backend.strip().lower() if backend else "auto"
+        if self.backend not in {"auto", "socket", "subprocess"}:
+            self.backend = "auto"
+        self.socket_path = socket_path
+        self.log_prefix = log_prefix
+        self.debug = debug
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._retry_after = 0.0
+
+    def _log(self, message: str) -> None:
+        if self.debug:
+            print(f"{self.log_prefix} {message}", flush=True)
+
+    def _connect(self) -> Optional[socket.socket]:
+        if self._sock is not None:
+            return self._sock
+        if self.backend == "subprocess" or time.monotonic() < self._retry_after:
+            return None
+        path = self.socket_path or default_socket_path()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.connect(str(path))
+        except OSError as exc:
+            sock.close()
+            # Do not probe the filesystem on every chunk while ydotoold is down.
+            self._retry_after = time.monotonic() + 2.0
+            self._log(f"ydotoold socket unavailable at {path}: {exc}")
+            return None
+        self._sock = sock
+        self._log(f"connected to ydotoold socket {path}")
+        return sock
+
+    def _drop_socket(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._retry_after = time.monotonic() + 2.0
+
+    def close(self) -> None:
+        with self._lock:
+            self._drop_socket()
+            self._retry_after = 0.0
+
+    def _send_events(
+        self,
+        sock: socket.socket,
+        events: Sequence[KeyEvent],
+        key_delay_ms: int,
+        pauses: Optional[Dict[int, float]] = None,
+    ) -> int:
+        """Write `events` to the socket; return how many went out (all of them unless a send failed)."""
+        delay = max(0, int(key_delay_ms)) / 1000.0
+        pack = _INPUT_EVENT.pack
+        syn = pack(0, 0, EV_SYN, SYN_REPORT, 0)
+        sent = 0
+        try:
+            for index, (code, value) in enumerate(events):
+                sock.send(pack(0, 0, EV_KEY, code, value))
+                # ydotoold applies the event; the next report (ours or the fallback's) flushes it.
+                sent = index + 1
+                sock.send(syn)
+                wait = delay if value == 0 else 0.0
+                if pauses:
+                    wait += pauses.get(index, 0.0)
+                if wait > 0.0:
+                    time.sleep(wait)
+        except OSError as exc:
+            self._log(f"ydotoold send failed after {sent}/{len(events)} events, falling back to subprocess: {exc}")
+            self._drop_socket()
+        return sent
+
+    def _release_keys(self, codes: Sequence[int]) -> bool:
+        if not codes:
+            return True
+        ok, detail = _run_subprocess(["ydotool", "key", *[f"{code}:0" for code in reversed(codes)]])
+        if not ok:
+            self._log(f"ydotool key (release) {detail}")
+        return ok
+
+    def send_key_events(
+        self,
+        events: Sequence[KeyEvent],
+        key_delay_ms: Optional[int] = None,
+        pauses: Optional[Dict[int, float]] = None,
+    ) -> bool:
+        """Inject an ordered batch of `(keycode, value)` events.
+
+        `pauses` maps an event index to extra seconds to wait after it, so a
+        multi-step sequence (see `repeat_chord`) goes out as one batch.
+        """
+        if not events:
+            return True
+        delay_ms = self.key_delay_ms if key_delay_ms is None else key_delay_ms
+        with self._lock:
+            sent = 0
+            sock = self._connect()
+            if sock is not None:
+                sent = self._send_events(sock, events, delay_ms, pauses)
+                if sent == len(events):
+                    return True
+            if self.backend == "socket":
+                return False
+            # Resume with the rest of the batch: keys still held stay held for it and are released by it.
+            held = held_keys(events[:sent])
+            events = events[sent:]
+            pauses = {i - sent: p for i, p in (pauses or {}).items() if i >= sent}
+            # `ydotool key` only knows one delay: one process per paused run.
+            start = 0
+            for end in sorted(i for i in pauses if 0 <= i < len(events) - 1) + [len(events) - 1]:
+                args = [f"{code}:{value}" for code, value in events[start : end + 1]]
+                ok, detail = _run_subprocess(["ydotool", "key", "--key-delay", str(delay_ms), *args])
+                if not ok:
+                    self._log(f"ydotool key {detail}")
+                    # Do not leave a modifier from the socket part stuck down.
+                    self._release_keys(held)
+                    return False
+                if end + 1 < len(events) and pauses.get(end, 0.0) > 0.0:
+                    time.sleep(pauses[end])
+                start = end + 1
+            return True
+
+    def type_text(self, text: str) -> bool:
+        if not text:
+            return True
+        events = text_to_key_events(text)
+        if events is not None:
+            with self._lock:
+                sock = self._connect()
+                if sock is not None:
+                    sent = self._send_events(sock, events, self.key_delay_ms)
+                    if sent == len(events):
+                        return True
+                    if sent > 0 and self.backend != "socket":
+                        # Close the char that was cut off, then type only what never went out.
+                        if not self._release_keys(held_keys(events[:sent])):
+                            return False
+                        text = text[typed_chars(text, sent) :]
+                        if not text:
+                            return True
+        if self.backend == "socket":
+            return False
+        ok, detail = _run_subprocess(["ydotool", "type", "--key-delay", str(self.key_delay_ms), "--file", "-"], text)
+        if not ok:
+            self._log(f"ydotool type {detail}")
+        return ok
+
+    def press_key(self, code: int, count: int = 1) -> bool:
+        if count <= 0:
+            return True
+        return self.send_key_events([(code, 1), (code, 0)] * count)
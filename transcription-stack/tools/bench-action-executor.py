@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark: listening-loop stalls while command actions run.
+
+A stand-in for the capture/decode loop ticks every `--tick-ms` and, at fixed
+points, triggers commands: a blocking script (`--script-seconds`), a few
+window dispatches (`--dispatch-ms` each) and notifications. The inline mode
+runs each one on the loop, as command mode did before the action executor;
+the executor mode submits them to an `ActionExecutor` with the daemon's
+lanes. Reported: the worst gap between ticks (the audio the loop could not
+decode in time) and how long the actions took to finish.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from action_executor import Action, ActionExecutor  # noqa: E402
+
+
+def _workload(args: argparse.Namespace) -> List[Tuple[int, Action]]:
+    """(tick, action) pairs: one script, then window commands spoken while it runs."""
+
+    def sleeper(seconds: float) -> Callable[[], bool]:
+        return lambda: time.sleep(seconds) or True
+
+    dispatch = args.dispatch_ms / 1e3
+    return [
+        (10, Action("custom:build", sleeper(args.script_seconds), label="script", max_queued=0)),
+        (20, Action("desktop", sleeper(dispatch), label="open")),
+        (21, Action("desktop", sleeper(dispatch), label="notify")),
+        (40, Action("desktop", sleeper(dispatch), label="move")),
+        (41, Action("desktop", sleeper(dispatch), label="notify")),
+    ]
+
+
+def _run(args: argparse.Namespace, executor: Optional[ActionExecutor] = None) -> Tuple[np.ndarray, float]:
+    tick = args.tick_ms / 1e3
+    work = dict(_workload(args))
+    gaps = []
+    started = last = time.perf_counter()
+    for i in range(args.ticks):
+        action = work.get(i)
+        if action is not None:
+            if executor is None:
+                action.run()
+            else:
+                executor.submit(action)
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+        time.sleep(max(0.0, tick - (time.perf_counter() - now)))
+    if executor is not None:
+        executor.wait_idle()
+    return np.asarray(gaps) * 1e3, time.perf_counter() - started
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--ticks", type=int, default=150)
+    p.add_argument("--tick-ms", type=float, default=20.0, help="Loop step")
+    p.add_argument("--script-seconds", type=float, default=1.5, help="Blocking custom command runtime")
+    p.add_argument("--dispatch-ms", type=float, default=15.0, help="Per window action / notification")
+    p.add_argument("--workers", type=int, default=3)
+    args = p.parse_args()
+
+    executor = ActionExecutor(args.workers, name="bench-action")
+    executor.start()
+    for name, ex in (("inline", None), ("executor", executor)):
+        gaps, total = _run(args, ex)
+        print(
+            f"[bench] mode={name:8s} tick_gap_ms p50={np.percentile(gaps, 50):.1f} "
+            f"p99={np.percentile(gaps, 99):.1f} max={gaps.max():.1f} total_s={total:.2f}"
+        )
+    print(f"[bench] executor completed={executor.completed} rejected={executor.rejected}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
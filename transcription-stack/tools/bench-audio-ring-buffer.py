@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Stress benchmark: capture-callback jitter under a busy ring-buffer consumer.
+
+A producer thread emulates the PortAudio callback (one block every
+BLOCK_SIZE / rate seconds) while a consumer thread hammers the buffer the way
+the daemons' main loop does. Reports wake-up lateness and time spent inside
+`append` for the locked and lock-free SPSC modes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from audio_ring_buffer import AudioRingBuffer  # noqa: E402
+
+
+def _percentiles_us(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    arr = np.asarray(values, dtype=np.float64) * 1e6
+    return {
+        "p50": float(np.percentile(arr, 50)),
+        "p99": float(np.percentile(arr, 99)),
+        "max": float(arr.max()),
+    }
+
+
+def _run_case(mode: str, args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    buffer = AudioRingBuffer(int(args.buffer_seconds * args.rate), single_producer=(mode == "spsc"))
+    window_samples = int(args.window_seconds * args.rate)
+    period = args.block_size / float(args.rate)
+    # Interleaved stereo block so the callback hands over a strided channel view.
+    block = np.random.default_rng(0).standard_normal((args.block_size, 2)).astype(np.float32) * 0.01
+
+    stop = threading.Event()
+    lateness: List[float] = []
+    append_cost: List[float] = []
+    consumer_reads = [0]
+
+    def producer() -> None:
+        next_ts = time.perf_counter() + period
+        end_ts = time.perf_counter() + args.seconds
+        while next_ts < end_ts:
+            delay = next_ts - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            woke = time.perf_counter()
+            lateness.append(max(0.0, woke - next_ts))
+            if mode == "spsc":
+                buffer.append(block[:, 0])
+            else:
+                buffer.append(block[:, 0].copy())
+            append_cost.append(time.perf_counter() - woke)
+            next_ts += period
+        stop.set()
+
+    def consumer() -> None:
+        while not stop.is_set():
+            if mode == "spsc":
+                audio = buffer.view(window_samples).samples
+            else:
+                audio = buffer.snapshot(window_samples)
+            if audio.size:
+                float(np.dot(audio, audio))
+            consumer_reads[0] += 1
+
+    threads = [threading.Thread(target=producer), threading.Thread(target=consumer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "lateness_us": _percentiles_us(lateness),
+        "append_us": _percentiles_us(append_cost),
+        "consumer_reads": {"count": float(consumer_reads[0])},
+    }
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--rate", type=int, default=48000)
+    p.add_argument("--block-size", type=int, default=1024)
+    p.add_argument("--window-seconds", type=float, default=3.6)
+    p.add_argument("--buffer-seconds", type=float, default=8.0)
+    p.add_argument("--seconds", type=float, default=5.0, help="Duration of each case")
+    p.add_argument("--mode", choices=("both", "locked", "spsc"), default="both")
+    args = p.parse_args()
+
+    modes = ("locked", "spsc") if args.mode == "both" else (args.mode,)
+    for mode in modes:
+        result = _run_case(mode, args)
+        late = result["lateness_us"]
+        cost = result["append_us"]
+        reads = int(result["consumer_reads"]["count"])
+        print(
+            f"[bench] mode={mode:6s} "
+            f"lateness_us p50={late['p50']:.0f} p99={late['p99']:.0f} max={late['max']:.0f} "
+            f"append_us p50={cost['p50']:.1f} p99={cost['p99']:.1f} max={cost['max']:.1f} "
+            f"consumer_reads={reads}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark: time from a typing toggle to the first captured block.
+
+Compares the two ways a warm daemon can get the mic back:
+
+- reopen: open a fresh `AudioCapture` (what a stopped stream used to cost
+  when the daemon was restarted for a toggle);
+- resume: `resume()` a suspended `AudioCapture`, the warm path.
+
+For each trial it reports the call itself and the delay until the first
+audio block reaches the sink; everything spoken before that block is lost.
+Needs a real input device (`--device`, default: the PortAudio default).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import sounddevice as sd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from audio_capture import AudioCapture  # noqa: E402
+
+
+def _percentiles_ms(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    arr = np.asarray(values, dtype=np.float64) * 1e3
+    return {
+        "p50": float(np.percentile(arr, 50)),
+        "p99": float(np.percentile(arr, 99)),
+        "max": float(arr.max()),
+    }
+
+
+class _FirstBlock:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+
+    def __call__(self, _block: np.ndarray) -> None:
+        self.event.set()
+
+    def wait(self, since: float, timeout: float) -> Optional[float]:
+        if not self.event.wait(timeout):
+            return None
+        return time.monotonic() - since
+
+
+def _run_reopen(args: argparse.Namespace, rate: int) -> Dict[str, List[float]]:
+    call: List[float] = []
+    first: List[float] = []
+    for _ in range(args.trials):
+        sink = _FirstBlock()
+        capture = AudioCapture(args.device, rate, 1, args.block_size)
+        capture.attach(sink)
+        started = time.monotonic()
+        capture.start()
+        call.append(time.monotonic() - started)
+        delay = sink.wait(started, args.timeout)
+        capture.close()
+        if delay is not None:
+            first.append(delay)
+        time.sleep(args.gap)
+    return {"call": call, "first_block": first}
+
+
+def _run_resume(args: argparse.Namespace, rate: int) -> Dict[str, List[float]]:
+    call: List[float] = []
+    first: List[float] = []
+    with AudioCapture(args.device, rate, 1, args.block_size) as capture:
+        for _ in range(args.trials):
+            capture.suspend()
+            time.sleep(args.gap)
+            sink = _FirstBlock()
+            capture.attach(sink)
+            started = time.monotonic()
+            capture.resume()
+            call.append(time.monotonic() - started)
+            delay = sink.wait(started, args.timeout)
+            if delay is not None:
+                first.append(delay)
+    return {"call": call, "first_block": first}
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--device", type=int, default=None, help="PortAudio input device id")
+    p.add_argument("--rate", type=int, default=0, help="Capture rate (default: the device's own)")
+    p.add_argument("--block-size", type=int, default=1024)
+    p.add_argument("--trials", type=int, default=20)
+    p.add_argument("--gap", type=float, default=0.2, help="Seconds between trials")
+    p.add_argument("--timeout", type=float, default=2.0, help="Give up on a trial after this long")
+    p.add_argument("--mode", choices=("both", "reopen", "resume"), default="both")
+    args = p.parse_args()
+
+    rate = args.rate or int(sd.query_devices(args.device, "input")["default_samplerate"])
+    modes = ("reopen", "resume") if args.mode == "both" else (args.mode,)
+    for mode in modes:
+        result = _run_reopen(args, rate) if mode == "reopen" else _run_resume(args, rate)
+        call = _percentiles_ms(result["call"])
+        first = _percentiles_ms(result["first_block"])
+        missed = args.trials - len(result["first_block"])
+        print(
+            f"[bench] mode={mode:6s} rate={rate} "
+            f"call_ms p50={call['p50']:.1f} p99={call['p99']:.1f} max={call['max']:.1f} "
+            f"first_block_ms p50={first['p50']:.1f} p99={first['p99']:.1f} max={first['max']:.1f} "
+            f"missed={missed}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
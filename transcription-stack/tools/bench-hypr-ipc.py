@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Benchmark: Hyprland IPC socket client vs one `hyprctl` process per call.
+
+Both paths talk to a fake Hyprland request socket that answers `clients`,
+`activewindow` and `activeworkspace` queries with canned JSON, replies `ok`
+to dispatches and understands `[[BATCH]]`. `hyprctl` is pointed at it
+through HYPRLAND_INSTANCE_SIGNATURE/XDG_RUNTIME_DIR, so nothing touches the
+running compositor and the numbers measure transport overhead.
+
+Per-command latency is reported for what `_show_app` needs (list clients,
+read the active workspace, focus a window) and for a two-dispatch custom
+command, each run the old way (three/two hyprctl calls) and over IPC.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from hypr_ipc import BATCH_REPLY_SEP, HyprIpc  # noqa: E402
+
+SIGNATURE = "bench"
+
+
+def _fake_clients(count: int) -> List[Dict[str, object]]:
+    classes = ["ghostty", "brave-browser", "obsidian", "vlc", "discord", "thunar"]
+    return [
+        {
+            "address": f"0x{0x5500 + i:x}",
+            "class": classes[i % len(classes)],
+            "title": f"window {i}",
+            "workspace": {"id": i % 5 + 1, "name": str(i % 5 + 1)},
+        }
+        for i in range(count)
+    ]
+
+
+class _FakeHyprland:
+    """Request socket that answers like Hyprland: one request per connection, then close."""
+
+    def __init__(self, path: Path, clients: int) -> None:
+        self.path = path
+        self.requests = 0
+        self._replies = {
+            "j/clients": json.dumps(_fake_clients(clients), indent=4),
+            "j/activewindow": json.dumps(_fake_clients(1)[0], indent=4),
+            "j/activeworkspace": json.dumps({"id": 1, "name": "1"}, indent=4),
+        }
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(str(path))
+        self._sock.listen(16)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _reply(self, request: str) -> str:
+        # hyprctl sends flags as "j/" or "/" ahead of the command.
+        if request.startswith("/"):
+            request = request[1:]
+        if request.startswith("[[BATCH]]"):
+            return BATCH_REPLY_SEP.join(self._reply(c.strip()) for c in request[len("[[BATCH]]") :].split(";"))
+        if request.startswith("dispatch ") or request.startswith("j/dispatch "):
+            return "ok"
+        return self._replies.get(request, "unknown request")
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _addr = self._sock.accept()
+            except OSError:
+                return
+            with conn:
+                try:
+                    request = conn.recv(8192).decode("utf-8")
+                    self.requests += 1
+                    conn.sendall(self._reply(request).encode("utf-8"))
+                except OSError:
+                    pass
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+def _percentiles_ms(values: List[float]) -> Dict[str, float]:
+    arr = np.asarray(values, dtype=np.float64) * 1e3
+    return {"p50": float(np.percentile(arr, 50)), "p99": float(np.percentile(arr, 99)), "max": float(arr.max())}
+
+
+def _time(fn: Callable[[], object], trials: int) -> List[float]:
+    samples = []
+    for _ in range(trials):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _hyprctl(env: Dict[str, str], *args: str) -> str:
+    proc = subprocess.run(["hyprctl", *args], check=False, stdout=subprocess.PIPE, env=env, text=True, timeout=5)
+    return proc.stdout
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--trials", type=int, default=200)
+    p.add_argument("--clients", type=int, default=20, help="Windows in the fake `clients` reply")
+    args = p.parse_args()
+
+    runtime_dir = Path(tempfile.mkdtemp(prefix="bench-hypr-ipc-"))
+    instance = runtime_dir / "hypr" / SIGNATURE
+    instance.mkdir(parents=True)
+    server = _FakeHyprland(instance / ".socket.sock", args.clients)
+    env = {**os.environ, "XDG_RUNTIME_DIR": str(runtime_dir), "HYPRLAND_INSTANCE_SIGNATURE": SIGNATURE}
+    ipc = HyprIpc(instance / ".socket.sock")
+
+    def show_ipc() -> None:
+        clients = ipc.query("clients")
+        ipc.query("activeworkspace")
+        ipc.dispatch(f"focuswindow address:{clients[0]['address']}")
+
+    def show_subprocess() -> None:
+        clients = json.loads(_hyprctl(env, "clients", "-j"))
+        json.loads(_hyprctl(env, "activeworkspace", "-j"))
+        _hyprctl(env, "dispatch", "focuswindow", f"address:{clients[0]['address']}")
+
+    def dispatches_ipc() -> None:
+        ipc.dispatch("movewindow mon:+1", "focusmonitor +1")
+
+    def dispatches_subprocess() -> None:
+        _hyprctl(env, "dispatch", "movewindow", "mon:+1")
+        _hyprctl(env, "dispatch", "focusmonitor", "+1")
+
+    cases = [("show-app", show_ipc, show_subprocess), ("dispatches", dispatches_ipc, dispatches_subprocess)]
+    has_hyprctl = shutil.which("hyprctl") is not None
+    if not has_hyprctl:
+        print("[bench] hyprctl not on PATH; reporting the IPC path only")
+    try:
+        for name, via_ipc, via_subprocess in cases:
+            runs = [("ipc", via_ipc)] + ([("hyprctl", via_subprocess)] if has_hyprctl else [])
+            for backend, fn in runs:
+                fn()  # warm-up
+                stats = _percentiles_ms(_time(fn, args.trials))
+                print(
+                    f"[bench] command={name:10s} backend={backend:7s} "
+                    f"ms p50={stats['p50']:.3f} p99={stats['p99']:.3f} max={stats['max']:.3f}"
+                )
+    finally:
+        server.close()
+        shutil.rmtree(runtime_dir, ignore_errors=True)
+    print(f"[bench] requests served={server.requests}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
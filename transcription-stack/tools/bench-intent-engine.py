@@ -0,0 +1,211 @@
+#!/home/groot/.local/share/hyprwhspr/venv/bin/python
+"""Benchmark: compiled intent engine vs the old sequential regex cascade.
+
+Loads local-voice-commands.py, replays a corpus of command transcripts
+(default: command-transcripts.txt next to this file) through both matchers
+with the default config, checks they agree on every line, and reports the
+time per utterance. The cascade is kept here verbatim as the reference.
+
+Lines starting with `!` are also replayed through the whole daemon decision
+(recognition grammar, intent engine, app and alias lookup), with the
+grammar on and off. None of them may turn into an action. They cover words
+that sound like a command ("Quiet." is not "quit") and near-miss names
+("close that" must not close the app called "chat").
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import importlib.util
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+SCRIPT_PATH = Path(__file__).resolve().parent.parent / "scripts" / "local-voice-commands.py"
+CORPUS_PATH = Path(__file__).resolve().parent / "command-transcripts.txt"
+
+
+def _load_module(path: Path):
+    spec = importlib.util.spec_from_file_location("local_voice_commands", path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"could not load module from {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_corpus(path: Path) -> Tuple[List[str], List[str]]:
+    """(all transcripts, the `!` ones that must not run anything)."""
+    lines = []
+    negatives = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if line.startswith("!"):
+            line = line[1:].strip()
+            negatives.append(line)
+        if line and not line.startswith("#"):
+            lines.append(line)
+    return lines, negatives
+
+
+def _action(vc, command_model, text: str) -> str:
+    """What the daemon would do for `text`, or "" for nothing."""
+    if command_model.grammar is not None:
+        match = command_model.grammar.constrain(text)
+        if match is None:
+            return ""
+        text = match.text
+    custom, intent, payload = vc._match_command(command_model, text)
+    if custom is not None:
+        return f"custom {custom.id}"
+    if not intent or not payload:
+        return ""
+    target = payload
+    if intent == "move-app-workspace":
+        target = vc._decode_pair_payload(payload)[0]
+    elif intent not in {"open", "show", "focus", "close"}:
+        return f"{intent} {payload}"
+    app = vc._resolve_app(command_model, target, intent)
+    return f"{intent} {app.get('id')}" if app is not None else ""
+
+
+def _legacy_custom(vc, cfg: Dict[str, Any], normalized_text: str) -> Optional[Dict[str, Any]]:
+    commands = cfg.get("commands", [])
+    if not isinstance(commands, list):
+        return None
+    candidate_texts = [normalized_text]
+    for prefix in ("run ", "execute ", "start "):
+        if normalized_text.startswith(prefix):
+            candidate_texts.append(normalized_text[len(prefix) :].strip())
+    for candidate in candidate_texts:
+        if not candidate:
+            continue
+        for entry in commands:
+            if isinstance(entry, dict) and candidate in vc._custom_aliases(entry):
+                return entry
+    return None
+
+
+def _legacy_intent(vc, text: str) -> Tuple[str, str]:
+    s = vc._normalize_command_text(text)
+    if not s:
+        return "", ""
+    if re.match(r"^(?:close|quit|exit|stop|kill)(?:\s+(?:current|this|active))?(?:\s+(?:app|application|window))?$", s):
+        return "close-active", "active-window"
+    for pattern in (
+        r"^(?:search(?: web)?(?: for)?|find|look up|google)\s+(.+)$",
+        r"^open (?:the )?(?:browser|web|internet)(?: and)? search(?: for)?\s+(.+)$",
+    ):
+        m = re.match(pattern, s)
+        if m:
+            return "search", vc._collapse_ws(m.group(1))
+    m = re.match(r"^(?:enhance|zoom in|increase zoom)(?:\s+(.+))?$", s)
+    if m:
+        return "zoom-in", str(vc._parse_repeat_count(m.group(1) or "", default_value=1))
+    m = re.match(r"^(?:zoom out|decrease zoom|reduce zoom|shrink)(?:\s+(.+))?$", s)
+    if m:
+        return "zoom-out", str(vc._parse_repeat_count(m.group(1) or "", default_value=1))
+    m = re.match(r"^(?:open|launch|start|run)\s+(.+)$", s)
+    if m:
+        return "open", vc._normalize_target(m.group(1))
+    m = re.match(r"^(?:focus|activate)(?:\s+on)?\s+(.+)$", s)
+    if m:
+        return "focus", vc._normalize_target(m.group(1))
+    m = re.match(r"^(?:show|bring|raise|switch to)\s+(.+)$", s)
+    if m:
+        return "show", vc._normalize_target(m.group(1))
+    m = re.match(r"^(?:move|send)\s+(.+?)\s+to\s+(?:workspace|desktop)\s+(.+)$", s)
+    if m:
+        app_target = vc._normalize_target(m.group(1))
+        workspace_target = vc._normalize_workspace_target(m.group(2))
+        if not workspace_target:
+            return "", ""
+        if app_target in vc._ACTIVE_WINDOW_TARGETS:
+            return "move-active-workspace", workspace_target
+        return "move-app-workspace", vc._encode_pair_payload(app_target, workspace_target)
+    m = re.match(r"^(?:close|quit|exit|stop|kill)\s+(.+)$", s)
+    if m:
+        target = vc._normalize_target(m.group(1))
+        if target in vc._CLOSE_ACTIVE_TARGETS:
+            return "close-active", target
+        return "close", target
+    return "", ""
+
+
+def _legacy(vc, cfg: Dict[str, Any], text: str) -> Tuple[str, str]:
+    custom = _legacy_custom(vc, cfg, vc._normalize_command_text(text))
+    if custom is not None:
+        return "custom", str(custom.get("id", "custom"))
+    return _legacy_intent(vc, text)
+
+
+def _engine(vc, command_model, text: str) -> Tuple[str, str]:
+    match = command_model.intents.match(vc._normalize_command_text(text))
+    if match is None:
+        return "", ""
+    if match.intent == "custom":
+        return "custom", match.rule.data.id
+    return match.intent, match.payload
+
+
+def _time_per_call_us(fn, vc, context: Any, corpus: List[str], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            fn(vc, context, text)
+    return (time.perf_counter() - started) / (repeat * len(corpus)) * 1e6
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--script", type=Path, default=SCRIPT_PATH, help="local-voice-commands.py to load")
+    p.add_argument("--corpus", type=Path, default=CORPUS_PATH, help="One transcript per line")
+    p.add_argument("--repeat", type=int, default=200, help="Passes over the corpus per matcher")
+    p.add_argument("--show", action="store_true", help="Print each transcript and its intent")
+    args = p.parse_args()
+
+    vc = _load_module(args.script)
+    cfg = vc.DEFAULT_CONFIG
+    # Compiled outside the timed loop, as the daemon does on (re)load.
+    command_model = vc._compile_command_model(cfg)
+    corpus, negatives = _load_corpus(args.corpus)
+    if not corpus:
+        print(f"[bench] empty corpus: {args.corpus}", file=sys.stderr)
+        return 2
+
+    mismatches = 0
+    for text in corpus:
+        old = _legacy(vc, cfg, text)
+        new = _engine(vc, command_model, text)
+        if old != new:
+            mismatches += 1
+            print(f"[bench] MISMATCH {text!r}: cascade={old} engine={new}")
+        elif args.show:
+            print(f"[bench] {text!r} -> {new[0] or '-'} {new[1]!r}")
+
+    false_positives = 0
+    for model in (command_model, dataclasses.replace(command_model, grammar=None)):
+        for text in negatives:
+            action = _action(vc, model, text)
+            if action:
+                false_positives += 1
+                print(f"[bench] FALSE POSITIVE {text!r} (grammar={model.grammar is not None}): {action}")
+
+    recognized = sum(1 for text in corpus if _engine(vc, command_model, text)[0])
+    cascade_us = _time_per_call_us(_legacy, vc, cfg, corpus, args.repeat)
+    engine_us = _time_per_call_us(_engine, vc, command_model, corpus, args.repeat)
+    print(
+        f"[bench] utterances={len(corpus)} recognized={recognized} mismatches={mismatches} "
+        f"negatives={len(negatives)} false_positives={false_positives} "
+        f"cascade_us={cascade_us:.2f} engine_us={engine_us:.2f} speedup={cascade_us / max(engine_us, 1e-9):.1f}x"
+    )
+    return 1 if mismatches or false_positives else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: persistent ydotoold socket channel vs one `ydotool` process per call.
+
+By default both backends talk to a throwaway sink socket that only counts
+events, so nothing is typed into the focused window and the numbers measure
+injection overhead. `ydotool` honours YDOTOOL_SOCKET, so the subprocess case
+hits the same sink. Pass --live to use the real ydotoold socket instead
+(focus an empty editor first).
+
+Reports typing throughput (chars/second) and revision latency: the time to
+backspace over a tail and type its replacement, as dictation does when
+Whisper revises a phrase.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from ydotool_channel import KEY_BACKSPACE, YdotoolChannel, default_socket_path  # noqa: E402
+
+SAMPLE_TEXT = "the quick brown fox jumps over the lazy dog, then types it again."
+REVISION_TAIL = "lazy dog"
+REVISION_TEXT = "sleepy cat"
+
+
+class _SinkDaemon:
+    """Datagram socket that drains and counts events like ydotoold would."""
+
+    def __init__(self) -> None:
+        self._dir = tempfile.TemporaryDirectory(prefix="bench-ydotool-")
+        self.path = Path(self._dir.name) / ".ydotool_socket"
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(str(self.path))
+        self._sock.settimeout(0.2)
+        self.events = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._sock.recv(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.events += 1
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._sock.close()
+        self._dir.cleanup()
+
+
+def _percentiles_ms(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    arr = np.asarray(values, dtype=np.float64) * 1e3
+    return {"p50": float(np.percentile(arr, 50)), "p99": float(np.percentile(arr, 99)), "max": float(arr.max())}
+
+
+def _run_case(backend: str, socket_path: Path, args: argparse.Namespace) -> Dict[str, object]:
+    channel = YdotoolChannel(args.key_delay_ms, backend=backend, socket_path=socket_path)
+    try:
+        started = time.perf_counter()
+        typed = 0
+        for _ in range(args.chunks):
+            if not channel.type_text(SAMPLE_TEXT):
+                return {"error": "type failed"}
+            typed += len(SAMPLE_TEXT)
+        chars_per_second = typed / max(1e-9, time.perf_counter() - started)
+
+        revisions: List[float] = []
+        for _ in range(args.revisions):
+            t0 = time.perf_counter()
+            if not channel.press_key(KEY_BACKSPACE, len(REVISION_TAIL)):
+                return {"error": "backspace failed"}
+            if not channel.type_text(REVISION_TEXT):
+                return {"error": "type failed"}
+            revisions.append(time.perf_counter() - t0)
+    finally:
+        channel.close()
+    return {"chars_per_second": chars_per_second, "revision_ms": _percentiles_ms(revisions)}
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--key-delay-ms", type=int, default=2)
+    p.add_argument("--chunks", type=int, default=20, help="Text chunks typed per case")
+    p.add_argument("--revisions", type=int, default=20, help="Backspace+retype revisions per case")
+    p.add_argument("--mode", choices=("both", "socket", "subprocess"), default="both")
+    p.add_argument("--live", action="store_true", help="Inject into the real ydotoold socket")
+    args = p.parse_args()
+
+    sink: Optional[_SinkDaemon] = None
+    if args.live:
+        socket_path = default_socket_path()
+    else:
+        sink = _SinkDaemon()
+        socket_path = sink.path
+        os.environ["YDOTOOL_SOCKET"] = str(socket_path)
+
+    modes = ("socket", "subprocess") if args.mode == "both" else (args.mode,)
+    try:
+        for mode in modes:
+            if mode == "subprocess" and shutil.which("ydotool") is None:
+                print(f"[bench] mode={mode:10s} skipped: ydotool not on PATH")
+                continue
+            result = _run_case(mode, socket_path, args)
+            if "error" in result:
+                print(f"[bench] mode={mode:10s} failed: {result['error']}")
+                continue
+            rev = result["revision_ms"]
+            print(
+                f"[bench] mode={mode:10s} chars_per_second={result['chars_per_second']:.0f} "
+                f"revision_ms p50={rev['p50']:.2f} p99={rev['p99']:.2f} max={rev['max']:.2f}"
+            )
+    finally:
+        if sink is not None:
+            print(f"[bench] sink received {sink.events} datagrams")
+            sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,21 +8,44 @@ REPO_ROOT="$(cd "$ROOT/.." && pwd)"
 ssh "$HOST" 'mkdir -p ~/.config/local-voice-commands'
 
 scp "$ROOT/scripts/audio_ring_buffer.py" "$HOST":~/.local/bin/audio_ring_buffer.py
+scp "$ROOT/scripts/streaming_vad.py" "$HOST":~/.local/bin/streaming_vad.py
+scp "$ROOT/scripts/stream_resampler.py" "$HOST":~/.local/bin/stream_resampler.py
+scp "$ROOT/scripts/decode_worker.py" "$HOST":~/.local/bin/decode_worker.py
+scp "$ROOT/scripts/step_scheduler.py" "$HOST":~/.local/bin/step_scheduler.py
+scp "$ROOT/scripts/ydotool_channel.py" "$HOST":~/.local/bin/ydotool_channel.py
+scp "$ROOT/scripts/token_stabilizer.py" "$HOST":~/.local/bin/token_stabilizer.py
+scp "$ROOT/scripts/audio_capture.py" "$HOST":~/.local/bin/audio_capture.py
+scp "$ROOT/scripts/control_socket.py" "$HOST":~/.local/bin/control_socket.py
+scp "$ROOT/scripts/model_prewarm.py" "$HOST":~/.local/bin/model_prewarm.py
+scp "$ROOT/scripts/loop_wakeup.py" "$HOST":~/.local/bin/loop_wakeup.py
+scp "$ROOT/scripts/speech_segmenter.py" "$HOST":~/.local/bin/speech_segmenter.py
+scp "$ROOT/scripts/command_grammar.py" "$HOST":~/.local/bin/command_grammar.py
+scp "$ROOT/scripts/intent_engine.py" "$HOST":~/.local/bin/intent_engine.py
+scp "$ROOT/scripts/alias_index.py" "$HOST":~/.local/bin/alias_index.py
+scp "$ROOT/scripts/hypr_ipc.py" "$HOST":~/.local/bin/hypr_ipc.py
+scp "$ROOT/scripts/hypr_state.py" "$HOST":~/.local/bin/hypr_state.py
+scp "$ROOT/scripts/command_model.py" "$HOST":~/.local/bin/command_model.py
+scp "$ROOT/scripts/config_watcher.py" "$HOST":~/.local/bin/config_watcher.py
+scp "$ROOT/scripts/action_executor.py" "$HOST":~/.local/bin/action_executor.py
 scp "$ROOT/scripts/local-live-dictation.py" "$HOST":~/.local/bin/local-live-dictation.py
 scp "$ROOT/scripts/local-live-dictation-eval.py" "$HOST":~/.local/bin/local-live-dictation-eval.py
 scp "$ROOT/scripts/local-live-dictation-waybar-status.py" "$HOST":~/.local/bin/local-live-dictation-waybar-status.py
 scp "$ROOT/scripts/local-voice-commands.py" "$HOST":~/.local/bin/local-voice-commands.py
+scp "$ROOT/scripts/local-speech-engine.py" "$HOST":~/.local/bin/local-speech-engine.py
 scp "$ROOT/scripts/hyprwhspr-double-left-ctrl.py" "$HOST":~/.local/bin/hyprwhspr-double-left-ctrl.py
 scp "$ROOT/systemd/hyprwhspr-double-left-ctrl.service" "$HOST":~/.config/systemd/user/hyprwhspr-double-left-ctrl.service
+scp "$ROOT/systemd/local-speech-engine.service" "$HOST":~/.config/systemd/user/local-speech-engine.service
+scp "$ROOT/systemd/local-speech-prewarm.service" "$HOST":~/.config/systemd/user/local-speech-prewarm.service
 scp "$ROOT/config/hyprwhspr-config.json" "$HOST":~/.config/hyprwhspr/config.json
 scp "$ROOT/config/local-voice-commands-config.json" "$HOST":~/.config/local-voice-commands/config.json
 scp "$REPO_ROOT/waybar/.config/waybar/config" "$HOST":~/.config/waybar/config
 scp "$REPO_ROOT/waybar/.config/waybar/style.css" "$HOST":~/.config/waybar/style.css
 
 ssh "$HOST" '
-  chmod +x ~/.local/bin/local-live-dictation.py ~/.local/bin/local-live-dictation-eval.py ~/.local/bin/local-live-dictation-waybar-status.py ~/.local/bin/local-voice-commands.py ~/.local/bin/hyprwhspr-double-left-ctrl.py
-  python3 -m py_compile ~/.local/bin/local-live-dictation.py ~/.local/bin/local-live-dictation-eval.py ~/.local/bin/local-live-dictation-waybar-status.py ~/.local/bin/local-voice-commands.py ~/.local/bin/hyprwhspr-double-left-ctrl.py
+  chmod +x ~/.local/bin/local-live-dictation.py ~/.local/bin/local-live-dictation-eval.py ~/.local/bin/local-live-dictation-waybar-status.py ~/.local/bin/local-voice-commands.py ~/.local/bin/local-speech-engine.py ~/.local/bin/hyprwhspr-double-left-ctrl.py
+  python3 -m py_compile ~/.local/bin/audio_ring_buffer.py ~/.local/bin/streaming_vad.py ~/.local/bin/stream_resampler.py ~/.local/bin/decode_worker.py ~/.local/bin/step_scheduler.py ~/.local/bin/ydotool_channel.py ~/.local/bin/token_stabilizer.py ~/.local/bin/audio_capture.py ~/.local/bin/control_socket.py ~/.local/bin/model_prewarm.py ~/.local/bin/loop_wakeup.py ~/.local/bin/speech_segmenter.py ~/.local/bin/command_grammar.py ~/.local/bin/intent_engine.py ~/.local/bin/alias_index.py ~/.local/bin/hypr_ipc.py ~/.local/bin/hypr_state.py ~/.local/bin/command_model.py ~/.local/bin/config_watcher.py ~/.local/bin/action_executor.py ~/.local/bin/local-live-dictation.py ~/.local/bin/local-live-dictation-eval.py ~/.local/bin/local-live-dictation-waybar-status.py ~/.local/bin/local-voice-commands.py ~/.local/bin/local-speech-engine.py ~/.local/bin/hyprwhspr-double-left-ctrl.py
   systemctl --user daemon-reload
+  systemctl --user restart local-speech-engine.service
   systemctl --user restart hyprwhspr-double-left-ctrl.service
   pkill -USR2 waybar || true
 '
@@ -7,12 +7,34 @@ ROOT="$(cd "$(dirname "$0")/.." && pwd)"
 mkdir -p "$ROOT/scripts" "$ROOT/systemd" "$ROOT/config" "$ROOT/notes"
 
 scp "$HOST":~/.local/bin/audio_ring_buffer.py "$ROOT/scripts/audio_ring_buffer.py"
+scp "$HOST":~/.local/bin/streaming_vad.py "$ROOT/scripts/streaming_vad.py"
+scp "$HOST":~/.local/bin/stream_resampler.py "$ROOT/scripts/stream_resampler.py"
+scp "$HOST":~/.local/bin/decode_worker.py "$ROOT/scripts/decode_worker.py"
+scp "$HOST":~/.local/bin/step_scheduler.py "$ROOT/scripts/step_scheduler.py"
+scp "$HOST":~/.local/bin/ydotool_channel.py "$ROOT/scripts/ydotool_channel.py"
+scp "$HOST":~/.local/bin/token_stabilizer.py "$ROOT/scripts/token_stabilizer.py"
+scp "$HOST":~/.local/bin/audio_capture.py "$ROOT/scripts/audio_capture.py"
+scp "$HOST":~/.local/bin/control_socket.py "$ROOT/scripts/control_socket.py"
+scp "$HOST":~/.local/bin/model_prewarm.py "$ROOT/scripts/model_prewarm.py"
+scp "$HOST":~/.local/bin/loop_wakeup.py "$ROOT/scripts/loop_wakeup.py"
+scp "$HOST":~/.local/bin/speech_segmenter.py "$ROOT/scripts/speech_segmenter.py"
+scp "$HOST":~/.local/bin/command_grammar.py "$ROOT/scripts/command_grammar.py"
+scp "$HOST":~/.local/bin/intent_engine.py "$ROOT/scripts/intent_engine.py"
+scp "$HOST":~/.local/bin/alias_index.py "$ROOT/scripts/alias_index.py"
+scp "$HOST":~/.local/bin/hypr_ipc.py "$ROOT/scripts/hypr_ipc.py"
+scp "$HOST":~/.local/bin/hypr_state.py "$ROOT/scripts/hypr_state.py"
+scp "$HOST":~/.local/bin/command_model.py "$ROOT/scripts/command_model.py"
+scp "$HOST":~/.local/bin/config_watcher.py "$ROOT/scripts/config_watcher.py"
+scp "$HOST":~/.local/bin/action_executor.py "$ROOT/scripts/action_executor.py"
 scp "$HOST":~/.local/bin/local-live-dictation.py "$ROOT/scripts/local-live-dictation.py"
 scp "$HOST":~/.local/bin/local-live-dictation-eval.py "$ROOT/scripts/local-live-dictation-eval.py"
 scp "$HOST":~/.local/bin/local-live-dictation-waybar-status.py "$ROOT/scripts/local-live-dictation-waybar-status.py"
 scp "$HOST":~/.local/bin/local-voice-commands.py "$ROOT/scripts/local-voice-commands.py"
+scp "$HOST":~/.local/bin/local-speech-engine.py "$ROOT/scripts/local-speech-engine.py"
 scp "$HOST":~/.local/bin/hyprwhspr-double-left-ctrl.py "$ROOT/scripts/hyprwhspr-double-left-ctrl.py"
 scp "$HOST":~/.config/systemd/user/hyprwhspr-double-left-ctrl.service "$ROOT/systemd/hyprwhspr-double-left-ctrl.service"
+scp "$HOST":~/.config/systemd/user/local-speech-engine.service "$ROOT/systemd/local-speech-engine.service"
+scp "$HOST":~/.config/systemd/user/local-speech-prewarm.service "$ROOT/systemd/local-speech-prewarm.service"
 scp "$HOST":~/.config/hyprwhspr/config.json "$ROOT/config/hyprwhspr-config.json"
 scp "$HOST":~/.config/local-voice-commands/config.json "$ROOT/config/local-voice-commands-config.json"
 
@@ -20,12 +42,34 @@ scp "$HOST":~/.config/local-voice-commands/config.json "$ROOT/config/local-voice
   cd "$ROOT"
   shasum -a 256 \
     scripts/audio_ring_buffer.py \
+    scripts/streaming_vad.py \
+    scripts/stream_resampler.py \
+    scripts/decode_worker.py \
+    scripts/step_scheduler.py \
+    scripts/ydotool_channel.py \
+    scripts/token_stabilizer.py \
+    scripts/audio_capture.py \
+    scripts/control_socket.py \
+    scripts/model_prewarm.py \
+    scripts/loop_wakeup.py \
+    scripts/speech_segmenter.py \
+    scripts/command_grammar.py \
+    scripts/intent_engine.py \
+    scripts/alias_index.py \
+    scripts/hypr_ipc.py \
+    scripts/hypr_state.py \
+    scripts/command_model.py \
+    scripts/config_watcher.py \
+    scripts/action_executor.py \
     scripts/local-live-dictation.py \
     scripts/local-live-dictation-eval.py \
     scripts/local-live-dictation-waybar-status.py \
     scripts/local-voice-commands.py \
+    scripts/local-speech-engine.py \
     scripts/hyprwhspr-double-left-ctrl.py \
     systemd/hyprwhspr-double-left-ctrl.service \
+    systemd/local-speech-engine.service \
+    systemd/local-speech-prewarm.service \
     config/hyprwhspr-config.json \
     config/local-voice-commands-config.json > notes/latest.sha256
 )